@@ -2,6 +2,8 @@
 ASGI config for Finance_Management project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
+Async views (e.g. accounts/async_views.py) run on the event loop only when served
+through this entry point; under WSGI they fall back to one event loop per request.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
@@ -0,0 +1,155 @@
+"""
+Per-user response cache for the read-only API actions.
+
+Cached responses are keyed by user, view, action and query string, and are scoped
+to the user's generation: a timestamp bumped on every write, which orphans all of
+the user's cached entries at once. The generation also provides the ETag validator,
+so conditional requests (If-None-Match) get 304 before any query or serialization
+runs. No Last-Modified is sent: at the one-second resolution of HTTP dates, a write
+in the same second as a 304 would go unnoticed.
+
+The generations must be shared by every process serving the API, or a write seen by
+one worker leaves the others serving stale responses: local memory (the default) only
+suits a single process, and settings_production requires REDIS_URL.
+"""
+
+import hashlib
+import inspect
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import connection
+from django.utils.cache import patch_cache_control
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+CACHED_HEADERS = ('X-Next-Cursor', 'Link')
+
+
+def get_cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def _generation_key(user_id):
+    return f'api:gen:{user_id}'
+
+
+def get_generation(user_id):
+    """The user's current generation, in nanoseconds since the epoch (set lazily on first read)."""
+    cache = get_cache()
+    key = _generation_key(user_id)
+    generation = cache.get(key)
+    if generation is None:
+        cache.add(key, time.time_ns(), timeout=None)
+        generation = cache.get(key)
+    return generation
+
+
+async def aget_generation(user_id):
+    """Async counterpart of get_generation."""
+    cache = get_cache()
+    key = _generation_key(user_id)
+    generation = await cache.aget(key)
+    if generation is None:
+        await cache.aadd(key, time.time_ns(), timeout=None)
+        generation = await cache.aget(key)
+    return generation
+
+
+def bump_generation(user_id):
+    cache = get_cache()
+    cache.set(_generation_key(user_id), time.time_ns(), timeout=None)
+
+
+def invalidate_user(user_id):
+    """
+    Drop every cached response of a user.
+    The generation is bumped immediately and again once the surrounding transaction commits,
+    so a read racing the write cannot leave uncommitted-era data under the new generation.
+    """
+    bump_generation(user_id)
+    if connection.in_atomic_block:
+        connection.on_commit(lambda: bump_generation(user_id))
+
+
+def _not_modified(request, etag):
+    """If-None-Match against the current ETag; If-Modified-Since is ignored (no Last-Modified is sent)."""
+    if_none_match = request.headers.get('If-None-Match')
+    if if_none_match is None:
+        return False
+    return if_none_match.strip() == '*' or etag in [tag.strip() for tag in if_none_match.split(',')]
+
+
+def _cache_scope(view, view_method, request, generation):
+    """Return (key, etag) for a request at the user's current generation."""
+    params = sorted(request.query_params.lists())
+    digest = hashlib.sha1(
+        f'{type(view).__name__}:{view_method.__name__}:{request.path}:{params}'.encode()
+    ).hexdigest()
+    key = f'api:resp:{request.user.pk}:{generation}:{digest}'
+    etag = quote_etag(f'{generation:x}-{digest[:16]}')
+    return key, etag
+
+
+def _finalize(response, etag):
+    response['ETag'] = etag
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+def _timeout():
+    return getattr(settings, 'API_CACHE_TIMEOUT', 300)
+
+
+def _cache_entry(response):
+    headers = {name: response[name] for name in CACHED_HEADERS if response.has_header(name)}
+    return response.data, headers
+
+
+def cached_response(view_method):
+    """
+    Cache a ViewSet action's 200 responses per user and answer conditional GETs with 304.
+    Only the response data and pagination headers are stored; a hit skips the query and serializer.
+    Works on both sync actions and async (adrf) actions; the latter use the cache's async API.
+    """
+    if inspect.iscoroutinefunction(view_method):
+        @wraps(view_method)
+        async def async_wrapper(self, request, *args, **kwargs):
+            generation = await aget_generation(request.user.pk)
+            key, etag = _cache_scope(self, view_method, request, generation)
+            if _not_modified(request, etag):
+                return _finalize(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+            cache = get_cache()
+            cached = await cache.aget(key)
+            if cached is not None:
+                data, headers = cached
+                return _finalize(Response(data, headers=headers), etag)
+            response = await view_method(self, request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+            await cache.aset(key, _cache_entry(response), _timeout())
+            return _finalize(response, etag)
+
+        return async_wrapper
+
+    @wraps(view_method)
+    def wrapper(self, request, *args, **kwargs):
+        generation = get_generation(request.user.pk)
+        key, etag = _cache_scope(self, view_method, request, generation)
+        if _not_modified(request, etag):
+            return _finalize(Response(status=status.HTTP_304_NOT_MODIFIED), etag)
+        cache = get_cache()
+        cached = cache.get(key)
+        if cached is not None:
+            data, headers = cached
+            return _finalize(Response(data, headers=headers), etag)
+        response = view_method(self, request, *args, **kwargs)
+        if response.status_code != status.HTTP_200_OK:
+            return response
+        cache.set(key, _cache_entry(response), _timeout())
+        return _finalize(response, etag)
+
+    return wrapper
@@ -0,0 +1,61 @@
+"""
+Raw multi-row INSERTs for the hot write paths (statement imports, the balance ledger).
+
+bulk_create compiles every value of every row through its field (get_db_prep_save and
+the SQL compiler), which dominates the cost of inserting hundreds of thousands of rows.
+insert_rows takes plain value tuples instead and only adapts datetimes, the one type the
+database adapters can't take as is on every backend.
+"""
+
+from django.db import NotSupportedError, connection
+from django.db.models.constants import OnConflict
+
+INSERT_BATCH_SIZE = 1000
+
+
+def insert_rows(model, fields, rows, returning=None, batch_size=INSERT_BATCH_SIZE, ignore_conflicts=False):
+    """
+    Insert `rows`, tuples of values for the model fields named in `fields`, with multi-row
+    INSERT statements. Returns the `returning` field of every inserted row in order (a tuple
+    per row when it names several fields), or [] without it.
+    With `ignore_conflicts`, rows that would violate a unique constraint are skipped by the
+    database (ON CONFLICT DO NOTHING) and return nothing.
+    Nothing is validated and no default is applied: the values must be complete and valid.
+    """
+    meta = model._meta
+    columns = [meta.get_field(name) for name in fields]
+    adapters = [
+        connection.ops.adapt_datetimefield_value if column.get_internal_type() == 'DateTimeField' else None
+        for column in columns
+    ]
+    if returning and not connection.features.can_return_rows_from_bulk_insert:
+        raise NotSupportedError(f"{connection.vendor} can't return ids from a multi-row INSERT")
+    if ignore_conflicts and not connection.features.supports_ignore_conflicts:
+        raise NotSupportedError(f"{connection.vendor} can't ignore conflicts on INSERT")
+    if connection.features.max_query_params:
+        batch_size = max(1, min(batch_size, connection.features.max_query_params // len(columns)))
+    quote = connection.ops.quote_name
+    on_conflict = OnConflict.IGNORE if ignore_conflicts else None
+    statement = '{} {} ({}) VALUES '.format(  # INSERT, or INSERT OR IGNORE/INSERT IGNORE where that is the syntax
+        connection.ops.insert_statement(on_conflict=on_conflict),
+        quote(meta.db_table), ', '.join(quote(column.column) for column in columns),
+    )
+    single = isinstance(returning, str)
+    returned = [returning] if single else list(returning or ())
+    clauses = [connection.ops.on_conflict_suffix_sql(columns, on_conflict, None, None)]
+    if returned:
+        clauses.append('RETURNING {}'.format(', '.join(quote(meta.get_field(name).column) for name in returned)))
+    suffix = ''.join(f' {clause}' for clause in clauses if clause)
+    placeholder = '({})'.format(', '.join(['%s'] * len(columns)))
+    results = []
+    with connection.cursor() as cursor:
+        for start in range(0, len(rows), batch_size):
+            batch = rows[start:start + batch_size]
+            params = [
+                adapt(value) if adapt else value
+                for row in batch for value, adapt in zip(row, adapters)
+            ]
+            cursor.execute(statement + ', '.join([placeholder] * len(batch)) + suffix, params)
+            if returned:
+                results.extend(row[0] if single else tuple(row) for row in cursor.fetchall())
+    return results
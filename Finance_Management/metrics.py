@@ -0,0 +1,306 @@
+"""
+In-process request metrics exposed in the Prometheus text format at /metrics.
+
+MetricsMiddleware records, per DRF view and action:
+- request latency (histogram);
+- the number of DB queries per request (histogram) and the time spent in them;
+- the time spent serializing (DynamicFieldsModelSerializer.to_representation) and rendering.
+Queries are counted by an execute_wrapper installed on every database connection; it reads
+the current request's stats from a context variable, so it also sees the queries that async
+views run on sync_to_async threads. Outside a request the wrapper only forwards the call.
+
+Each worker process counts its own requests and publishes a snapshot to the shared cache
+(Finance_Management/cache.py; Redis in production) at most every METRICS_PUBLISH_INTERVAL
+seconds. A scrape, whichever worker it reaches, serves every live worker's snapshot, each
+series labelled with its worker (host:pid), so the counters of one series only ever grow:
+aggregate with sum(rate(...)) across workers. A worker that stops publishing drops out after
+METRICS_WORKER_TTL seconds. Set METRICS_TOKEN to require `Authorization: Bearer <token>` on
+/metrics. With DEBUG or METRICS_QUERY_COUNT_HEADER on, responses also carry X-Query-Count.
+"""
+
+import copy
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.db import connections
+from django.db.backends.signals import connection_created
+from django.http import HttpResponse
+from django.utils.crypto import constant_time_compare
+from rest_framework.renderers import JSONRenderer
+from .cache import get_cache
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+WORKERS_KEY = 'metrics:workers'
+
+_current = ContextVar('request_metrics', default=None)
+
+
+class RequestStats:
+    """Counters of the request being handled; shared by every thread working for it."""
+    __slots__ = ('queries', 'db_seconds', 'serialize_seconds')
+
+    def __init__(self):
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+
+class Histogram:
+    __slots__ = ('buckets', 'counts', 'total', 'count')
+
+    def __init__(self, buckets):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        for index, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+        self.total += value
+        self.count += 1
+
+    def samples(self, name, labels):
+        cumulative = 0
+        for bound, count in zip(self.buckets, self.counts):
+            cumulative += count
+            yield f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}'
+        yield f'{name}_bucket{{{labels},le="+Inf"}} {self.count}'
+        yield f'{name}_sum{{{labels}}} {self.total}'
+        yield f'{name}_count{{{labels}}} {self.count}'
+
+
+class EndpointMetrics:
+    __slots__ = ('latency', 'queries', 'db_seconds', 'serialize_seconds')
+
+    def __init__(self):
+        self.latency = Histogram(LATENCY_BUCKETS)
+        self.queries = Histogram(QUERY_COUNT_BUCKETS)
+        self.db_seconds = 0.0
+        self.serialize_seconds = 0.0
+
+
+class Registry:
+    """This worker's per-endpoint metrics keyed by (view, action, method, status)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._endpoints = {}
+        self._published = None
+
+    def observe(self, key, seconds, stats):
+        with self._lock:
+            endpoint = self._endpoints.get(key)
+            if endpoint is None:
+                endpoint = self._endpoints[key] = EndpointMetrics()
+            endpoint.latency.observe(seconds)
+            endpoint.queries.observe(stats.queries)
+            endpoint.db_seconds += stats.db_seconds
+            endpoint.serialize_seconds += stats.serialize_seconds
+
+    def snapshot(self):
+        with self._lock:
+            return copy.deepcopy(self._endpoints)
+
+    def publish_due(self):
+        """True at most once per METRICS_PUBLISH_INTERVAL seconds (and on the first call)."""
+        now = time.monotonic()
+        with self._lock:
+            if self._published is not None and now - self._published < settings.METRICS_PUBLISH_INTERVAL:
+                return False
+            self._published = now
+            return True
+
+    def clear(self):
+        with self._lock:
+            self._endpoints.clear()
+            self._published = None
+
+
+def render(workers):
+    """The Prometheus text for `workers`, a mapping of worker id to its endpoints' metrics."""
+    series = sorted(
+        (f'{_labels(key)},worker="{worker}"', endpoint)
+        for worker, endpoints in workers.items() for key, endpoint in endpoints.items()
+    )
+    lines = [
+        '# HELP http_request_duration_seconds Request latency per view action.',
+        '# TYPE http_request_duration_seconds histogram',
+    ]
+    for labels, endpoint in series:
+        lines.extend(endpoint.latency.samples('http_request_duration_seconds', labels))
+    lines += [
+        '# HELP http_request_db_queries Database queries per request.',
+        '# TYPE http_request_db_queries histogram',
+    ]
+    for labels, endpoint in series:
+        lines.extend(endpoint.queries.samples('http_request_db_queries', labels))
+    for name, attr, help_text in (
+        ('http_request_db_seconds_total', 'db_seconds', 'Time spent executing database queries.'),
+        ('http_request_serialize_seconds_total', 'serialize_seconds', 'Time spent serializing and rendering.'),
+    ):
+        lines += [f'# HELP {name} {help_text}', f'# TYPE {name} counter']
+        lines.extend(f'{name}{{{labels}}} {getattr(endpoint, attr)}' for labels, endpoint in series)
+    return '\n'.join(lines) + '\n'
+
+
+def _labels(key):
+    view, action, method, status = key
+    return f'view="{view}",action="{action}",method="{method}",status="{status}"'
+
+
+def worker_id():
+    # Read per call: a worker forked after this module was imported has its own pid.
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _worker_key(worker):
+    return f'metrics:worker:{worker}'
+
+
+def publish():
+    """Store this worker's snapshot in the shared cache and make sure the worker is listed there."""
+    cache, worker = get_cache(), worker_id()
+    cache.set(_worker_key(worker), registry.snapshot(), timeout=settings.METRICS_WORKER_TTL)
+    workers = cache.get(WORKERS_KEY) or []
+    if worker not in workers:
+        # Racing workers may drop each other from the list; each re-adds itself on its next publish.
+        cache.set(WORKERS_KEY, [*workers, worker], timeout=None)
+
+
+def collect():
+    """Every live worker's published snapshot by worker id; workers whose snapshot expired are unlisted."""
+    cache = get_cache()
+    workers = cache.get(WORKERS_KEY) or []
+    snapshots = cache.get_many([_worker_key(worker) for worker in workers])
+    live = {worker: snapshots[_worker_key(worker)] for worker in workers if _worker_key(worker) in snapshots}
+    if len(live) < len(workers):
+        cache.set(WORKERS_KEY, list(live), timeout=None)
+    return live
+
+
+registry = Registry()
+
+
+def _record_query(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.queries += 1
+        stats.db_seconds += time.perf_counter() - start
+
+
+def _install(connection):
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _install(connection)
+
+
+connection_created.connect(_on_connection_created, dispatch_uid='metrics_execute_wrapper')
+
+
+@contextmanager
+def timed_serialization():
+    """Add the enclosed block's duration to the current request's serialization time."""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        stats.serialize_seconds += time.perf_counter() - start
+
+
+class TimedJSONRenderer(JSONRenderer):
+    """JSONRenderer that reports its encoding time as serialization time."""
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        with timed_serialization():
+            return super().render(data, accepted_media_type, renderer_context)
+
+
+def _endpoint(request, response):
+    match = request.resolver_match
+    if match is None:
+        return 'unmatched', '', request.method, response.status_code
+    view_class = getattr(match.func, 'cls', None)
+    if view_class is None:
+        return match.view_name or match.func.__name__, '', request.method, response.status_code
+    actions = getattr(match.func, 'actions', None) or {}
+    action = actions.get(request.method.lower(), request.method.lower())
+    return view_class.__name__, action, request.method, response.status_code
+
+
+class MetricsMiddleware:
+    """Time every request and attribute its queries and serialization to the resolved view action."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.query_count_header = settings.DEBUG or getattr(settings, 'METRICS_QUERY_COUNT_HEADER', False)
+        for connection in connections.all(initialized_only=True):
+            _install(connection)
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        stats, start = RequestStats(), time.perf_counter()
+        token = _current.set(stats)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        response = self._finish(request, response, stats, start)
+        if registry.publish_due():
+            publish()
+        return response
+
+    async def __acall__(self, request):
+        stats, start = RequestStats(), time.perf_counter()
+        token = _current.set(stats)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        response = self._finish(request, response, stats, start)
+        if registry.publish_due():
+            await sync_to_async(publish)()
+        return response
+
+    def _finish(self, request, response, stats, start):
+        if request.path != '/metrics':
+            registry.observe(_endpoint(request, response), time.perf_counter() - start, stats)
+        if self.query_count_header:
+            response['X-Query-Count'] = str(stats.queries)
+        return response
+
+
+def metrics_view(request):
+    """Serve every worker's metrics in the Prometheus text exposition format."""
+    token = getattr(settings, 'METRICS_TOKEN', '')
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse(status=401)
+    publish()  # this worker's own series as of now
+    return HttpResponse(render(collect()), content_type=CONTENT_TYPE)
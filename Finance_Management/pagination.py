@@ -0,0 +1,128 @@
+"""
+Keyset (cursor) pagination shared by the API ViewSets.
+
+Pages are selected with an indexed ``WHERE (a, b) > (x, y)`` predicate instead of
+OFFSET, so each page costs the same no matter how deep the client has scrolled.
+The body stays a plain JSON list; the next cursor travels in response headers.
+"""
+
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import ValidationError
+from rest_framework.pagination import BasePagination, _positive_int
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """
+    Cursor pagination over a fixed ordering.
+    - `ordering` must end with a unique column (normally 'id') so cursors are stable.
+    - A '-' prefix makes a column descending; annotations (e.g. a search rank) may be used too.
+    - The cursor is an opaque base64 token holding the last row's ordering values.
+    - The next page is advertised through the `X-Next-Cursor` and `Link` headers.
+    """
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'limit'
+    page_size = 100
+    max_page_size = 1000
+
+    def __init__(self, ordering=('id',)):
+        self.ordering = tuple(ordering)
+        self.field_names = tuple(name.lstrip('-') for name in self.ordering)
+        self.next_cursor = None
+        self.request = None
+
+    def get_page_size(self, request):
+        try:
+            return _positive_int(
+                request.query_params[self.page_size_query_param],
+                strict=True,
+                cutoff=self.max_page_size,
+            )
+        except (KeyError, ValueError):
+            return self.page_size
+
+    def encode_cursor(self, instance):
+        """Encode the ordering values of a model instance or a values() dict."""
+        values = []
+        for field_name in self.field_names:
+            value = instance[field_name] if isinstance(instance, dict) else getattr(instance, field_name)
+            values.append(value.isoformat() if hasattr(value, 'isoformat') else value)
+        return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+    def decode_cursor(self, queryset, token):
+        """Turn a cursor token back into typed ordering values."""
+        try:
+            values = json.loads(urlsafe_b64decode(token.encode()))
+            if len(values) != len(self.ordering):
+                raise ValueError
+            return [self._to_python(queryset, field_name, value) for field_name, value in zip(self.field_names, values)]
+        except Exception:
+            raise ValidationError({self.cursor_query_param: 'Invalid cursor'})
+
+    @staticmethod
+    def _to_python(queryset, field_name, value):
+        try:
+            return queryset.model._meta.get_field(field_name).to_python(value)
+        except FieldDoesNotExist:
+            if not isinstance(value, (int, float)):
+                raise ValueError(field_name)
+            return value
+
+    def get_keyset_filter(self, values):
+        """
+        Build `(f1, f2, ...) > (v1, v2, ...)` as an OR of prefix-equal comparisons,
+        which Postgres resolves with a single range scan on a matching index.
+        Descending columns compare with `<` instead.
+        """
+        condition = Q()
+        for position, (ordering, field_name) in enumerate(zip(self.ordering, self.field_names)):
+            lookup = 'lt' if ordering.startswith('-') else 'gt'
+            term = Q(**{f'{field_name}__{lookup}': values[position]})
+            for prefix_name, prefix_value in zip(self.field_names[:position], values[:position]):
+                term &= Q(**{prefix_name: prefix_value})
+            condition |= term
+        return condition
+
+    def get_page_queryset(self, queryset, request):
+        """Order, apply the cursor and slice one row past the page to detect a next page."""
+        self.request = request
+        page_size = self.get_page_size(request)
+        queryset = queryset.order_by(*self.ordering)
+
+        token = request.query_params.get(self.cursor_query_param)
+        if token:
+            queryset = queryset.filter(self.get_keyset_filter(self.decode_cursor(queryset, token)))
+        return queryset[:page_size + 1], page_size
+
+    def trim_page(self, page, page_size):
+        if len(page) > page_size:
+            page = page[:page_size]
+            self.next_cursor = self.encode_cursor(page[-1])
+        return page
+
+    def paginate_queryset(self, queryset, request, view=None):
+        queryset, page_size = self.get_page_queryset(queryset, request)
+        return self.trim_page(list(queryset), page_size)
+
+    async def apaginate_queryset(self, queryset, request, view=None):
+        """paginate_queryset for async views, fetching the page with async iteration."""
+        queryset, page_size = self.get_page_queryset(queryset, request)
+        return self.trim_page([row async for row in queryset], page_size)
+
+    def get_next_link(self):
+        if self.next_cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.next_cursor)
+
+    def get_paginated_response(self, data):
+        headers = {}
+        if self.next_cursor is not None:
+            headers['X-Next-Cursor'] = self.next_cursor
+            headers['Link'] = f'<{self.get_next_link()}>; rel="next"'
+        return Response(data, headers=headers)
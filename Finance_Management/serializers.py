@@ -0,0 +1,46 @@
+"""
+Shared serializer helpers.
+
+Provides field projection (`?fields=a,b`) for list endpoints so clients can
+request only the columns they need.
+"""
+
+from rest_framework import serializers
+from .metrics import timed_serialization
+
+
+class DynamicFieldsModelSerializer(serializers.ModelSerializer):
+    """
+    ModelSerializer that accepts an optional `fields` argument.
+    - Fields not listed are dropped from the output.
+    - `fields=None` keeps the serializer's full Meta.fields.
+    - Output time is reported to the request metrics as serialization time.
+    """
+
+    def __init__(self, *args, **kwargs):
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    def to_representation(self, instance):
+        with timed_serialization():
+            return super().to_representation(instance)
+
+    @classmethod
+    def get_requested_fields(cls, request, param='fields'):
+        """
+        Parse `?fields=` from the request.
+        Returns None when absent; raises ValidationError on unknown field names.
+        """
+        raw = request.query_params.get(param)
+        if not raw:
+            return None
+        fields = tuple(dict.fromkeys(name.strip() for name in raw.split(',') if name.strip()))
+        if not fields:
+            raise serializers.ValidationError({param: 'No fields requested'})
+        unknown = [name for name in fields if name not in cls.Meta.fields]
+        if unknown:
+            raise serializers.ValidationError({param: f"Unknown fields: {', '.join(unknown)}"})
+        return fields
@@ -0,0 +1,82 @@
+"""
+Process and connection layout for the production server.
+
+Shared by gunicorn.conf.py and settings_production so the worker count, the
+threads per worker and the per-process database pool are always derived from the
+same numbers. Every value can be overridden from the environment:
+
+- WEB_WORKER_CLASS: 'gthread' (WSGI, default) or 'uvicorn' (ASGI)
+- WEB_WORKERS: processes, default 2 * CPUs + 1
+- WEB_THREADS: threads per gthread worker, default 4
+- DB_POOL_MIN_SIZE / DB_POOL_MAX_SIZE: psycopg pool per process; max defaults to
+  the threads that can hold a connection at once
+- DB_MAX_CONNECTIONS: the server's max_connections, used by the self-check
+
+Importing this module must not import Django: gunicorn reads it before the app loads.
+"""
+
+import os
+
+
+def cpu_count():
+    """CPUs this process may run on (respects affinity/cgroup pinning where the OS exposes it)."""
+    if hasattr(os, 'sched_getaffinity'):
+        return len(os.sched_getaffinity(0))
+    return os.cpu_count() or 1
+
+
+def worker_layout():
+    cpus = cpu_count()
+    worker_class = os.getenv('WEB_WORKER_CLASS', 'gthread')
+    workers = int(os.getenv('WEB_WORKERS', 2 * cpus + 1))
+    # Under ASGI, sync code (sync views, the ORM behind async views) runs on asgiref's
+    # thread-sensitive executor, so a handful of connections per process is enough.
+    threads = int(os.getenv('WEB_THREADS', 4)) if worker_class == 'gthread' else 1
+    pool_max = int(os.getenv('DB_POOL_MAX_SIZE', threads if worker_class == 'gthread' else 4))
+    pool_min = int(os.getenv('DB_POOL_MIN_SIZE', min(2, pool_max)))
+    return {
+        'cpus': cpus,
+        'worker_class': worker_class,
+        'workers': workers,
+        'threads': threads,
+        'pool_min_size': pool_min,
+        'pool_max_size': pool_max,
+        'max_db_connections': workers * pool_max,
+        'db_max_connections': int(os.getenv('DB_MAX_CONNECTIONS', 100)),
+    }
+
+
+def describe(layout):
+    return (
+        "{workers} {worker_class} worker(s) x {threads} thread(s) on {cpus} CPU(s); "
+        "DB pool {pool_min_size}-{pool_max_size} per worker, "
+        "up to {max_db_connections} of {db_max_connections} server connections"
+    ).format(**layout)
+
+
+def self_check(layout, settings):
+    """
+    Compare the worker layout with the effective Django settings.
+    Returns a list of (level, message) tuples; level is 'info', 'warning' or 'error'.
+    """
+    database = settings.DATABASES['default']
+    pool = database.get('OPTIONS', {}).get('pool')
+    if pool:
+        connections = f"psycopg pool {pool['min_size']}-{pool['max_size']} per worker"
+    else:
+        connections = f"persistent connections (CONN_MAX_AGE={database.get('CONN_MAX_AGE', 0)})"
+    report = [
+        ('info', describe(layout)),
+        ('info', f"DEBUG={settings.DEBUG}; {connections}"),
+    ]
+    if settings.DEBUG:
+        report.append(('error', "DEBUG is on: every query is kept in memory for the life of the worker"))
+    if pool and pool['max_size'] < layout['threads']:
+        report.append(('warning', f"{layout['threads']} threads share {pool['max_size']} pooled connections"))
+    if pool and layout['max_db_connections'] > layout['db_max_connections']:
+        report.append((
+            'error',
+            f"{layout['workers']} workers x {pool['max_size']} connections exceed "
+            f"DB_MAX_CONNECTIONS={layout['db_max_connections']}",
+        ))
+    return report
@@ -43,10 +43,12 @@ INSTALLED_APPS = [
     "django.contrib.sessions",
     "django.contrib.messages",
     "django.contrib.staticfiles",
+    "django.contrib.postgres",
     # apps
     "accounts.apps.AccountsConfig",
     "budgets.apps.BudgetsConfig",
     "transactions.apps.TransactionsConfig",
+    "jobs.apps.JobsConfig",
     # Packeges
     "rest_framework",
     "rest_framework_simplejwt",
@@ -55,6 +57,7 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    "Finance_Management.metrics.MetricsMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -101,6 +104,96 @@ DATABASES = {
 
 
 
+# Cache
+# Read-only API responses are cached per user (see Finance_Management/cache.py).
+# Set REDIS_URL to share the cache between processes; otherwise each process uses local memory,
+# which only suits a single process (settings_production requires REDIS_URL).
+
+if os.getenv("REDIS_URL"):
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': os.getenv("REDIS_URL"),
+        }
+    }
+else:
+    CACHES = {
+        'default': {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        }
+    }
+
+API_CACHE_ALIAS = 'default'
+API_CACHE_TIMEOUT = int(os.getenv("API_CACHE_TIMEOUT", 300))
+
+
+
+# Async authentication endpoints (accounts/async_views.py)
+# PBKDF2 runs on a bounded thread pool; requests beyond workers + pending get 503.
+# AUTH_RATE_LIMITS: scope -> (requests, window seconds) per client IP, on the sync endpoints too.
+# TRUSTED_PROXY_COUNT: proxies in front of the app; the client IP is then read from X-Forwarded-For.
+
+PASSWORD_HASH_WORKERS = int(os.getenv("PASSWORD_HASH_WORKERS", 4))
+PASSWORD_HASH_MAX_PENDING = int(os.getenv("PASSWORD_HASH_MAX_PENDING", 64))
+AUTH_RATE_LIMITS = {
+    'login': (20, 60),
+    'register': (10, 60),
+}
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 0))
+
+
+
+# Request metrics (Finance_Management/metrics.py), served at /metrics.
+# METRICS_TOKEN: when set, /metrics requires "Authorization: Bearer <token>" (required by settings_production).
+# METRICS_QUERY_COUNT_HEADER: add X-Query-Count to every response (always on with DEBUG).
+# METRICS_PUBLISH_INTERVAL: seconds between a worker's snapshots to the shared cache, which any
+# worker serves from; METRICS_WORKER_TTL: seconds after its last snapshot that a worker drops out.
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+METRICS_QUERY_COUNT_HEADER = os.getenv("METRICS_QUERY_COUNT_HEADER", "off") == "on"
+METRICS_PUBLISH_INTERVAL = float(os.getenv("METRICS_PUBLISH_INTERVAL", 5))
+METRICS_WORKER_TTL = int(os.getenv("METRICS_WORKER_TTL", 600))
+
+
+
+
+# Bank statement imports (transactions/imports.py)
+# STATEMENT_IMPORT_CHUNK_SIZE: rows per database transaction (and per resumable step).
+# STATEMENT_IMPORT_MAX_BYTES: largest accepted upload.
+
+STATEMENT_IMPORT_CHUNK_SIZE = int(os.getenv("STATEMENT_IMPORT_CHUNK_SIZE", 5000))
+STATEMENT_IMPORT_MAX_BYTES = int(os.getenv("STATEMENT_IMPORT_MAX_BYTES", 200 * 1024 * 1024))
+
+
+
+
+# Background jobs (jobs/queue.py), run by `manage.py run_workers`.
+# JOB_RETRY_DELAY: seconds before the first retry, doubled for every later one.
+# JOB_HEARTBEAT_INTERVAL: seconds between the refreshes of a running job's lock by its worker.
+# JOB_TIMEOUT: seconds without a heartbeat after which a job's worker is presumed dead and the job requeued.
+
+JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+JOB_RETRY_DELAY = int(os.getenv("JOB_RETRY_DELAY", 30))
+JOB_HEARTBEAT_INTERVAL = float(os.getenv("JOB_HEARTBEAT_INTERVAL", 30))
+JOB_TIMEOUT = int(os.getenv("JOB_TIMEOUT", 300))
+JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", 1.0))
+JOB_STALE_CHECK_INTERVAL = int(os.getenv("JOB_STALE_CHECK_INTERVAL", 60))
+JOB_WORKER_CONCURRENCY = int(os.getenv("JOB_WORKER_CONCURRENCY", 2))
+JOB_WORKER_MODE = os.getenv("JOB_WORKER_MODE", "process")
+
+
+
+
+# Range partitioning of transactions by date on PostgreSQL (transactions/partitioning.py).
+# TRANSACTION_PARTITIONING: "month", "year" or "" (one plain table). Applied, and changed
+# later, with `manage.py partition_transactions --convert`; migrations always create a plain table.
+# TRANSACTION_PARTITIONS_AHEAD: future periods kept created by `manage.py partition_transactions`.
+
+TRANSACTION_PARTITIONING = os.getenv("TRANSACTION_PARTITIONING", "")
+TRANSACTION_PARTITIONS_AHEAD = int(os.getenv("TRANSACTION_PARTITIONS_AHEAD", 3))
+
+
+
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
 
@@ -142,6 +235,11 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 
+# Uploaded files (bank statements, transactions/imports.py)
+
+MEDIA_ROOT = os.getenv("MEDIA_ROOT", BASE_DIR / "media")
+MEDIA_URL = "media/"
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
@@ -151,7 +249,11 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "accounts.authentication.ClaimsJWTAuthentication",
+    ),
+    "DEFAULT_RENDERER_CLASSES": (
+        "Finance_Management.metrics.TimedJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
     ),
     'DEFAULT_SCHEMA_CLASS': 'drf_spectacular.openapi.AutoSchema',
 }
@@ -166,6 +268,7 @@ SIMPLE_JWT = {
     'SLIDING_TOKEN_LIFETIME_LATE_USER': timedelta(days=30),
     'BLACKLIST_AFTER_ROTATION': True,
     'ROTATE_REFRESH_TOKENS': False,
+    'TOKEN_OBTAIN_SERIALIZER': 'accounts.serializers.UserTokenObtainPairSerializer',
 
 }
 
@@ -0,0 +1,78 @@
+"""
+Production settings for Finance_Management.
+
+Loaded with DJANGO_SETTINGS_MODULE=Finance_Management.settings_production (the
+Docker image default). Builds on settings.py and:
+- turns DEBUG off, which also stops Django from keeping every executed query in memory;
+- pools database connections per process with psycopg 3 (DB_POOL=on, default), or keeps
+  persistent connections with health checks (DB_POOL=off, e.g. behind PgBouncer);
+- requires METRICS_TOKEN, so /metrics is never served unauthenticated;
+- trusts one proxy's X-Forwarded-For for client IPs (TRUSTED_PROXY_COUNT);
+- requires REDIS_URL, so every worker shares the response cache, its per-user generations
+  and the metrics snapshots /metrics serves;
+- silences SQL logging.
+The pool is sized from the gunicorn worker layout in Finance_Management/server.py.
+"""
+
+import os
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .settings import *  # noqa: F401,F403
+from .settings import DATABASES
+from .server import worker_layout
+
+DEBUG = False
+
+SECRET_KEY = os.environ["DJANGO_SECRET_KEY"]
+
+# /metrics exposes per-route traffic and database timings.
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "")
+if not METRICS_TOKEN:
+    raise ImproperlyConfigured("METRICS_TOKEN must be set in production: /metrics is only served with it.")
+
+# A per-process cache would leave the other workers serving responses a write has invalidated.
+if not os.getenv("REDIS_URL"):
+    raise ImproperlyConfigured("REDIS_URL must be set in production: the response cache is shared by every worker.")
+
+ALLOWED_HOSTS = [host for host in os.getenv("DJANGO_ALLOWED_HOSTS", "*").split(",") if host]
+
+SECURE_PROXY_SSL_HEADER = ("HTTP_X_FORWARDED_PROTO", "https")
+# Behind the TLS-terminating proxy: rate limits key on the client it forwards for, not on it.
+TRUSTED_PROXY_COUNT = int(os.getenv("TRUSTED_PROXY_COUNT", 1))
+
+
+# Database connections
+
+LAYOUT = worker_layout()
+
+if os.getenv("DB_POOL", "on") == "on":
+    # psycopg_pool keeps connections open and checks them on checkout; CONN_MAX_AGE must stay 0.
+    DATABASES["default"]["CONN_MAX_AGE"] = 0
+    DATABASES["default"]["OPTIONS"] = {
+        "pool": {
+            "min_size": LAYOUT["pool_min_size"],
+            "max_size": LAYOUT["pool_max_size"],
+            "timeout": float(os.getenv("DB_POOL_TIMEOUT", 10)),
+            "max_idle": float(os.getenv("DB_POOL_MAX_IDLE", 300)),
+        },
+    }
+else:
+    DATABASES["default"]["CONN_MAX_AGE"] = int(os.getenv("DB_CONN_MAX_AGE", 60))
+    DATABASES["default"]["CONN_HEALTH_CHECKS"] = True
+
+
+# Logging: no SQL, warnings and up to stderr.
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "root": {"handlers": ["console"], "level": "WARNING"},
+    "loggers": {
+        "django.db.backends": {"handlers": [], "level": "ERROR", "propagate": False},
+        "Finance_Management.server": {"handlers": ["console"], "level": "INFO", "propagate": False},
+    },
+}
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.urls import path, include
+from Finance_Management.metrics import metrics_view
 from drf_spectacular.views import SpectacularAPIView, SpectacularRedocView, SpectacularSwaggerView
 
 urlpatterns = [
@@ -7,6 +8,10 @@ urlpatterns = [
     path("api/auth/", include("accounts.urls", namespace="accounts")),
     path("api/budgets/", include("budgets.urls", namespace="budgets")),
     path("api/transactions/", include("transactions.urls", namespace="transactions")),
+    path("api/jobs/", include("jobs.urls", namespace="jobs")),
+    path("api/async/budgets/", include("budgets.async_urls", namespace="async_budgets")),
+    path("api/async/transactions/", include("transactions.async_urls", namespace="async_transactions")),
+    path("metrics", metrics_view, name="metrics"),
     path('api/schema/', SpectacularAPIView.as_view(), name='schema'),
     path('api/schema/swagger/', SpectacularSwaggerView.as_view(url_name='schema'), name='swagger-ui'),
     path('api/schema/redoc/', SpectacularRedocView.as_view(url_name='schema'), name='redoc'),
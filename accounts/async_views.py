@@ -0,0 +1,83 @@
+"""
+Async variants of the register and login endpoints.
+
+Served natively under ASGI (Finance_Management/asgi.py). The event loop only parses
+the request and applies the per-IP rate limit; serializer validation, which is where
+PBKDF2 runs (set_password on register, authenticate on login), happens on the bounded
+password pool. Responses match UserRegisterAPIView and TokenObtainPairView.
+"""
+
+import json
+
+from django.http import JsonResponse
+from django.views.decorators.csrf import csrf_exempt
+from django.views.decorators.http import require_POST
+from rest_framework import status
+from rest_framework.exceptions import APIException
+from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from .pool import PoolSaturated, get_password_pool
+from .ratelimit import acheck_rate
+from .serializers import UserRegisterSerializers, UserTokenObtainPairSerializer
+
+
+def _parse_body(request):
+    if request.content_type == 'application/json':
+        try:
+            data = json.loads(request.body or b'{}')
+        except ValueError:
+            return None
+        return data if isinstance(data, dict) else None
+    return request.POST.dict()
+
+
+def _register(data):
+    serializer = UserRegisterSerializers(data=data)
+    if not serializer.is_valid():
+        return serializer.errors, status.HTTP_400_BAD_REQUEST
+    serializer.create(serializer.validated_data)
+    return serializer.data, status.HTTP_201_CREATED
+
+
+def _login(data):
+    serializer = UserTokenObtainPairSerializer(data=data)
+    try:
+        if not serializer.is_valid():
+            return serializer.errors, status.HTTP_400_BAD_REQUEST
+    except TokenError as e:
+        exc = InvalidToken(e.args[0])
+        return {'detail': exc.detail}, exc.status_code
+    except APIException as exc:
+        return {'detail': exc.detail}, exc.status_code
+    return serializer.validated_data, status.HTTP_200_OK
+
+
+async def _offload(request, scope, handler):
+    retry_after = await acheck_rate(request, scope)
+    if retry_after:
+        response = JsonResponse({'detail': 'Too many requests'}, status=status.HTTP_429_TOO_MANY_REQUESTS)
+        response['Retry-After'] = str(retry_after)
+        return response
+    data = _parse_body(request)
+    if data is None:
+        return JsonResponse({'detail': 'JSON parse error'}, status=status.HTTP_400_BAD_REQUEST)
+    try:
+        body, status_code = await get_password_pool().run(handler, data)
+    except PoolSaturated:
+        response = JsonResponse({'detail': 'Server busy, try again'}, status=status.HTTP_503_SERVICE_UNAVAILABLE)
+        response['Retry-After'] = '1'
+        return response
+    return JsonResponse(body, status=status_code)
+
+
+@csrf_exempt
+@require_POST
+async def register(request):
+    """Create a user; 429 over the per-IP limit, 503 when the password pool is saturated."""
+    return await _offload(request, 'register', _register)
+
+
+@csrf_exempt
+@require_POST
+async def login(request):
+    """Issue a JWT pair; 429 over the per-IP limit, 503 when the password pool is saturated."""
+    return await _offload(request, 'login', _login)
@@ -0,0 +1,91 @@
+"""
+JWT authentication that avoids the per-request User SELECT.
+
+Access tokens carry `username` and `is_active` claims (see UserTokenObtainPairSerializer),
+so the request user is a TokenUser built from the claims. The only database check left,
+whether the account is still active and the token not revoked, is answered from a small
+in-process LRU whose entries live for USER_STATUS_TTL seconds.
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from rest_framework_simplejwt.utils import get_md5_hash_password
+from .models import TokenUser, User
+
+USER_STATUS_TTL = 30
+USER_STATUS_MAXSIZE = 10000
+
+
+class UserStatusCache:
+    """
+    Thread-safe LRU of user id -> (is_active, password hash digest) with a per-entry TTL.
+    A miss costs one `SELECT is_active, password` by primary key.
+    """
+
+    def __init__(self, maxsize=USER_STATUS_MAXSIZE, ttl=USER_STATUS_TTL):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, user_id):
+        """Return (is_active, password_digest), or None when the user does not exist."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(user_id)
+            if entry is not None and entry[0] > now:
+                self._entries.move_to_end(user_id)
+                return entry[1]
+
+        row = User.objects.filter(pk=user_id).values_list('is_active', 'password').first()
+        status = None if row is None else (row[0], get_md5_hash_password(row[1]))
+        with self._lock:
+            self._entries[user_id] = (now + self.ttl, status)
+            self._entries.move_to_end(user_id)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+        return status
+
+    def forget(self, user_id):
+        with self._lock:
+            self._entries.pop(user_id, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+user_status = UserStatusCache()
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWTAuthentication returning a claims-backed TokenUser.
+    Tokens issued before the `username` claim existed fall back to the regular User lookup.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = validated_token[api_settings.USER_ID_CLAIM]
+        except KeyError:
+            raise InvalidToken(_("Token contained no recognizable user identification"))
+        username = validated_token.get('username')
+        if username is None:
+            return super().get_user(validated_token)
+
+        status = user_status.get(user_id)
+        if status is None:
+            raise AuthenticationFailed(_("User not found"), code="user_not_found")
+        is_active, password_digest = status
+        if not is_active:
+            raise AuthenticationFailed(_("User is inactive"), code="user_inactive")
+        if api_settings.CHECK_REVOKE_TOKEN and validated_token.get(api_settings.REVOKE_TOKEN_CLAIM) != password_digest:
+            raise AuthenticationFailed(_("The user's password has been changed."), code="password_changed")
+
+        return TokenUser.from_claims(user_id, username, is_active)
@@ -28,3 +28,23 @@ class User(AbstractBaseUser):
     @property
     def is_staff(self):
         return self.is_superuser
+
+
+class TokenUser(User):
+    """
+    User built from JWT claims (id, username, is_active) without a SELECT.
+    Every other field is deferred; touching any of them loads all of them in one query.
+    """
+
+    class Meta:
+        proxy = True
+
+    @classmethod
+    def from_claims(cls, user_id, username, is_active):
+        return cls.from_db(None, ['id', 'username', 'is_active'], [user_id, username, is_active])
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        deferred = self.get_deferred_fields()
+        if fields is not None and deferred and set(fields) <= deferred:
+            fields = deferred
+        super().refresh_from_db(using=using, fields=fields, from_queryset=from_queryset)
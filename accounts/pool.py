@@ -0,0 +1,65 @@
+"""
+Bounded worker pool for password hashing.
+
+PBKDF2 (hashlib releases the GIL while it runs) is moved off the event loop into a
+fixed number of threads. Work beyond the pool's workers plus its pending queue is
+rejected immediately with PoolSaturated instead of queueing without bound, so a
+login burst degrades into fast 503s rather than unbounded latency.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections
+
+
+class PoolSaturated(Exception):
+    """Raised when every worker is busy and the pending queue is full."""
+
+
+class BoundedExecutor:
+    """ThreadPoolExecutor with a hard cap on running + pending work items."""
+
+    def __init__(self, max_workers, max_pending, thread_name_prefix='password-hash'):
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix=thread_name_prefix)
+        self._slots = threading.BoundedSemaphore(max_workers + max_pending)
+
+    async def run(self, fn, *args, **kwargs):
+        """Run `fn` on a worker thread and await its result; raise PoolSaturated when full."""
+        if not self._slots.acquire(blocking=False):
+            raise PoolSaturated
+        try:
+            future = self._executor.submit(_with_db_cleanup, fn, *args, **kwargs)
+        except BaseException:
+            self._slots.release()
+            raise
+        future.add_done_callback(lambda _: self._slots.release())
+        return await asyncio.wrap_future(future)
+
+
+def _with_db_cleanup(fn, *args, **kwargs):
+    # Pool threads outlive requests, so apply CONN_MAX_AGE around each job like a request would.
+    close_old_connections()
+    try:
+        return fn(*args, **kwargs)
+    finally:
+        close_old_connections()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_password_pool():
+    """The process-wide pool, sized by PASSWORD_HASH_WORKERS and PASSWORD_HASH_MAX_PENDING."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = BoundedExecutor(
+                    max_workers=getattr(settings, 'PASSWORD_HASH_WORKERS', 4),
+                    max_pending=getattr(settings, 'PASSWORD_HASH_MAX_PENDING', 64),
+                )
+    return _pool
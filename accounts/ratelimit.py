@@ -0,0 +1,91 @@
+"""
+Per-IP fixed-window rate limiting for the authentication endpoints.
+
+Counters live in the Django cache (shared across processes when it is Redis), so
+the limit holds for the whole deployment, not per worker.
+
+Behind proxies, REMOTE_ADDR is the nearest proxy's address. With TRUSTED_PROXY_COUNT
+set to the number of proxies in front of the app, the client is the address the
+outermost of them appended to X-Forwarded-For; entries further left are whatever the
+client sent and are never trusted.
+"""
+
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from rest_framework.throttling import BaseThrottle
+
+
+def get_client_ip(request):
+    trusted = getattr(settings, 'TRUSTED_PROXY_COUNT', 0)
+    if trusted:
+        forwarded = [address.strip() for address in request.META.get('HTTP_X_FORWARDED_FOR', '').split(',')]
+        forwarded = [address for address in forwarded if address]
+        if len(forwarded) >= trusted:
+            return forwarded[-trusted]
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def _window(request, scope):
+    """(key, allowed requests, window seconds, seconds left) of the client's current window, or None without a limit."""
+    limit = getattr(settings, 'AUTH_RATE_LIMITS', {}).get(scope)
+    if not limit:
+        return None
+    requests, window = limit
+    now = int(time.time())
+    window_start = now - now % window
+    key = f'ratelimit:{scope}:{get_client_ip(request)}:{window_start}'
+    return key, requests, window, window_start + window - now
+
+
+def _cache():
+    return caches[getattr(settings, 'API_CACHE_ALIAS', 'default')]
+
+
+def check_rate(request, scope):
+    """
+    Count one hit for the client's IP in `scope`.
+    Returns 0 when allowed, otherwise the seconds until the current window ends.
+    AUTH_RATE_LIMITS maps a scope to (requests, window_seconds); scopes without a limit always pass.
+    """
+    window = _window(request, scope)
+    if window is None:
+        return 0
+    key, requests, seconds, left = window
+    cache = _cache()
+    cache.add(key, 0, timeout=seconds)
+    try:
+        count = cache.incr(key)
+    except ValueError:
+        # The key expired between add and incr: this is the first hit of a new window.
+        cache.set(key, 1, timeout=seconds)
+        count = 1
+    return left if count > requests else 0
+
+
+async def acheck_rate(request, scope):
+    """Async counterpart of check_rate."""
+    window = _window(request, scope)
+    if window is None:
+        return 0
+    key, requests, seconds, left = window
+    cache = _cache()
+    await cache.aadd(key, 0, timeout=seconds)
+    try:
+        count = await cache.aincr(key)
+    except ValueError:
+        await cache.aset(key, 1, timeout=seconds)
+        count = 1
+    return left if count > requests else 0
+
+
+class AuthRateThrottle(BaseThrottle):
+    """Apply check_rate with the view's `rate_scope` to DRF views (the sync register and login)."""
+
+    def allow_request(self, request, view):
+        self.retry_after = check_rate(request, view.rate_scope)
+        return not self.retry_after
+
+    def wait(self):
+        return self.retry_after
@@ -1,6 +1,7 @@
 from rest_framework import serializers
 from .models import User
 from django.contrib.auth import authenticate
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
 
 class UserRegisterSerializers(serializers.ModelSerializer):
 
@@ -46,4 +47,14 @@ class UserLoginSerializers(serializers.Serializer):
     # def validate(self, data):
     #     if data['password'] != data['password2']:
     #         raise serializers.ValidationError('password must match')
-    #     return data
\ No newline at end of file
+    #     return data
+
+class UserTokenObtainPairSerializer(TokenObtainPairSerializer):
+    """Adds the claims ClaimsJWTAuthentication builds the request user from."""
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['is_active'] = user.is_active
+        return token
@@ -73,3 +73,101 @@ def test_user_username_admin(api_client):
     assert response.status_code == status.HTTP_400_BAD_REQUEST
     assert User.objects.count() == 0
     assert response.data['username'][0] == 'username cant be admin'
+
+
+@pytest.mark.django_db
+def test_jwt_claims_authentication(api_client, user_data, django_assert_num_queries):
+    from accounts.authentication import user_status
+    from accounts.models import User
+    User.objects.create_user(**user_data)
+    response = api_client.post(
+        reverse('accounts:token_obtain_pair'),
+        {'username': user_data['username'], 'password': user_data['password']},
+        format='json'
+    )
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    api_client.credentials(HTTP_AUTHORIZATION=f"Bearer {response.data['access']}")
+    user_status.clear()
+
+    url = reverse('budgets:budget-list')
+    assert api_client.get(url).status_code == status.HTTP_200_OK
+    # The status LRU and the response cache are warm: no User SELECT, no Budget query.
+    with django_assert_num_queries(0):
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+
+    User.objects.filter(username=user_data['username']).update(is_active=False)
+    user_status.clear()
+    assert api_client.get(url).status_code == status.HTTP_401_UNAUTHORIZED
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_register_and_login(api_client, user_data, settings):
+    from django.core.cache import cache
+    cache.clear()
+    settings.AUTH_RATE_LIMITS = {'login': (2, 60)}
+
+    response = api_client.post(reverse('accounts:async_register'), user_data, format='json')
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.content}"
+    assert 'password' not in response.json()
+
+    url = reverse('accounts:async_login')
+    credentials = {'username': user_data['username'], 'password': user_data['password']}
+    response = api_client.post(url, credentials, format='json')
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.content}"
+    assert {'access', 'refresh'} <= set(response.json())
+
+    response = api_client.post(url, {**credentials, 'password': 'wrong'}, format='json')
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED
+
+    response = api_client.post(url, credentials, format='json')
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert 'Retry-After' in response
+
+
+@pytest.mark.django_db(transaction=True)
+def test_async_login_pool_saturated(api_client, user_data, monkeypatch):
+    from accounts import async_views
+    from accounts.pool import PoolSaturated
+    from django.core.cache import cache
+    cache.clear()
+
+    class FullPool:
+        async def run(self, fn, *args):
+            raise PoolSaturated
+
+    monkeypatch.setattr(async_views, 'get_password_pool', lambda: FullPool())
+    response = api_client.post(reverse('accounts:async_login'), user_data, format='json')
+    assert response.status_code == status.HTTP_503_SERVICE_UNAVAILABLE
+
+
+@pytest.mark.django_db(transaction=True)
+def test_sync_login_shares_the_rate_limit(api_client, user_data, settings):
+    from accounts.models import User
+    from django.core.cache import cache
+    cache.clear()
+    settings.AUTH_RATE_LIMITS = {'login': (2, 60)}
+    User.objects.create_user(**user_data)
+    credentials = {'username': user_data['username'], 'password': user_data['password']}
+    url = reverse('accounts:token_obtain_pair')
+
+    assert api_client.post(url, credentials, format='json').status_code == status.HTTP_200_OK
+    assert api_client.post(reverse('accounts:async_login'), credentials, format='json').status_code == status.HTTP_200_OK
+    response = api_client.post(url, credentials, format='json')
+    assert response.status_code == status.HTTP_429_TOO_MANY_REQUESTS
+    assert 'Retry-After' in response
+
+
+def test_client_ip_behind_trusted_proxies(settings):
+    from django.test import RequestFactory
+    from accounts.ratelimit import get_client_ip
+
+    request = RequestFactory().post('/', REMOTE_ADDR='10.0.0.2', HTTP_X_FORWARDED_FOR='6.6.6.6, 203.0.113.7, 10.0.0.1')
+    settings.TRUSTED_PROXY_COUNT = 0
+    assert get_client_ip(request) == '10.0.0.2'
+    settings.TRUSTED_PROXY_COUNT = 1
+    assert get_client_ip(request) == '10.0.0.1'
+    settings.TRUSTED_PROXY_COUNT = 2
+    assert get_client_ip(request) == '203.0.113.7', "the spoofable left-most entry is never used"
+    settings.TRUSTED_PROXY_COUNT = 5
+    assert get_client_ip(request) == '10.0.0.2'
@@ -1,11 +1,13 @@
 from django.urls import path
-from . import views
-from rest_framework_simplejwt.views import TokenObtainPairView,TokenRefreshView
+from . import async_views, views
+from rest_framework_simplejwt.views import TokenRefreshView
 
 app_name = "accounts"
 urlpatterns = [
     path('register/',views.UserRegisterAPIView.as_view(),name='register'),
     # path('login/',views.UserLoginAPIView.as_view())
-    path('login/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
+    path('login/', views.UserTokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('async/register/', async_views.register, name='async_register'),
+    path('async/login/', async_views.login, name='async_login'),
 ]
@@ -4,12 +4,16 @@ from rest_framework.response import Response
 from .serializers import UserRegisterSerializers,UserLoginSerializers
 from rest_framework import status
 from rest_framework_simplejwt.tokens import RefreshToken
+from rest_framework_simplejwt.views import TokenObtainPairView
+from .ratelimit import AuthRateThrottle
 
 
 
 
 class UserRegisterAPIView(APIView):
     serializer_class = UserRegisterSerializers
+    throttle_classes = [AuthRateThrottle]
+    rate_scope = 'register'
     def post(self,request):
         ser_data = UserRegisterSerializers(data=request.data)
         if ser_data.is_valid():
@@ -18,6 +22,12 @@ class UserRegisterAPIView(APIView):
         return Response(data=ser_data.errors, status=status.HTTP_400_BAD_REQUEST)
 
 
+class UserTokenObtainPairView(TokenObtainPairView):
+    """TokenObtainPairView under the same per-IP login limit as the async endpoint."""
+    throttle_classes = [AuthRateThrottle]
+    rate_scope = 'login'
+
+
 # class UserLoginAPIView(APIView):
 #     def post(self,request):
 #         ser_data = UserLoginSerializers(data=request.POST)
@@ -0,0 +1,25 @@
+"""
+Benchmarks for the Finance Management API.
+
+Each module is a standalone script run from the project root, e.g.
+``python -m benchmarks.explain_indexes``. They configure Django the same way
+manage.py does and print machine-readable JSON to stdout.
+"""
+
+import json
+import os
+import sys
+
+
+def setup_django():
+    """Configure Django for a standalone benchmark script."""
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "Finance_Management.settings")
+    import django
+
+    django.setup()
+
+
+def emit(report):
+    """Write a benchmark report as JSON to stdout."""
+    json.dump(report, sys.stdout, indent=2, default=str)
+    sys.stdout.write("\n")
@@ -0,0 +1,110 @@
+"""
+Load-test running deployments: requests per second and latency percentiles.
+
+Logs in once per target, then keeps `--concurrency` keep-alive connections busy
+for `--duration` seconds issuing GETs against the list endpoint. Compare the WSGI
+deployment with the ASGI one (docker-compose `web` and `asgi` services):
+
+    python -m benchmarks.api_load --username u --password p \\
+        --target wsgi=http://localhost:8000/api/transactions/ \\
+        --target asgi=http://localhost:8001/api/async/transactions/
+
+Add `--no-cache` to bypass the per-user response cache with a unique query string.
+No Django setup is needed; only the standard library is used.
+"""
+
+import argparse
+import http.client
+import json
+import statistics
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlsplit
+
+from benchmarks import emit
+
+
+def login(base, username, password):
+    """Obtain an access token from the deployment serving `base`."""
+    parts = urlsplit(base)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    body = json.dumps({"username": username, "password": password})
+    connection.request("POST", "/api/auth/login/", body, {"Content-Type": "application/json"})
+    response = connection.getresponse()
+    payload = json.loads(response.read())
+    if response.status != 200:
+        raise SystemExit(f"login against {base} failed: {response.status} {payload}")
+    return payload["access"]
+
+
+def worker(url, token, deadline, bust_cache, results, lock):
+    parts = urlsplit(url)
+    connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+    headers = {"Authorization": f"Bearer {token}"}
+    latencies, codes, sequence = [], Counter(), 0
+    while time.perf_counter() < deadline:
+        path = parts.path + (f"?limit=100&_={threading.get_ident()}-{sequence}" if bust_cache else "?limit=100")
+        sequence += 1
+        started = time.perf_counter()
+        try:
+            connection.request("GET", path, headers=headers)
+            response = connection.getresponse()
+            response.read()
+            codes[response.status] += 1
+        except (OSError, http.client.HTTPException):
+            codes["error"] += 1
+            connection.close()
+            connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=30)
+            continue
+        latencies.append(time.perf_counter() - started)
+    with lock:
+        results["latencies"].extend(latencies)
+        results["codes"].update(codes)
+
+
+def run(url, token, concurrency, duration, bust_cache):
+    results = {"latencies": [], "codes": Counter()}
+    lock = threading.Lock()
+    deadline = time.perf_counter() + duration
+    threads = [
+        threading.Thread(target=worker, args=(url, token, deadline, bust_cache, results, lock))
+        for _ in range(concurrency)
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    latencies = sorted(results["latencies"])
+    if not latencies:
+        return {"status_codes": dict(results["codes"])}
+    return {
+        "requests": len(latencies),
+        "requests_per_second": len(latencies) / duration,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[max(int(len(latencies) * 0.99) - 1, 0)] * 1000,
+        "status_codes": {str(code): count for code, count in results["codes"].items()},
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--target", action="append", required=True, help="name=list endpoint URL")
+    parser.add_argument("--username", required=True)
+    parser.add_argument("--password", required=True)
+    parser.add_argument("--concurrency", type=int, default=64)
+    parser.add_argument("--duration", type=float, default=20.0)
+    parser.add_argument("--no-cache", action="store_true", dest="bust_cache")
+    args = parser.parse_args()
+
+    report = {"concurrency": args.concurrency, "duration": args.duration, "targets": {}}
+    for target in args.target:
+        name, _, url = target.partition("=")
+        token = login(url, args.username, args.password)
+        report["targets"][name] = run(url, token, args.concurrency, args.duration, args.bust_cache)
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+"""
+Drive the REST endpoints over a seeded dataset and report throughput and latency percentiles.
+
+Run `python manage.py seed_finance` first, then either go through the Django test client
+in-process (no server needed) or against a running deployment:
+
+    python -m benchmarks.api_suite --requests 200 --output bench-$(git rev-parse --short HEAD).json
+    python -m benchmarks.api_suite --base-url http://localhost:8000 --concurrency 16
+
+Each scenario is requested `--requests` times for users sampled from the seeded ones
+(username prefix `--prefix`), heavy and light users alike. Access tokens are minted locally,
+so the deployment must share this settings module's SECRET_KEY and database. Reads carry a
+unique query string unless `--cache` is given, so they measure the uncached path. Write
+scenarios (`--writes`) are rolled back in-process but are real against a server.
+
+The JSON report holds the commit, dataset size and, per scenario, the number of requests,
+status codes, requests per second and p50/p95/p99 latency in milliseconds; pass an earlier
+report with `--compare` to add the relative change of each metric.
+"""
+
+import argparse
+import http.client
+import json
+import random
+import statistics
+import subprocess
+import threading
+import time
+from collections import Counter
+from urllib.parse import urlencode, urlsplit
+
+from benchmarks import emit, setup_django
+
+
+class Rollback(Exception):
+    pass
+
+
+def scenarios(writes):
+    """(name, method, path, body) factories; each takes one sampled user's context."""
+    reads = [
+        ("transactions_list", "GET", lambda ctx: ("/api/transactions/", {"limit": 100}), None),
+        ("transactions_filtered", "GET", lambda ctx: ("/api/transactions/", {"type": "Expense", "min_amount": 50, "limit": 100}), None),
+        ("transactions_retrieve", "GET", lambda ctx: (f"/api/transactions/{ctx['transaction']}/", {}), None),
+        ("transactions_summary", "GET", lambda ctx: ("/api/transactions/summary/", {"group_by": "budget"}), None),
+        ("budgets_list", "GET", lambda ctx: ("/api/budgets/", {}), None),
+        ("budgets_utilization", "GET", lambda ctx: ("/api/budgets/utilization/", {}), None),
+    ]
+    if not writes:
+        return reads
+    return reads + [
+        (
+            "transactions_create", "POST", lambda ctx: ("/api/transactions/", {}),
+            lambda ctx: {"title": "Bench", "amount": 1, "type": "Expense", "budget": ctx["budget"]},
+        ),
+        (
+            "transactions_bulk", "POST", lambda ctx: ("/api/transactions/bulk/", {}),
+            lambda ctx: [{"title": f"Bench {i}", "amount": 1, "type": "Expense", "budget": ctx["budget"]} for i in range(50)],
+        ),
+    ]
+
+
+def sample_users(prefix, count, rng):
+    """Context (token, one transaction id, one category budget id) for `count` seeded users."""
+    from accounts.models import User
+    from accounts.serializers import UserTokenObtainPairSerializer
+    from budgets.models import FREE_BUDGET_TITLE, Budget
+    from transactions.models import Transaction
+
+    user_ids = list(User.objects.filter(username__startswith=prefix).values_list("id", flat=True))
+    if not user_ids:
+        raise SystemExit(f"no users named {prefix}*; run `python manage.py seed_finance` first")
+    contexts = []
+    for user in User.objects.filter(id__in=rng.sample(user_ids, min(count, len(user_ids)))):
+        budget = Budget.objects.filter(user=user).exclude(title=FREE_BUDGET_TITLE).values_list("id", flat=True).first()
+        transaction = Transaction.objects.filter(user=user).values_list("id", flat=True).last()
+        if budget is None or transaction is None:
+            continue
+        token = str(UserTokenObtainPairSerializer.get_token(user).access_token)
+        contexts.append({"token": token, "budget": budget, "transaction": transaction})
+    return contexts
+
+
+def summarize(latencies, codes, elapsed):
+    if len(latencies) < 2:
+        return {"requests": len(latencies), "status_codes": dict(codes)}
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "requests": len(latencies),
+        "requests_per_second": round(len(latencies) / elapsed, 2),
+        "p50_ms": round(cuts[49] * 1000, 3),
+        "p95_ms": round(cuts[94] * 1000, 3),
+        "p99_ms": round(cuts[98] * 1000, 3),
+        "status_codes": {str(code): count for code, count in codes.items()},
+    }
+
+
+def request_plan(scenario, contexts, requests, bust_cache, rng):
+    _, method, path_for, body_for = scenario
+    plan = []
+    for sequence in range(requests):
+        ctx = rng.choice(contexts)
+        path, params = path_for(ctx)
+        if bust_cache and method == "GET":
+            params = {**params, "_": sequence}
+        body = json.dumps(body_for(ctx)) if body_for else None
+        plan.append((method, f"{path}?{urlencode(params)}" if params else path, body, ctx["token"]))
+    return plan
+
+
+def run_in_process(plan):
+    from django.test import Client
+
+    client = Client()
+    latencies, codes = [], Counter()
+    started = time.perf_counter()
+    for method, path, body, token in plan:
+        headers = {"Authorization": f"Bearer {token}"}
+        begin = time.perf_counter()
+        if method == "GET":
+            response = client.get(path, headers=headers)
+        else:
+            response = client.post(path, body, content_type="application/json", headers=headers)
+        latencies.append(time.perf_counter() - begin)
+        codes[response.status_code] += 1
+    return summarize(latencies, codes, time.perf_counter() - started)
+
+
+def run_http(base_url, plan, concurrency):
+    parts = urlsplit(base_url)
+    latencies, codes, lock = [], Counter(), threading.Lock()
+    shares = [plan[index::concurrency] for index in range(concurrency)]
+
+    def worker(share):
+        connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+        local_latencies, local_codes = [], Counter()
+        for method, path, body, token in share:
+            headers = {"Authorization": f"Bearer {token}", "Content-Type": "application/json"}
+            begin = time.perf_counter()
+            try:
+                connection.request(method, path, body, headers)
+                response = connection.getresponse()
+                response.read()
+                local_codes[response.status] += 1
+            except (OSError, http.client.HTTPException):
+                local_codes["error"] += 1
+                connection.close()
+                connection = http.client.HTTPConnection(parts.hostname, parts.port or 80, timeout=60)
+                continue
+            local_latencies.append(time.perf_counter() - begin)
+        with lock:
+            latencies.extend(local_latencies)
+            codes.update(local_codes)
+
+    threads = [threading.Thread(target=worker, args=(share,)) for share in shares]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return summarize(latencies, codes, time.perf_counter() - started)
+
+
+def compare(report, baseline):
+    """Relative change of every numeric metric against an earlier report (+0.10 = 10% higher)."""
+    for name, result in report["scenarios"].items():
+        before = baseline.get("scenarios", {}).get(name)
+        if not before:
+            continue
+        result["change"] = {
+            metric: round(value / before[metric] - 1, 4)
+            for metric, value in result.items()
+            if isinstance(value, (int, float)) and before.get(metric)
+        }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--base-url", help="Benchmark a running server instead of the in-process test client.")
+    parser.add_argument("--prefix", default="seed", help="Username prefix of the seeded users.")
+    parser.add_argument("--users", type=int, default=50, help="Seeded users to sample.")
+    parser.add_argument("--requests", type=int, default=200, help="Requests per scenario.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Connections, with --base-url.")
+    parser.add_argument("--scenario", action="append", help="Only run these scenarios (repeatable).")
+    parser.add_argument("--writes", action="store_true", help="Also run the create and bulk scenarios.")
+    parser.add_argument("--cache", action="store_true", help="Let reads hit the response cache.")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", help="Also write the report to this file.")
+    parser.add_argument("--compare", help="Earlier report to compute changes against.")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import transaction
+    from transactions.models import Transaction
+
+    rng = random.Random(args.seed)
+    contexts = sample_users(args.prefix, args.users, rng)
+    selected = [s for s in scenarios(args.writes) if not args.scenario or s[0] in args.scenario]
+    report = {
+        "commit": git_commit(),
+        "target": args.base_url or "in-process",
+        "dataset": {
+            "users": len(contexts),
+            "transactions": Transaction.objects.filter(user__username__startswith=args.prefix).count(),
+        },
+        "requests_per_scenario": args.requests,
+        "concurrency": args.concurrency if args.base_url else 1,
+        "scenarios": {},
+    }
+    for scenario in selected:
+        plan = request_plan(scenario, contexts, args.requests, not args.cache, rng)
+        if args.base_url:
+            report["scenarios"][scenario[0]] = run_http(args.base_url, plan, args.concurrency)
+            continue
+        try:
+            with transaction.atomic():
+                report["scenarios"][scenario[0]] = run_in_process(plan)
+                raise Rollback
+        except Rollback:
+            pass
+
+    if args.compare:
+        with open(args.compare) as baseline:
+            compare(report, json.load(baseline))
+    if args.output:
+        with open(args.output, "w") as output:
+            json.dump(report, output, indent=2, default=str)
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
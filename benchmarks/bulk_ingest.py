@@ -0,0 +1,69 @@
+"""
+Compare single-row POSTs against the bulk ingestion endpoint.
+
+Drives both paths through the DRF test client inside a rolled-back transaction
+and reports rows per second for each, plus the speedup.
+
+    python -m benchmarks.bulk_ingest --rows 2000
+"""
+
+import argparse
+import time
+
+from benchmarks import emit, setup_django
+
+
+class Rollback(Exception):
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=2000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import transaction
+    from django.utils import timezone
+    from rest_framework.test import APIClient
+    from accounts.models import User
+    from budgets.models import Budget
+
+    report = {"rows": args.rows}
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(username="bench-bulk", email="bench-bulk@example.com", password="!")
+            budget = Budget.objects.create(
+                user=user, title="bench", total_amount=10**12, start_date=timezone.now().date()
+            )
+            client = APIClient()
+            client.force_authenticate(user=user)
+            items = [
+                {"title": f"row {i}", "amount": 1 + i % 500, "type": "Expense", "budget": budget.id}
+                for i in range(args.rows)
+            ]
+
+            started = time.perf_counter()
+            for item in items:
+                client.post("/api/transactions/", item, format="json")
+            single = time.perf_counter() - started
+
+            started = time.perf_counter()
+            client.post("/api/transactions/bulk/", items, format="json")
+            bulk = time.perf_counter() - started
+
+            report.update(
+                single_seconds=single,
+                bulk_seconds=bulk,
+                single_rows_per_second=args.rows / single,
+                bulk_rows_per_second=args.rows / bulk,
+                speedup=single / bulk,
+            )
+            raise Rollback
+    except Rollback:
+        pass
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,119 @@
+"""
+Show which index Postgres picks for each per-user query.
+
+Seeds a synthetic dataset (10M transactions by default) with generate_series
+inside a transaction, runs ANALYZE and EXPLAIN for the queries issued by
+TransactionAPIView and BudgetAPIView, then rolls everything back.
+
+    python -m benchmarks.explain_indexes --rows 10000000 --users 1000
+"""
+
+import argparse
+import re
+from datetime import timedelta
+
+from benchmarks import emit, setup_django
+
+INDEX_RE = re.compile(r"(?:Index Scan|Index Only Scan)(?: Backward)? using (\w+)|Bitmap Index Scan on (\w+)")
+
+
+class Rollback(Exception):
+    pass
+
+
+def seed(users, rows):
+    from django.db import connection
+    from django.utils import timezone
+    from accounts.models import User
+    from budgets.models import Budget
+    from transactions.models import Transaction
+
+    # bulk_create skips the post_save signal that gives each user a "free" budget, so the
+    # free budgets are created explicitly below along with the others.
+    User.objects.bulk_create(
+        User(username=f"bench{i}", email=f"bench{i}@example.com", password="!") for i in range(users)
+    )
+    user_ids = list(User.objects.filter(username__startswith="bench").values_list("id", flat=True))
+    today = timezone.now().date()
+    Budget.objects.bulk_create(
+        Budget(user_id=uid, title=title, total_amount=10**9, allocated_amount=10**9, start_date=today)
+        for uid in user_ids
+        for title in ("free", "groceries", "rent")
+    )
+
+    first_user, last_user = min(user_ids), max(user_ids)
+    with connection.cursor() as cursor:
+        # Skewed per-user volume: low user ids own most of the rows.
+        cursor.execute(
+            f"""
+            INSERT INTO {Transaction._meta.db_table} (user_id, title, amount, type, date, notes, budget_id)
+            SELECT u.uid,
+                   'bench ' || g,
+                   (random() * 10000)::bigint + 1,
+                   CASE WHEN random() < 0.8 THEN 'Expense' ELSE 'Income' END,
+                   now() - (random() * interval '1095 days'),
+                   NULL,
+                   CASE WHEN random() < 0.3 THEN NULL
+                        ELSE (SELECT b.id FROM {Budget._meta.db_table} b
+                              WHERE b.user_id = u.uid ORDER BY b.id LIMIT 1) END
+            FROM generate_series(1, %s) AS g,
+                 LATERAL (SELECT %s + floor(power(random(), 3) * (%s - %s + 1))::bigint + (g * 0) AS uid) u
+            """,
+            [rows, first_user, last_user, first_user],
+        )
+        cursor.execute(f"ANALYZE {Transaction._meta.db_table}")
+        cursor.execute(f"ANALYZE {Budget._meta.db_table}")
+    return first_user
+
+
+def build_queries(user_id):
+    from django.utils import timezone
+    from budgets.models import Budget
+    from transactions.models import Transaction
+
+    now = timezone.now()
+    month_ago = now - timedelta(days=30)
+    budget_id = Budget.objects.filter(user_id=user_id).exclude(title="free").values_list("id", flat=True).first()
+    some_id = Transaction.objects.filter(user_id=user_id).values_list("id", flat=True).first()
+    transactions = Transaction.objects.filter(user_id=user_id)
+    return {
+        "transaction_list_page": transactions.order_by("date", "id")[:101],
+        "transaction_list_cursor": transactions.filter(date__gt=month_ago).order_by("date", "id")[:101],
+        "transaction_retrieve": Transaction.objects.filter(pk=some_id, user_id=user_id),
+        "transaction_date_range": transactions.filter(date__gte=month_ago, date__lt=now),
+        "transaction_type_date_range": transactions.filter(type="Expense", date__gte=month_ago, date__lt=now),
+        "transaction_budget_date_range": Transaction.objects.filter(budget_id=budget_id, date__gte=month_ago),
+        "budget_list": Budget.objects.filter(user_id=user_id).order_by("id")[:101],
+        "budget_free_lookup": Budget.objects.filter(user_id=user_id, title="free"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--analyze", action="store_true", help="run EXPLAIN ANALYZE instead of EXPLAIN")
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import transaction
+
+    report = {"rows": args.rows, "users": args.users, "queries": {}}
+    try:
+        with transaction.atomic():
+            user_id = seed(args.users, args.rows)
+            for name, queryset in build_queries(user_id).items():
+                plan = queryset.explain(analyze=args.analyze)
+                report["queries"][name] = {
+                    "indexes": ["".join(match) for match in INDEX_RE.findall(plan)],
+                    "seq_scan": "Seq Scan" in plan,
+                    "plan": plan.splitlines(),
+                }
+            raise Rollback
+    except Rollback:
+        pass
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
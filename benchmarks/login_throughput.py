@@ -0,0 +1,105 @@
+"""
+Measure login throughput under concurrency, sync view against the async one.
+
+Fires `--requests` logins with `--concurrency` in flight at a time: through
+TokenObtainPairView from a thread pool, and through the async endpoint from a
+single event loop (the async view offloads PBKDF2 to the bounded password pool).
+Rate limiting is disabled for the run. Reports logins per second, latency
+percentiles and the status codes seen (503 means the pool shed load).
+
+    python -m benchmarks.login_throughput --requests 400 --concurrency 32
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks import emit, setup_django
+
+USERNAME = "bench-login"
+PASSWORD = "bench-login-Pass123"
+
+
+def summarize(latencies, codes, elapsed):
+    latencies = sorted(latencies)
+    return {
+        "logins_per_second": len(latencies) / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+        "status_codes": dict(Counter(codes)),
+    }
+
+
+def run_sync(total, concurrency):
+    from django.db import connection
+    from django.test import Client
+
+    body = {"username": USERNAME, "password": PASSWORD}
+
+    def login(_):
+        started = time.perf_counter()
+        try:
+            code = Client().post("/api/auth/login/", body, content_type="application/json").status_code
+        finally:
+            connection.close()
+        return time.perf_counter() - started, code
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        results = list(pool.map(login, range(total)))
+    return summarize([r[0] for r in results], [r[1] for r in results], time.perf_counter() - started)
+
+
+def run_async(total, concurrency):
+    from django.test import AsyncClient
+
+    body = {"username": USERNAME, "password": PASSWORD}
+
+    async def main():
+        client = AsyncClient()
+        gate = asyncio.Semaphore(concurrency)
+
+        async def login():
+            async with gate:
+                started = time.perf_counter()
+                response = await client.post("/api/auth/async/login/", body, content_type="application/json")
+                return time.perf_counter() - started, response.status_code
+
+        started = time.perf_counter()
+        results = await asyncio.gather(*(login() for _ in range(total)))
+        return summarize([r[0] for r in results], [r[1] for r in results], time.perf_counter() - started)
+
+    return asyncio.run(main())
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=32)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.conf import settings
+    from accounts.models import User
+
+    settings.AUTH_RATE_LIMITS = {}
+    # Worker threads use their own connections, so the user must be committed (and removed afterwards).
+    user = User.objects.create_user(username=USERNAME, email=f"{USERNAME}@example.com", password=PASSWORD)
+    try:
+        report = {
+            "requests": args.requests,
+            "concurrency": args.concurrency,
+            "password_hash_workers": settings.PASSWORD_HASH_WORKERS,
+            "sync": run_sync(args.requests, args.concurrency),
+            "async": run_async(args.requests, args.concurrency),
+        }
+    finally:
+        user.delete()
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
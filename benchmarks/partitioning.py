@@ -0,0 +1,135 @@
+"""
+Compare the transactions table unpartitioned and partitioned by date.
+
+Seeds a synthetic dataset inside a transaction (the same one as explain_indexes, three
+years of history), times the per-user queries TransactionAPIView issues, a bulk insert and
+the removal of the oldest period (a DELETE, against a partition DETACH), then rebuilds the
+table partitioned (see transactions/partitioning.py), repeats, and rolls everything back.
+
+    python -m benchmarks.partitioning --rows 5000000 --users 1000 --granularity month
+"""
+
+import argparse
+import re
+import statistics
+import time
+
+from benchmarks import emit, setup_django
+from benchmarks.explain_indexes import build_queries, seed
+
+
+class Rollback(Exception):
+    pass
+
+
+def timed(func, repeat=1):
+    """Median wall time of `func` in milliseconds."""
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000)
+    return round(statistics.median(timings), 3)
+
+
+def rolled_back(func):
+    """Wrap `func` to run in a savepoint that is rolled back afterwards."""
+    from django.db import transaction
+
+    def run():
+        try:
+            with transaction.atomic():
+                func()
+                raise Rollback
+        except Rollback:
+            pass
+
+    return run
+
+
+def measure(queries, user_id, granularity, repeat, insert_rows):
+    from django.db import connection
+    from django.utils import timezone
+    from transactions.models import Transaction
+    from transactions.partitioning import detach_partitions, keys_table_name, layout, next_period, partitions, period_start
+
+    table = Transaction._meta.db_table
+    scanned = re.compile(rf"\b{table}_(y\d+(?:m\d+)?|default)\b")
+    report = {"queries": {}}
+    for name, queryset in queries.items():
+        plan = queryset.explain()
+        report["queries"][name] = {
+            "ms": timed(lambda: list(queryset.all()), repeat),
+            "partitions_scanned": len(set(scanned.findall(plan))),
+        }
+
+    now = timezone.now()
+    batch = [
+        Transaction(user_id=user_id, title=f"bench insert {i}", amount=i + 1, type="Expense", date=now)
+        for i in range(insert_rows)
+    ]
+
+    def insert():
+        Transaction.objects.bulk_create(batch, batch_size=1000)
+
+    def remove_oldest_period():
+        if layout(connection, Transaction):
+            detach_partitions(connection, Transaction, partitions(connection, table)[0][2])
+            return
+        first = Transaction.objects.order_by("date").values_list("date", flat=True).first()
+        cutoff = next_period(period_start(first, granularity), granularity)
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM "{table}" WHERE date < %s', [cutoff])
+
+    report["bulk_insert_ms"] = timed(rolled_back(insert))
+    report["remove_oldest_period_ms"] = timed(rolled_back(remove_oldest_period))
+    with connection.cursor() as cursor:
+        # Partitioned, the unique constraints' side table counts too (to_regclass is NULL without it).
+        cursor.execute(
+            "SELECT sum(pg_total_relation_size(relid)) FROM "
+            "(SELECT relid FROM pg_partition_tree(%s) UNION SELECT %s::regclass UNION SELECT to_regclass(%s)) AS tree",
+            [table, table, keys_table_name(table)],
+        )
+        report["size_mb"] = round(cursor.fetchone()[0] / 2**20, 1)
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=5_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--granularity", choices=["month", "year"], default="month")
+    parser.add_argument("--repeat", type=int, default=5, help="runs per query; the median is reported")
+    parser.add_argument("--insert-rows", type=int, default=10_000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import connection, transaction
+    from transactions.models import Transaction
+    from transactions.partitioning import layout, rebuild
+
+    report = {"rows": args.rows, "users": args.users, "granularity": args.granularity}
+    try:
+        with transaction.atomic():
+            if layout(connection, Transaction):
+                with connection.schema_editor() as schema_editor:
+                    rebuild(schema_editor, Transaction)
+            user_id = seed(args.users, args.rows)
+            queries = {name: qs for name, qs in build_queries(user_id).items() if name.startswith("transaction")}
+            report["unpartitioned"] = measure(queries, user_id, args.granularity, args.repeat, args.insert_rows)
+
+            started = time.perf_counter()
+            with connection.schema_editor() as schema_editor:
+                rebuild(schema_editor, Transaction, args.granularity)
+            report["convert_s"] = round(time.perf_counter() - started, 2)
+            report["partitioned"] = measure(queries, user_id, args.granularity, args.repeat, args.insert_rows)
+            raise Rollback
+    except Rollback:
+        pass
+    for name, partitioned in report["partitioned"]["queries"].items():
+        partitioned["speedup"] = round(report["unpartitioned"]["queries"][name]["ms"] / max(partitioned["ms"], 1e-3), 2)
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
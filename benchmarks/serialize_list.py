@@ -0,0 +1,82 @@
+"""
+Compare TransactionSerializer against the read-only fast path in transactions/rows.py.
+
+Seeds one user's transactions inside a rolled-back transaction, then times
+fetching and serializing all of them both ways and checks that the rendered
+JSON is byte-for-byte identical.
+
+    python -m benchmarks.serialize_list --rows 100000
+"""
+
+import argparse
+import time
+
+from benchmarks import emit, setup_django
+
+
+class Rollback(Exception):
+    pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=100000)
+    args = parser.parse_args()
+
+    setup_django()
+    from django.db import transaction
+    from django.utils import timezone
+    from rest_framework.renderers import JSONRenderer
+    from accounts.models import User
+    from budgets.models import Budget
+    from transactions.models import Transaction
+    from transactions.rows import compile_formatter
+    from transactions.serializers import TransactionSerializer
+
+    report = {"rows": args.rows}
+    render = JSONRenderer().render
+    try:
+        with transaction.atomic():
+            user = User.objects.create_user(username="bench-list", email="bench-list@example.com", password="!")
+            budget = Budget.objects.get(user=user, title="free")
+            now = timezone.now()
+            Transaction.objects.bulk_create(
+                (
+                    Transaction(
+                        user=user,
+                        title=f"row {i}",
+                        amount=1 + i % 500,
+                        type="Expense" if i % 5 else "Income",
+                        notes=None if i % 3 else f"note {i}",
+                        budget=budget if i % 2 else None,
+                        date=now - timezone.timedelta(minutes=i),
+                    )
+                    for i in range(args.rows)
+                ),
+                batch_size=5000,
+            )
+            queryset = Transaction.objects.filter(user=user).order_by("date", "id")
+
+            started = time.perf_counter()
+            slow = TransactionSerializer(list(queryset), many=True).data
+            serializer_seconds = time.perf_counter() - started
+
+            started = time.perf_counter()
+            columns, format_row = compile_formatter()
+            fast = [format_row(row) for row in queryset.values(*columns)]
+            fast_path_seconds = time.perf_counter() - started
+
+            report.update(
+                serializer_seconds=serializer_seconds,
+                fast_path_seconds=fast_path_seconds,
+                speedup=serializer_seconds / fast_path_seconds,
+                identical_json=render(slow) == render(fast),
+            )
+            raise Rollback
+    except Rollback:
+        pass
+    emit(report)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,15 @@
+"""
+Async URL configuration for the Budgets app.
+
+Registers AsyncBudgetAPIView with a SimpleRouter; same routes as urls.py.
+Mounted at /api/async/budgets/ in the main urls.py.
+"""
+
+from rest_framework import routers
+from . import async_views
+
+app_name = "async_budgets"
+router = routers.SimpleRouter()
+router.register('', async_views.AsyncBudgetAPIView, basename='budget')
+
+urlpatterns = router.urls
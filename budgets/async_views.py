@@ -0,0 +1,88 @@
+"""
+Async views for the Budgets app.
+
+AsyncBudgetAPIView mirrors BudgetAPIView for ASGI deployments and is mounted at
+/api/async/budgets/. Every action runs on Django's async ORM (aget, acreate, asave,
+adelete and async iteration for the keyset page).
+"""
+
+from adrf.viewsets import ViewSet
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from accounts.authentication import ClaimsJWTAuthentication
+from django.shortcuts import aget_object_or_404
+from Finance_Management.cache import cached_response
+from Finance_Management.pagination import KeysetPagination
+from .models import Budget
+from .serializers import BudgetSerializer
+from .views import BudgetAPIView
+
+
+class AsyncBudgetAPIView(ViewSet):
+    """
+    Async API ViewSet for Budget model.
+    Same list/create/retrieve/partial_update/destroy contract as BudgetAPIView.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [ClaimsJWTAuthentication]
+    queryset = Budget.objects.all()
+    serializer_class = BudgetSerializer
+    ordering = BudgetAPIView.ordering
+
+    @cached_response
+    async def list(self, request):
+        """
+        List budgets for the authenticated user, one keyset page at a time.
+        Supports `?cursor=`, `?limit=` and `?fields=` projection.
+        """
+        fields = self.serializer_class.get_requested_fields(request)
+        budgets = self.queryset.filter(user=request.user)
+        if fields:
+            budgets = budgets.only(*fields, *self.ordering)
+        paginator = KeysetPagination(ordering=self.ordering)
+        page = await paginator.apaginate_queryset(budgets, request, view=self)
+        serializer = self.serializer_class(page, many=True, fields=fields)
+        return paginator.get_paginated_response(serializer.data)
+
+    async def create(self, request):
+        """
+        Create a new budget for the authenticated user.
+        Sets the user field from request.user and validates data.
+        """
+        serializer = self.serializer_class(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        budget = await self.queryset.acreate(user=request.user, **serializer.validated_data)
+        return Response(self.serializer_class(budget).data, status=status.HTTP_201_CREATED)
+
+    @cached_response
+    async def retrieve(self, request, pk=None):
+        """
+        Retrieve a specific budget by ID.
+        Ensures the budget belongs to the authenticated user.
+        """
+        budget = await aget_object_or_404(self.queryset, pk=pk, user=request.user)
+        serializer = self.serializer_class(budget)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    async def partial_update(self, request, pk=None):
+        """
+        Partially update a budget by ID.
+        Ensures the budget belongs to the authenticated user.
+        """
+        budget = await aget_object_or_404(self.queryset, pk=pk, user=request.user)
+        serializer = self.serializer_class(budget, data=request.data, partial=True)
+        serializer.is_valid(raise_exception=True)
+        for attr, value in serializer.validated_data.items():
+            setattr(budget, attr, value)
+        await budget.asave()
+        return Response(self.serializer_class(budget).data, status=status.HTTP_200_OK)
+
+    async def destroy(self, request, pk=None):
+        """
+        Delete a budget by ID.
+        Ensures the budget belongs to the authenticated user.
+        """
+        budget = await aget_object_or_404(self.queryset, pk=pk, user=request.user)
+        await budget.adelete()
+        return Response({"message": "Budget deleted"}, status=status.HTTP_204_NO_CONTENT)
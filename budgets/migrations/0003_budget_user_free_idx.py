@@ -0,0 +1,23 @@
+# Generated by Django 5.2.3 on 2026-10-17 16:21
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0002_alter_budget_end_date"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="budget",
+            index=models.Index(
+                condition=models.Q(("title", "free")),
+                fields=["user"],
+                name="budget_user_free_idx",
+            ),
+        ),
+    ]
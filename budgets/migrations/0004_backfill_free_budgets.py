@@ -0,0 +1,27 @@
+from django.db import migrations
+from django.utils.timezone import now
+
+
+def backfill_free_budgets(apps, schema_editor):
+    """Create the 'free' budget for users that do not have one yet."""
+    User = apps.get_model("accounts", "User")
+    Budget = apps.get_model("budgets", "Budget")
+    missing = User.objects.exclude(budget__title="free").values_list("id", flat=True)
+    Budget.objects.bulk_create(
+        [
+            Budget(user_id=user_id, title="free", total_amount=999999999999, start_date=now().date(), end_date=None)
+            for user_id in missing.iterator()
+        ],
+        batch_size=1000,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0003_budget_user_free_idx"),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_free_budgets, migrations.RunPython.noop),
+    ]
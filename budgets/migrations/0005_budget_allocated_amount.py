@@ -0,0 +1,41 @@
+from django.db import migrations, models
+from django.db.models import F, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+
+
+def backfill_allocated_amount(apps, schema_editor):
+    """Allocated = remaining funds + the expenses already debited (free budgets are never debited)."""
+    Budget = apps.get_model("budgets", "Budget")
+    Transaction = apps.get_model("transactions", "Transaction")
+    debited = (
+        Transaction.objects.filter(budget=OuterRef("pk"), type="Expense")
+        .values("budget")
+        .annotate(total=Sum("amount"))
+        .values("total")
+    )
+    Budget.objects.filter(title="free").update(allocated_amount=F("total_amount"))
+    Budget.objects.exclude(title="free").update(
+        allocated_amount=F("total_amount") + Coalesce(Subquery(debited), Value(0))
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0004_backfill_free_budgets"),
+        ("transactions", "0006_recurringtransaction"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="budget",
+            name="allocated_amount",
+            field=models.PositiveBigIntegerField(null=True),
+        ),
+        migrations.RunPython(backfill_allocated_amount, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="budget",
+            name="allocated_amount",
+            field=models.PositiveBigIntegerField(),
+        ),
+    ]
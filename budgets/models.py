@@ -2,15 +2,40 @@ from django.db import models
 from accounts.models import User
 # Create your models here.
 
+FREE_BUDGET_TITLE = 'free'
+FREE_BUDGET_AMOUNT = 999999999999
 
 
 class Budget(models.Model):
     user = models.ForeignKey(User, on_delete=models.CASCADE)
     title = models.CharField(max_length=100)
-    total_amount = models.PositiveBigIntegerField()
+    total_amount = models.PositiveBigIntegerField()  # remaining funds, debited by every Expense
+    allocated_amount = models.PositiveBigIntegerField()  # funds originally put in, plus top-ups
     start_date = models.DateField()
     end_date = models.DateField(null=True, blank=True)  # ← تغییر مهم
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['user'], condition=models.Q(title='free'), name='budget_user_free_idx'),
+        ]
+
+    @property
+    def is_free(self):
+        """The per-user 'free' budget is unlimited: it is never debited and accepts Income."""
+        return self.title == FREE_BUDGET_TITLE
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Lets the post_save ledger hook book only the change of allocation.
+        instance._saved_allocated_amount = instance.__dict__.get('allocated_amount')
+        return instance
+
+    def save(self, *args, **kwargs):
+        if self.allocated_amount is None:
+            self.allocated_amount = self.total_amount
+        super().save(*args, **kwargs)
+
     def __str__(self):
         if self.end_date:
             days = (self.end_date - self.start_date).days
@@ -2,33 +2,50 @@
 Serializer for the Budget model.
 
 Handles serialization/deserialization of Budget objects for API requests.
-Ensures end_date is provided and validates date consistency.
+Ensures end_date is provided, validates date consistency and keeps the reserved
+'free' title to the budget the signal creates for each user.
 """
 
 from rest_framework import serializers
-from .models import Budget
+from .models import FREE_BUDGET_TITLE, Budget
+from Finance_Management.serializers import DynamicFieldsModelSerializer
 
 
-class BudgetSerializer(serializers.ModelSerializer):
+class BudgetSerializer(DynamicFieldsModelSerializer):
     """
     Serializer for Budget model.
     - Marks 'user' as read-only since it's set from request.user.
     - Ensures end_date is provided and not before start_date.
+    - Reserves the 'free' title, which makes a budget unlimited, for the signal-created budget.
     """
 
     class Meta:
         model = Budget
-        fields = ('id', 'user', 'title', 'total_amount', 'start_date', 'end_date')
-        read_only_fields = ('user',)
+        fields = ('id', 'user', 'title', 'total_amount', 'allocated_amount', 'start_date', 'end_date')
+        read_only_fields = ('user', 'allocated_amount')
         extra_kwargs = {
             'end_date': {'required': True}
         }
 
+    def validate_title(self, value):
+        """
+        Reject the reserved 'free' title on other budgets, and renaming the free budget itself:
+        a user has exactly one unlimited budget, the one create_free_budget gave them.
+        """
+        was_free = self.instance is not None and self.instance.is_free
+        if (value == FREE_BUDGET_TITLE) != was_free:
+            if was_free:
+                raise serializers.ValidationError("The free budget can't be renamed")
+            raise serializers.ValidationError(f"'{FREE_BUDGET_TITLE}' is reserved for the free budget")
+        return value
+
     def validate(self, data):
         """
         Validate budget data.
         - Ensure end_date is not before start_date.
         - Ensure total_amount is positive.
+        - Carry a change of total_amount over to allocated_amount, so a top-up (or cut) of the
+          remaining funds is not mistaken for spending.
         """
         start_date = data.get('start_date')
         end_date = data.get('end_date')
@@ -36,6 +53,10 @@ class BudgetSerializer(serializers.ModelSerializer):
 
         if end_date and start_date and end_date < start_date:
             raise serializers.ValidationError({"end_date": "End date cannot be before start date"})
-        if total_amount < 0:
+        if total_amount is not None and total_amount < 0:
             raise serializers.ValidationError({"total_amount": "Total amount must be non-negative"})
+        if self.instance is not None and total_amount is not None:
+            data['allocated_amount'] = max(
+                self.instance.allocated_amount + total_amount - self.instance.total_amount, 0
+            )
         return data
\ No newline at end of file
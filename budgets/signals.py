@@ -1,39 +1,38 @@
 """
 Signals for the Budgets app.
 
-Automatically creates a 'free' budget when a user is created or ensures it exists for existing users.
+Automatically creates a 'free' budget when a user is created, and drops a user's
+cached API responses whenever one of their budgets changes.
+Users that predate the signal were backfilled by migration 0004_backfill_free_budgets.
 """
 
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_save
 from django.dispatch import receiver
 from django.utils.timezone import now
 from accounts.models import User
-from .models import Budget
+from Finance_Management.cache import invalidate_user
+from .models import Budget, FREE_BUDGET_AMOUNT, FREE_BUDGET_TITLE
 
 
 @receiver(post_save, sender=User)
 def create_free_budget(sender, instance, created, **kwargs):
     """
-    Signal handler to create or ensure a 'free' budget for a user.
-    - Creates a free budget on user creation.
-    - Ensures a free budget exists for existing users without one.
+    Signal handler to create a 'free' budget for a new user.
+    Later saves (e.g. last_login updates on every login) return immediately without querying.
     """
-    if created:
-        Budget.objects.get_or_create(
-            user=instance,
-            title="free",
-            defaults={
-                "total_amount": 999999999999,
-                "start_date": now().date(),
-                "end_date": None
-            }
-        )
-    else:
-        if not Budget.objects.filter(user=instance, title="free").exists():
-            Budget.objects.create(
-                user=instance,
-                title="free",
-                total_amount=999999999999,
-                start_date=now().date(),
-                end_date=None
-            )
\ No newline at end of file
+    if not created:
+        return
+    Budget.objects.create(
+        user=instance,
+        title=FREE_BUDGET_TITLE,
+        total_amount=FREE_BUDGET_AMOUNT,
+        start_date=now().date(),
+        end_date=None
+    )
+
+
+@receiver(post_save, sender=Budget)
+@receiver(post_delete, sender=Budget)
+def invalidate_budget_owner(sender, instance, **kwargs):
+    """Signal handler that invalidates the owner's cached responses after a budget write."""
+    invalidate_user(instance.user_id)
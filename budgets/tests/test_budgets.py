@@ -47,6 +47,20 @@ def test_create_free_budget_signal(create_user):
     assert budget.total_amount == 999999999999, "Incorrect total_amount for free budget"
     assert budget.start_date == timezone.now().date(), "Incorrect start_date"
     assert budget.end_date is None, "Free budget should have no end_date"
+    assert budget.is_free
+
+
+@pytest.mark.django_db
+def test_free_budget_signal_skips_existing_user(create_user, django_assert_num_queries):
+    """
+    Test that saving an existing user (e.g. a last_login update) does not query budgets.
+    Ensures only the user's own UPDATE is issued.
+    """
+    user = create_user
+    user.last_login = timezone.now()
+    with django_assert_num_queries(1):
+        user.save(update_fields=['last_login'])
+    assert Budget.objects.filter(user=user, title='free').count() == 1
 
 
 @pytest.mark.django_db
@@ -181,6 +195,33 @@ def test_partial_update_budget(api_client, create_user):
     assert budget.title == 'Test', "Budget title should remain unchanged"
 
 
+@pytest.mark.django_db
+def test_free_title_is_reserved(api_client, create_user):
+    """
+    Test that the reserved 'free' title stays with the signal-created budget.
+    Ensures creating or renaming a budget to 'free' and renaming the free budget are rejected,
+    on the sync and async endpoints, while other updates of the free budget still work.
+    """
+    user = create_user
+    api_client.force_authenticate(user=user)
+    today = timezone.now().date()
+    budget = Budget.objects.create(user=user, title='Test', total_amount=1000, start_date=today, end_date=today)
+    free = Budget.objects.get(user=user, title='free')
+    data = {'title': 'free', 'total_amount': 10, 'start_date': str(today), 'end_date': str(today)}
+
+    for url in (reverse('budgets:budget-list'), reverse('async_budgets:budget-list')):
+        response = api_client.post(url, data, format='json')
+        print(f"Response data: {response.data}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST
+        assert 'reserved' in str(response.data['title'])
+    response = api_client.patch(reverse('budgets:budget-detail', kwargs={'pk': budget.id}), {'title': 'free'}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    url = reverse('budgets:budget-detail', kwargs={'pk': free.id})
+    assert api_client.patch(url, {'title': 'savings'}, format='json').status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.patch(url, {'title': 'free', 'end_date': str(today)}, format='json').status_code == status.HTTP_200_OK
+    assert Budget.objects.filter(user=user, title='free').count() == 1
+
+
 @pytest.mark.django_db
 def test_destroy_budget(api_client, create_user):
     """
@@ -201,4 +242,102 @@ def test_destroy_budget(api_client, create_user):
     print(f"Response data: {response.data}")
     assert response.status_code == status.HTTP_204_NO_CONTENT, f"Error: {response.data}"
     assert Budget.objects.filter(title='Test').count() == 0, "Budget was not deleted"
-    assert Budget.objects.filter(title='free').count() == 1, "Free budget should remain"
\ No newline at end of file
+    assert Budget.objects.filter(title='free').count() == 1, "Free budget should remain"
+
+@pytest.mark.django_db
+def test_list_budgets_pagination_and_fields(api_client, create_user):
+    """
+    Test keyset pagination and field projection on the budget list.
+    Ensures the cursor walks the remaining budgets and only requested fields are returned.
+    """
+    user = create_user
+    Budget.objects.create(
+        user=user,
+        title='Test1',
+        total_amount=1000,
+        start_date=timezone.now().date(),
+        end_date=timezone.now().date()
+    )
+    api_client.force_authenticate(user=user)
+    url = reverse('budgets:budget-list')
+    response = api_client.get(url, {'limit': 1, 'fields': 'title'})
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    assert response.data == [{'title': 'free'}]
+
+    response = api_client.get(url, {'limit': 1, 'fields': 'title', 'cursor': response['X-Next-Cursor']})
+    assert response.data == [{'title': 'Test1'}]
+    assert 'X-Next-Cursor' not in response
+
+
+@pytest.mark.django_db
+def test_async_budget_api_crud(api_client, create_user):
+    """
+    Test the async BudgetAPIView under /api/async/budgets/.
+    Ensures create, list, retrieve, partial update and delete match the sync endpoints.
+    """
+    user = create_user
+    api_client.force_authenticate(user=user)
+    url = reverse('async_budgets:budget-list')
+    today = timezone.now().date()
+    budget_data = {'title': 'Food', 'total_amount': 500, 'start_date': today, 'end_date': today}
+
+    response = api_client.post(url, budget_data, format='json')
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+    assert response.data['user'] == user.id
+
+    response = api_client.get(url, {'fields': 'title'})
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data == [{'title': 'free'}, {'title': 'Food'}]
+
+    budget = Budget.objects.get(user=user, title='Food')
+    detail = reverse('async_budgets:budget-detail', kwargs={'pk': budget.id})
+    response = api_client.patch(detail, {'title': 'Groceries', 'total_amount': 300}, format='json')
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    assert api_client.get(detail).data['title'] == 'Groceries'
+
+    assert api_client.delete(detail).status_code == status.HTTP_204_NO_CONTENT
+    assert not Budget.objects.filter(pk=budget.id).exists()
+
+
+@pytest.mark.django_db
+def test_budget_utilization(api_client, create_user, django_assert_num_queries):
+    """
+    Test the budget utilization report.
+    Ensures spending, remaining funds, burn rate and days left come from one aggregate query,
+    and that topping up a budget raises its allocation instead of counting as spending.
+    """
+    from transactions.models import Transaction
+
+    user = create_user
+    today = timezone.localdate()
+    budget = Budget.objects.create(
+        user=user,
+        title='Trip',
+        total_amount=1000,
+        start_date=today - timezone.timedelta(days=3),
+        end_date=today + timezone.timedelta(days=6)
+    )
+    api_client.force_authenticate(user=user)
+    for amount in (300, 100):
+        response = api_client.post(
+            reverse('transactions:transaction-list'),
+            {'title': 'Hotel', 'amount': amount, 'type': 'Expense', 'budget': budget.id},
+            format='json'
+        )
+        assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+    free = Budget.objects.get(user=user, title='free')
+    Transaction.objects.create(user=user, title='Lunch', amount=20, type='Expense', budget=free, date=timezone.now())
+
+    url = reverse('budgets:budget-utilization')
+    with django_assert_num_queries(1):
+        rows = api_client.get(url).data
+    print(f"Response data: {rows}")
+    assert rows[1] == {
+        'id': budget.id, 'allocated_amount': 1000, 'spent': 400, 'remaining': 600, 'burn_rate': 100.0, 'days_left': 6,
+    }
+    assert (rows[0]['spent'], rows[0]['remaining'], rows[0]['days_left']) == (20, None, None)
+
+    response = api_client.patch(reverse('budgets:budget-detail', kwargs={'pk': budget.id}), {'total_amount': 1100}, format='json')
+    assert response.data['allocated_amount'] == 1500
+    assert api_client.get(url).data[1]['remaining'] == 1100
@@ -0,0 +1,47 @@
+"""
+Query-count and wall-time budgets for BudgetAPIView.
+
+Runs against users seeded with 1k, 10k and 100k transactions (seeded_user in the root
+conftest.py) under the same budgets, so a query count that grows with the data fails.
+"""
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from rest_framework import status
+from django.utils import timezone
+from Finance_Management.cache import get_cache
+
+
+@pytest.fixture
+def api_client(seeded_user):
+    """APIClient authenticated as the seeded user, with an empty response cache."""
+    get_cache().clear()
+    client = APIClient()
+    client.force_authenticate(user=seeded_user[0])
+    return client
+
+
+@pytest.mark.django_db
+def test_budget_crud_query_budget(api_client, seeded_user, query_budget):
+    _, budget = seeded_user
+    url = reverse('budgets:budget-list')
+    with query_budget(max_queries=1, seconds=0.2):
+        response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    with query_budget(max_queries=1, seconds=0.2):
+        response = api_client.get(reverse('budgets:budget-detail', kwargs={'pk': budget.id}))
+    assert response.status_code == status.HTTP_200_OK
+    today = timezone.now().date()
+    data = {'title': 'Trip', 'total_amount': 500, 'start_date': today, 'end_date': today}
+    with query_budget(max_queries=2, seconds=0.2):
+        response = api_client.post(url, data, format='json')
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+
+
+@pytest.mark.django_db
+def test_utilization_query_budget(api_client, seeded_user, query_budget):
+    with query_budget(max_queries=1, seconds=1.0):
+        response = api_client.get(reverse('budgets:budget-utilization'))
+    assert response.status_code == status.HTTP_200_OK
+    assert next(row for row in response.data if row['id'] == seeded_user[1].id)['spent'] > 0
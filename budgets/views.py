@@ -1,19 +1,40 @@
 """
 Views for the Budgets app.
 
-Implements RESTful API endpoints for Budget CRUD operations using ViewSet.
+Implements RESTful API endpoints for Budget CRUD operations using ViewSet, plus a
+utilization report computed by one aggregate query.
 Requires authentication for all actions, ensuring users can only access their own budgets.
 """
 
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from accounts.authentication import ClaimsJWTAuthentication
+from django.db.models import Q, Sum
 from django.shortcuts import get_object_or_404
-from .models import Budget
+from django.utils import timezone
+from Finance_Management.cache import cached_response
+from Finance_Management.pagination import KeysetPagination
+from .models import FREE_BUDGET_TITLE, Budget
 from .serializers import BudgetSerializer
 
 
+def utilization_row(row, today):
+    """
+    Derive remaining funds, burn rate (spent per elapsed day) and days left from one aggregate row.
+    Free budgets are unlimited, so they report spending only.
+    """
+    row['remaining'] = row.pop('total_amount')
+    if row.pop('title') == FREE_BUDGET_TITLE:
+        row['allocated_amount'] = row['remaining'] = None
+    end_date = row.pop('end_date')
+    elapsed = ((min(today, end_date) if end_date else today) - row.pop('start_date')).days + 1
+    row['burn_rate'] = round(row['spent'] / elapsed, 2) if elapsed > 0 else 0
+    row['days_left'] = max((end_date - today).days, 0) if end_date else None
+    return row
+
+
 class BudgetAPIView(viewsets.ViewSet):
     """
     API ViewSet for Budget model.
@@ -21,18 +42,41 @@ class BudgetAPIView(viewsets.ViewSet):
     All actions require JWT authentication and are restricted to the authenticated user's data.
     """
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     queryset = Budget.objects.all()
     serializer_class = BudgetSerializer
+    ordering = ('id',)
 
+    @cached_response
     def list(self, request):
         """
-        List all budgets for the authenticated user.
-        Returns serialized budget data.
+        List budgets for the authenticated user, one keyset page at a time.
+        Supports `?cursor=`, `?limit=` and `?fields=` projection.
         """
+        fields = self.serializer_class.get_requested_fields(request)
         budgets = self.queryset.filter(user=request.user)
-        serializer = self.serializer_class(budgets, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        if fields:
+            budgets = budgets.only(*fields, *self.ordering)
+        paginator = KeysetPagination(ordering=self.ordering)
+        page = paginator.paginate_queryset(budgets, request, view=self)
+        serializer = self.serializer_class(page, many=True, fields=fields)
+        return paginator.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    @cached_response
+    def utilization(self, request):
+        """
+        Allocated, spent and remaining funds, burn rate and days left for every budget of the user.
+        Spending comes from a single GROUP BY over the budgets joined to their Expense transactions.
+        """
+        today = timezone.localdate()
+        rows = (
+            self.queryset.filter(user=request.user)
+            .values('id', 'title', 'allocated_amount', 'total_amount', 'start_date', 'end_date')
+            .annotate(spent=Sum('transaction__amount', filter=Q(transaction__type='Expense'), default=0))
+            .order_by(*self.ordering)
+        )
+        return Response([utilization_row(row, today) for row in rows], status=status.HTTP_200_OK)
 
     def create(self, request):
         """
@@ -45,6 +89,7 @@ class BudgetAPIView(viewsets.ViewSet):
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @cached_response
     def retrieve(self, request, pk=None):
         """
         Retrieve a specific budget by ID.
@@ -0,0 +1,82 @@
+"""
+Shared pytest fixtures for the query-budget regression tests.
+
+- query_budget: context manager asserting a maximum query count and a wall-time budget.
+- seeded_user: a user holding 1k, 10k and 100k transactions (module scoped, parametrized).
+  Endpoint tests that take it run once per size with the same budgets, so a query count
+  that grows with the data size fails the build.
+
+QUERY_BUDGET_SIZES (e.g. "1000,10000") narrows the sizes; QUERY_BUDGET_TIME_FACTOR scales
+every wall-time budget for slow machines.
+"""
+
+import os
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+
+import pytest
+
+SEED_SIZES = [int(size) for size in os.getenv('QUERY_BUDGET_SIZES', '1000,10000,100000').split(',')]
+TIME_FACTOR = float(os.getenv('QUERY_BUDGET_TIME_FACTOR', 1))
+
+
+@pytest.fixture
+def query_budget():
+    """
+    Usage: `with query_budget(max_queries=3, seconds=0.5): response = api_client.get(url)`.
+    The captured SQL is listed in the failure message.
+    """
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    @contextmanager
+    def budget(max_queries, seconds):
+        start = time.perf_counter()
+        with CaptureQueriesContext(connection) as context:
+            yield context
+        elapsed = time.perf_counter() - start
+        sql = '\n'.join(query['sql'] for query in context.captured_queries)
+        assert len(context) <= max_queries, f"{len(context)} queries, budget is {max_queries}:\n{sql}"
+        assert elapsed <= seconds * TIME_FACTOR, f"{elapsed:.3f}s, budget is {seconds * TIME_FACTOR:.3f}s"
+
+    return budget
+
+
+@pytest.fixture(scope='module', params=SEED_SIZES, ids=lambda size: f'{size}_rows')
+def seeded_user(request, django_db_setup, django_db_blocker):
+    """
+    (user, budget) where the user holds `size` transactions over the last three years,
+    80% Expense, most expenses against `budget`, with the MonthlySummary rollups in step.
+    The data is committed once per module and size and deleted afterwards.
+    """
+    from django.utils import timezone
+    from accounts.models import User
+    from budgets.models import Budget
+    from transactions.models import Transaction
+    from transactions.services import BULK_BATCH_SIZE, record_created
+
+    size = request.param
+    with django_db_blocker.unblock():
+        user = User.objects.create_user(username=f'seeded{size}', email=f'seeded{size}@example.com', password='!')
+        budget = Budget.objects.create(
+            user=user, title='seeded', total_amount=10**12, start_date=timezone.now().date() - timedelta(days=1095)
+        )
+        now = timezone.now()
+        transactions = [
+            Transaction(
+                user=user,
+                title=f'seeded {index}',
+                amount=index % 997 + 1,
+                type='Income' if index % 5 == 0 else 'Expense',
+                budget=budget if index % 3 and index % 5 else None,
+                date=now - timedelta(minutes=index * 1577 % 1576800),
+            )
+            for index in range(size)
+        ]
+        Transaction.objects.bulk_create(transactions, batch_size=BULK_BATCH_SIZE)
+        record_created(transactions)
+    yield user, budget
+    with django_db_blocker.unblock():
+        Transaction.objects.filter(user=user).delete()
+        user.delete()
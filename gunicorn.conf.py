@@ -0,0 +1,44 @@
+"""
+Gunicorn configuration (picked up automatically from the working directory).
+
+Worker count, threads and the matching DB pool come from Finance_Management/server.py.
+WEB_WORKER_CLASS=uvicorn serves the ASGI application with uvicorn workers instead of
+threaded WSGI workers.
+"""
+
+import os
+
+from Finance_Management.server import self_check, worker_layout
+
+layout = worker_layout()
+
+bind = os.getenv("WEB_BIND", "0.0.0.0:8000")
+workers = layout["workers"]
+if layout["worker_class"] == "uvicorn":
+    worker_class = "uvicorn_worker.UvicornWorker"
+    wsgi_app = "Finance_Management.asgi:application"
+else:
+    worker_class = "gthread"
+    threads = layout["threads"]
+    wsgi_app = "Finance_Management.wsgi:application"
+
+timeout = int(os.getenv("WEB_TIMEOUT", 30))
+graceful_timeout = 30
+keepalive = 5
+# Recycle workers periodically to bound memory growth.
+max_requests = int(os.getenv("WEB_MAX_REQUESTS", 2000))
+max_requests_jitter = max_requests // 10
+accesslog = os.getenv("WEB_ACCESS_LOG") or None
+errorlog = "-"
+
+
+def when_ready(server):
+    """Startup self-check: report the effective layout, then run Django's deploy checks."""
+    import django
+    from django.conf import settings
+    from django.core.management import call_command
+
+    django.setup()
+    for level, message in self_check(layout, settings):
+        getattr(server.log, level)("self-check: %s", message)
+    call_command("check", deploy=True)
@@ -0,0 +1,25 @@
+from django.contrib import admin
+from django.utils import timezone
+from .models import Job
+from .queue import cancel
+
+
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ('id', 'name', 'user', 'status', 'priority', 'attempts', 'run_at', 'finished')
+    list_filter = ('status', 'name')
+    search_fields = ('name', 'user__username')
+    readonly_fields = ('attempts', 'locked_by', 'locked_at', 'result', 'error', 'created', 'finished')
+    actions = ['cancel_jobs', 'retry_jobs']
+
+    @admin.action(description="Cancel the selected queued jobs")
+    def cancel_jobs(self, request, queryset):
+        cancelled = sum(cancel(job) for job in queryset.filter(status='queued'))
+        self.message_user(request, f"Cancelled {cancelled} job(s)")
+
+    @admin.action(description="Queue the selected failed jobs again")
+    def retry_jobs(self, request, queryset):
+        retried = queryset.filter(status='failed').update(
+            status='queued', attempts=0, finished=None, run_at=timezone.now()
+        )
+        self.message_user(request, f"Queued {retried} job(s) again")
@@ -0,0 +1,26 @@
+"""
+Run background job workers.
+
+    python manage.py run_workers [--concurrency N] [--mode thread|process] [--drain]
+Stops on SIGINT/SIGTERM once the jobs in hand are finished. Run as many copies, on as
+many hosts, as needed: jobs are claimed with SELECT ... FOR UPDATE SKIP LOCKED.
+"""
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from jobs.worker import run_pool
+
+
+class Command(BaseCommand):
+    help = "Claim and run queued jobs with a pool of worker threads or processes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--concurrency', type=int, default=settings.JOB_WORKER_CONCURRENCY, help="Workers in the pool.")
+        parser.add_argument('--mode', choices=['thread', 'process'], default=settings.JOB_WORKER_MODE)
+        parser.add_argument('--drain', action='store_true', help="Exit once no job is due, instead of polling.")
+        parser.add_argument('--poll-interval', type=float, help="Seconds an idle worker waits before polling again.")
+
+    def handle(self, *args, concurrency, mode, drain=False, poll_interval=None, **options):
+        self.stdout.write(f"Starting {concurrency} {mode} worker(s)")
+        ran = run_pool(max(concurrency, 1), mode=mode, drain=drain, poll_interval=poll_interval)
+        self.stdout.write(self.style.SUCCESS("Workers stopped" if ran is None else f"Ran {ran} job(s)"))
@@ -0,0 +1,46 @@
+from django.db import models
+from accounts.models import User
+
+
+class Job(models.Model):
+    """
+    A unit of background work: the name of a registered task and its JSON payload.
+    Workers claim queued jobs whose run_at has passed with SELECT ... FOR UPDATE SKIP LOCKED
+    (highest priority first, then oldest); see jobs/queue.py.
+    """
+
+    STATUS_CHOICES = [
+        ('queued', 'queued'),
+        ('running', 'running'),
+        ('done', 'done'),
+        ('failed', 'failed'),
+        ('cancelled', 'cancelled'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, null=True, blank=True, db_index=False)  # None: system job
+    name = models.CharField(max_length=100)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=9, choices=STATUS_CHOICES, default='queued')
+    priority = models.SmallIntegerField(default=0)  # higher runs first
+    run_at = models.DateTimeField()
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField()
+    locked_by = models.CharField(max_length=100, blank=True)
+    locked_at = models.DateTimeField(null=True, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # The dequeue scan; only queued rows are indexed, so it stays small however many jobs ran.
+            models.Index(
+                fields=['-priority', 'run_at', 'id'], condition=models.Q(status='queued'), name='job_queue_idx'
+            ),
+            models.Index(fields=['locked_at'], condition=models.Q(status='running'), name='job_running_idx'),
+            models.Index(fields=['user', '-id'], name='job_user_id_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.id} - {self.name} - {self.status}'
@@ -0,0 +1,160 @@
+"""
+Database-backed job queue: no broker, just the Job table.
+
+- Apps register job functions with @task('app.name') in their tasks.py; a function takes
+  the Job and returns a JSON-serializable result.
+- enqueue() inserts a queued Job. Inside a database transaction it only becomes visible
+  to workers on commit, so a job never runs against data that was rolled back.
+- claim() takes the next due job with SELECT ... FOR UPDATE SKIP LOCKED, so any number of
+  workers dequeue concurrently without ever handing out the same job twice.
+- execute() runs it, refreshing the job's locked_at every JOB_HEARTBEAT_INTERVAL seconds
+  from a background thread. A failure is retried with exponential backoff (JOB_RETRY_DELAY,
+  doubled per attempt) until max_attempts, then the job is marked failed.
+- requeue_stale() hands jobs whose worker died (no heartbeat for JOB_TIMEOUT seconds) back
+  to the queue; the attempt they used counts, and worker_lost() tells the next attempt.
+"""
+
+import threading
+import traceback
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import DatabaseError, connection, transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+from .models import Job
+
+TASKS = {}
+WORKER_LOST = "Worker lost"
+
+
+def task(name):
+    """Register the decorated function as the job named `name`."""
+    def register(func):
+        if name in TASKS:
+            raise ValueError(f"Task {name!r} is already registered")
+        TASKS[name] = func
+        return func
+
+    return register
+
+
+def enqueue(name, payload=None, user=None, priority=0, run_at=None, max_attempts=None):
+    """Queue a job for a registered task and return it."""
+    if name not in TASKS:
+        raise LookupError(f"No task named {name!r}")
+    return Job.objects.create(
+        name=name, payload=payload or {}, user=user, priority=priority, run_at=run_at or timezone.now(),
+        max_attempts=max_attempts or settings.JOB_MAX_ATTEMPTS,
+    )
+
+
+def claim(worker_id):
+    """Mark the next due job running for `worker_id` and return it, or None when nothing is due."""
+    now = timezone.now()
+    with db_transaction.atomic():
+        job = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(status='queued', run_at__lte=now)
+            .order_by('-priority', 'run_at', 'id')
+            .first()
+        )
+        if job is None:
+            return None
+        job.status, job.locked_by, job.locked_at = 'running', worker_id, now
+        job.attempts += 1
+        job.save(update_fields=['status', 'locked_by', 'locked_at', 'attempts'])
+    return job
+
+
+def execute(job):
+    """Run a claimed job, with a heartbeat, and record its result, its retry or its failure."""
+    func = TASKS.get(job.name)
+    try:
+        if func is None:
+            raise LookupError(f"No task named {job.name!r}")
+        with Heartbeat(job):
+            result = func(job)
+    except Exception:
+        error = traceback.format_exc()
+        now = timezone.now()
+        if func is not None and job.attempts < job.max_attempts:
+            delay = timedelta(seconds=settings.JOB_RETRY_DELAY * 2 ** (job.attempts - 1))
+            _finish(job, status='queued', run_at=now + delay, error=error)
+        else:
+            _finish(job, status='failed', finished=now, error=error)
+    else:
+        _finish(job, status='done', result=result, finished=timezone.now(), error='')
+    return job
+
+
+def _held(job):
+    # Only the worker that holds the job may touch it: a job requeued as stale (and maybe
+    # claimed again) or cancelled meanwhile is left alone.
+    return Job.objects.filter(pk=job.pk, status='running', locked_by=job.locked_by, attempts=job.attempts)
+
+
+def _finish(job, **fields):
+    fields.update(locked_by='', locked_at=None)
+    _held(job).update(**fields)
+    for name, value in fields.items():
+        setattr(job, name, value)
+
+
+class Heartbeat:
+    """
+    Refresh a running job's locked_at every `interval` seconds (JOB_HEARTBEAT_INTERVAL) from a
+    background thread while the block runs, so requeue_stale() leaves a long job alone.
+    """
+
+    def __init__(self, job, interval=None):
+        self.job = job
+        self.interval = settings.JOB_HEARTBEAT_INTERVAL if interval is None else interval
+        self.stop = threading.Event()
+        self.thread = threading.Thread(target=self._run, name=f'heartbeat-{job.pk}', daemon=True)
+
+    def __enter__(self):
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop.set()
+        self.thread.join()
+
+    def beat(self):
+        """Refresh locked_at now. Returns False when the job is no longer held by this worker."""
+        return _held(self.job).update(locked_at=timezone.now()) == 1
+
+    def _run(self):
+        try:
+            while not self.stop.wait(self.interval):
+                try:
+                    if not self.beat():
+                        return
+                except DatabaseError:
+                    connection.close()  # reconnect on the next beat
+        finally:
+            connection.close()  # the thread's own connection
+
+
+def worker_lost(job):
+    """True when the job's previous attempt was requeued because its worker stopped heartbeating."""
+    return job.attempts > 1 and job.error.startswith(WORKER_LOST)
+
+
+def requeue_stale():
+    """Requeue (or fail, when out of attempts) jobs without a heartbeat for JOB_TIMEOUT seconds. Returns the count."""
+    cutoff = timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT)
+    stale = Job.objects.filter(status='running', locked_at__lt=cutoff)
+    error = f"{WORKER_LOST}: no heartbeat for more than {settings.JOB_TIMEOUT}s"
+    failed = stale.filter(attempts__gte=F('max_attempts')).update(
+        status='failed', finished=timezone.now(), error=error, locked_by='', locked_at=None
+    )
+    requeued = stale.update(status='queued', error=error, locked_by='', locked_at=None)
+    return failed + requeued
+
+
+def cancel(job):
+    """Cancel a job that hasn't started. Returns True when it was still queued."""
+    cancelled = Job.objects.filter(pk=job.pk, status='queued').update(status='cancelled', finished=timezone.now())
+    return cancelled == 1
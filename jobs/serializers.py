@@ -0,0 +1,18 @@
+"""
+Serializers for the Jobs app.
+"""
+
+from rest_framework import serializers
+from .models import Job
+
+
+class JobSerializer(serializers.ModelSerializer):
+    """Read-only view of a job: what it runs, where it is, and its result or last error."""
+
+    class Meta:
+        model = Job
+        fields = (
+            'id', 'name', 'payload', 'status', 'priority', 'run_at', 'attempts', 'max_attempts',
+            'result', 'error', 'created', 'finished',
+        )
+        read_only_fields = fields
@@ -0,0 +1,162 @@
+"""
+Test suite for the Jobs app.
+
+This file contains tests for the job queue, the run_workers command and JobAPIView.
+The tests cover:
+- Claiming jobs by priority and due time, retries with backoff, and final failure.
+- Heartbeats of running jobs, and requeueing jobs whose worker died.
+- Background imports and exports run by a worker, and the job status endpoints.
+"""
+
+import threading
+from datetime import timedelta
+
+import pytest
+from rest_framework.test import APIClient
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework import status
+from accounts.models import User
+from jobs.models import Job
+from jobs.queue import TASKS, Heartbeat, claim, enqueue, execute, requeue_stale, task, worker_lost
+from transactions.models import Transaction
+
+CALLS = []
+
+
+@task('tests.flaky')
+def flaky(job):
+    CALLS.append(job.attempts)
+    if job.attempts < job.payload.get('succeed_on', 1):
+        raise RuntimeError("try again")
+    return {'attempt': job.attempts}
+
+
+@pytest.fixture
+def api_client():
+    """Fixture to provide an APIClient instance for making HTTP requests."""
+    return APIClient()
+
+
+@pytest.fixture
+def create_user():
+    """Fixture to create a test user."""
+    user = User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='ComplexPass123!@#'
+    )
+    return user
+
+
+@pytest.mark.django_db
+def test_job_queue_claims_retries_and_fails(settings):
+    """
+    Test the queue mechanics.
+    Ensures due jobs are claimed by priority, failures are retried with backoff until
+    max_attempts, and jobs of a dead worker are requeued.
+    """
+    CALLS.clear()
+    later = enqueue('tests.flaky', run_at=timezone.now() + timedelta(hours=1))
+    low = enqueue('tests.flaky', {'succeed_on': 2})
+    high = enqueue('tests.flaky', priority=5)
+    assert claim('w1').pk == high.pk
+    assert claim('w1').pk == low.pk
+    assert claim('w1') is None, "a job due later must not be claimed"
+
+    job = execute(Job.objects.get(pk=low.pk))
+    job.refresh_from_db()
+    assert (job.status, job.attempts) == ('queued', 1) and 'try again' in job.error
+    assert job.run_at >= timezone.now() + timedelta(seconds=settings.JOB_RETRY_DELAY - 5)
+    Job.objects.filter(pk=job.pk).update(run_at=timezone.now())
+    job = execute(claim('w1'))
+    assert (job.status, job.result) == ('done', {'attempt': 2})
+
+    doomed = enqueue('tests.flaky', {'succeed_on': 9}, max_attempts=1)
+    job = execute(claim('w1'))
+    job.refresh_from_db()
+    assert (job.pk, job.status) == (doomed.pk, 'failed')
+
+    Job.objects.filter(pk=high.pk).update(locked_at=timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT + 1))
+    assert requeue_stale() == 1
+    assert Job.objects.get(pk=high.pk).status == 'queued'
+    assert Job.objects.get(pk=later.pk).status == 'queued'
+    assert 'tests.flaky' in TASKS and CALLS == [1, 2, 1]
+
+
+@pytest.mark.django_db
+def test_job_heartbeat_keeps_long_jobs_running(settings, monkeypatch):
+    """
+    Test the heartbeat of running jobs.
+    Ensures a job whose worker still beats is not requeued however long it runs, one that
+    missed its heartbeats is, and only the attempt after a lost worker takes over its work.
+    """
+    enqueue('tests.flaky')
+    job = claim('w1')
+    assert not worker_lost(job)
+    started = timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT * 10)
+    Job.objects.filter(pk=job.pk).update(locked_at=started)
+    heartbeat = Heartbeat(job)
+    assert heartbeat.beat()
+    assert requeue_stale() == 0
+    assert Job.objects.get(pk=job.pk).status == 'running'
+
+    Job.objects.filter(pk=job.pk).update(locked_at=timezone.now() - timedelta(seconds=settings.JOB_TIMEOUT + 1))
+    assert requeue_stale() == 1
+    assert not heartbeat.beat(), "the requeued job is no longer this worker's"
+    retry = claim('w2')
+    assert retry.pk == job.pk and worker_lost(retry)
+
+    beats = threading.Event()
+    monkeypatch.setattr(Heartbeat, 'beat', lambda self: beats.set() or True)  # the thread has its own connection
+    with Heartbeat(retry, interval=0.01) as heartbeat:
+        assert beats.wait(5)
+    assert not heartbeat.thread.is_alive()
+
+
+@pytest.mark.django_db
+def test_background_import_and_export(api_client, create_user, settings, tmp_path):
+    """
+    Test heavy work moved off the request.
+    Ensures a background import and export return 202 with a job, run_workers runs them,
+    and the job endpoints report, cancel and download.
+    """
+    settings.MEDIA_ROOT = tmp_path
+    user = create_user
+    api_client.force_authenticate(user=user)
+    statement = b"date,description,amount\n2024-01-05,Coffee,-3\n2024-01-06,Salary,2500\n"
+    response = api_client.post(
+        reverse('transactions:transaction-import'),
+        {'file': SimpleUploadedFile('jan.csv', statement), 'background': 'true'},
+        format='multipart',
+    )
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_202_ACCEPTED, f"Error: {response.data}"
+    assert Transaction.objects.filter(user=user).count() == 0
+    import_job = response.data['job']
+
+    response = api_client.get(reverse('transactions:transaction-export'), {'output': 'csv', 'background': '1', 'type': 'Income'})
+    assert response.status_code == status.HTTP_202_ACCEPTED, f"Error: {response.data}"
+    export_job = response.data['id']
+    cancelled = enqueue('transactions.rebuild_summaries', user=user)
+    response = api_client.post(reverse('jobs:job-cancel', kwargs={'pk': cancelled.pk}))
+    assert response.data['status'] == 'cancelled'
+
+    call_command('run_workers', concurrency=1, mode='thread', drain=True)
+
+    response = api_client.get(reverse('jobs:job-detail', kwargs={'pk': import_job}))
+    print(f"Response data: {response.data}")
+    assert response.data['status'] == 'done' and response.data['result']['created_count'] == 2
+    response = api_client.get(reverse('jobs:job-list'))
+    assert [job['id'] for job in response.data] == [cancelled.pk, export_job, import_job]
+    response = api_client.get(reverse('jobs:job-download', kwargs={'pk': export_job}))
+    assert response.status_code == status.HTTP_200_OK
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    assert len(lines) == 2 and 'Salary' in lines[1]
+    assert api_client.post(reverse('jobs:job-cancel', kwargs={'pk': export_job})).status_code == status.HTTP_400_BAD_REQUEST
+
+    other = User.objects.create_user(username='other', email='other@example.com', password='ComplexPass123!@#')
+    api_client.force_authenticate(user=other)
+    assert api_client.get(reverse('jobs:job-detail', kwargs={'pk': import_job})).status_code == status.HTTP_404_NOT_FOUND
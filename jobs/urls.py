@@ -0,0 +1,15 @@
+"""
+URL configuration for the Jobs app.
+
+Registers JobAPIView with a SimpleRouter.
+Mounted at /api/jobs/ in the main urls.py.
+"""
+
+from rest_framework import routers
+from . import views
+
+app_name = "jobs"
+router = routers.SimpleRouter()
+router.register('', views.JobAPIView, basename='job')
+
+urlpatterns = router.urls
@@ -0,0 +1,65 @@
+"""
+Views for the Jobs app.
+
+Lets users follow the background jobs they started (imports, exports, ...) and cancel
+the ones that haven't begun. Jobs are created by the endpoints that offer a background
+mode, never directly.
+"""
+
+from django.http import FileResponse
+from django.core.files.storage import default_storage
+from django.shortcuts import get_object_or_404
+from rest_framework import status, viewsets
+from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound, ValidationError
+from rest_framework.permissions import IsAuthenticated
+from rest_framework.response import Response
+from accounts.authentication import ClaimsJWTAuthentication
+from Finance_Management.pagination import KeysetPagination
+from .models import Job
+from .queue import cancel
+from .serializers import JobSerializer
+
+
+class JobAPIView(viewsets.ViewSet):
+    """
+    API ViewSet for the authenticated user's jobs: list, retrieve, cancel and, for jobs that
+    produced a file, download.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [ClaimsJWTAuthentication]
+    queryset = Job.objects.all()
+    serializer_class = JobSerializer
+    ordering = ('-id',)
+
+    def list(self, request):
+        """List the user's jobs, newest first, one keyset page at a time; `?status=` filters."""
+        jobs = self.queryset.filter(user=request.user)
+        if request.query_params.get('status'):
+            jobs = jobs.filter(status=request.query_params['status'])
+        paginator = KeysetPagination(ordering=self.ordering)
+        page = paginator.paginate_queryset(jobs, request, view=self)
+        return paginator.get_paginated_response(self.serializer_class(page, many=True).data)
+
+    def retrieve(self, request, pk=None):
+        """Retrieve one of the user's jobs; poll it to follow progress."""
+        job = get_object_or_404(self.queryset, pk=pk, user=request.user)
+        return Response(self.serializer_class(job).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['post'])
+    def cancel(self, request, pk=None):
+        """Cancel a queued job; 400 once it is running or over."""
+        job = get_object_or_404(self.queryset, pk=pk, user=request.user)
+        if not cancel(job):
+            raise ValidationError({"status": f"The job is {job.status}"})
+        job.refresh_from_db()
+        return Response(self.serializer_class(job).data, status=status.HTTP_200_OK)
+
+    @action(detail=True, methods=['get'])
+    def download(self, request, pk=None):
+        """Stream the file a finished job wrote (its result's `file`), e.g. a background export."""
+        job = get_object_or_404(self.queryset, pk=pk, user=request.user, status='done')
+        name = (job.result or {}).get('file') if isinstance(job.result, dict) else None
+        if not name or not default_storage.exists(name):
+            raise NotFound("This job has no file")
+        return FileResponse(default_storage.open(name, 'rb'), as_attachment=True, filename=name.rsplit('/', 1)[-1])
@@ -0,0 +1,109 @@
+"""
+Worker loops and pools for `manage.py run_workers`.
+
+Each worker claims and runs jobs one at a time until asked to stop, and finishes the job
+in hand before it exits. Idle workers poll every JOB_POLL_INTERVAL seconds and, at most
+once per JOB_STALE_CHECK_INTERVAL, requeue jobs whose worker died (missed its heartbeats).
+Threads share one process and suit I/O-bound jobs; processes (spawned, each with its own
+database connection) suit CPU-bound ones such as imports and exports.
+"""
+
+import multiprocessing
+import os
+import signal
+import socket
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from .queue import claim, execute, requeue_stale
+
+
+def worker_name(index):
+    return f'{socket.gethostname()}:{os.getpid()}:{index}'
+
+
+def work(stop, index, drain=False, poll_interval=None, own_connection=True):
+    """
+    Run jobs until `stop` is set; with `drain`, return as soon as no job is due.
+    A worker with its own thread or process also manages its database connection, closing
+    it when it goes stale (CONN_MAX_AGE) and on exit. Returns the number of jobs run.
+    """
+    poll_interval = settings.JOB_POLL_INTERVAL if poll_interval is None else poll_interval
+    name, ran, checked = worker_name(index), 0, 0.0
+    try:
+        while not stop.is_set():
+            if own_connection:
+                close_old_connections()
+            if time.monotonic() - checked >= settings.JOB_STALE_CHECK_INTERVAL:
+                requeue_stale()
+                checked = time.monotonic()
+            job = claim(name)
+            if job is None:
+                if drain:
+                    break
+                stop.wait(poll_interval)
+                continue
+            execute(job)
+            ran += 1
+    finally:
+        if own_connection:
+            connection.close()
+    return ran
+
+
+def _process_main(stop, index, drain, poll_interval):
+    import django
+
+    django.setup()
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the parent turns Ctrl-C into `stop`
+    work(stop, index, drain, poll_interval)
+
+
+def run_pool(concurrency, mode='thread', drain=False, poll_interval=None):
+    """
+    Run `concurrency` workers (threads or processes) until SIGINT/SIGTERM, or until the
+    queue is drained with `drain`. A single thread worker runs in the calling thread.
+    """
+    if mode == 'process':
+        context = multiprocessing.get_context('spawn')
+        stop = context.Event()
+        workers = [
+            context.Process(target=_process_main, args=(stop, index, drain, poll_interval), daemon=True)
+            for index in range(concurrency)
+        ]
+    else:
+        stop = threading.Event()
+        if concurrency == 1:
+            with _stop_on_signals(stop):
+                return work(stop, 0, drain, poll_interval, own_connection=False)
+        workers = [
+            threading.Thread(target=work, args=(stop, index, drain, poll_interval), daemon=True)
+            for index in range(concurrency)
+        ]
+    with _stop_on_signals(stop):
+        for worker in workers:
+            worker.start()
+        while any(worker.is_alive() for worker in workers):
+            for worker in workers:
+                worker.join(timeout=0.5)
+    return None
+
+
+class _stop_on_signals:
+    """Set `stop` on SIGINT/SIGTERM (when running in the main thread) and restore the handlers after."""
+
+    def __init__(self, stop):
+        self.stop = stop
+        self.previous = {}
+
+    def __enter__(self):
+        if threading.current_thread() is threading.main_thread():
+            for signum in (signal.SIGINT, signal.SIGTERM):
+                self.previous[signum] = signal.signal(signum, lambda *args: self.stop.set())
+        return self
+
+    def __exit__(self, *exc_info):
+        for signum, handler in self.previous.items():
+            signal.signal(signum, handler)
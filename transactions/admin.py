@@ -1,14 +1,127 @@
-from django.contrib import admin
-from .models import Transaction
+from django import forms
+from django.contrib import admin, messages
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.http import HttpResponseRedirect
+from rest_framework import serializers
+from .models import LedgerEntry, LedgerSnapshot, MonthlySummary, RecurringTransaction, StatementImport, Transaction
+from .search import search_transactions
+from .serializers import TransactionSerializer
+from .services import apply_budget_deltas, budget_deltas, delete_transaction, record_created, record_deleted, record_updated
 
 
 
 
+class TransactionAdminForm(forms.ModelForm):
+    """Runs the API's budget checks, so an expense the budget cannot cover is a form error."""
+
+    class Meta:
+        model = Transaction
+        fields = '__all__'
+
+    def clean(self):
+        cleaned_data = super().clean()
+        serializer = TransactionSerializer(instance=self.instance if self.instance.pk else None)
+        try:
+            serializer.validate(dict(cleaned_data))
+        except serializers.ValidationError as exc:
+            for field, errors in serializers.as_serializer_error(exc).items():
+                for error in errors:
+                    self.add_error(field, str(error))
+        return cleaned_data
+
+
 @admin.register(Transaction)
 class TransactionAdmin(admin.ModelAdmin):
+    form = TransactionAdminForm
     list_display = ('id', 'user', 'title', 'amount', 'type', 'budget', 'date')
     list_filter = ('type', 'budget', 'date')
     search_fields = ('title', 'user__username', 'notes')
     readonly_fields = ('date',)
 
+    def get_search_results(self, request, queryset, search_term):
+        """Match title and notes through the full-text index, or the exact username."""
+        if not search_term.strip():
+            return queryset, False
+        matches = search_transactions(Transaction.objects.all(), search_term).values('pk')
+        return queryset.filter(Q(pk__in=matches) | Q(user__username=search_term.strip())), False
+
+    def changeform_view(self, request, object_id=None, form_url='', extra_context=None):
+        """
+        Report a debit that failed after the form validated (another write spent the funds
+        meanwhile) as an error on the same page; the admin's atomic block has rolled it back.
+        """
+        try:
+            return super().changeform_view(request, object_id, form_url, extra_context)
+        except serializers.ValidationError as exc:
+            for errors in serializers.as_serializer_error(exc).values():
+                for error in errors:
+                    self.message_user(request, str(error), messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+
+    def save_model(self, request, obj, form, change):
+        """Save through the same conditional budget debit and bookkeeping as the API."""
+        with db_transaction.atomic():
+            if change:
+                before = Transaction.objects.get(pk=obj.pk)
+                super().save_model(request, obj, form, change)
+                record_updated(before, obj)
+            else:
+                apply_budget_deltas(budget_deltas([obj], -1))
+                super().save_model(request, obj, form, change)
+                record_created([obj])
+
+    def delete_model(self, request, obj):
+        delete_transaction(obj)
+
+    def delete_queryset(self, request, queryset):
+        with db_transaction.atomic():
+            deleted = list(queryset)
+            queryset.delete()
+            record_deleted(deleted)
+
+
+@admin.register(MonthlySummary)
+class MonthlySummaryAdmin(admin.ModelAdmin):
+    list_display = ('user', 'budget', 'year_month', 'type', 'total', 'count')
+    list_filter = ('type', 'year_month')
+
+
+@admin.register(RecurringTransaction)
+class RecurringTransactionAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'title', 'amount', 'type', 'frequency', 'interval', 'next_occurrence')
+    list_filter = ('type', 'frequency')
+    search_fields = ('title', 'user__username')
+    readonly_fields = ('materialized_count', 'next_occurrence')
+
+
+class ReadOnlyAdmin(admin.ModelAdmin):
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    def has_delete_permission(self, request, obj=None):
+        return False
+
+
+@admin.register(LedgerEntry)
+class LedgerEntryAdmin(ReadOnlyAdmin):
+    list_display = ('id', 'user', 'budget_id', 'transaction_id', 'kind', 'amount', 'date')
+    list_filter = ('kind',)
+    search_fields = ('user__username',)
+
+
+@admin.register(LedgerSnapshot)
+class LedgerSnapshotAdmin(ReadOnlyAdmin):
+    list_display = ('user', 'budget_id', 'cutoff', 'balance')
+    list_filter = ('cutoff',)
+
 
+@admin.register(StatementImport)
+class StatementImportAdmin(admin.ModelAdmin):
+    list_display = ('id', 'user', 'format', 'status', 'rows_read', 'created_count', 'duplicate_count', 'error_count', 'created')
+    list_filter = ('status', 'format')
+    search_fields = ('user__username',)
+    readonly_fields = ('rows_read', 'created_count', 'duplicate_count', 'error_count', 'errors', 'finished')
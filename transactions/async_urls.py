@@ -0,0 +1,15 @@
+"""
+Async URL configuration for the Transactions app.
+
+Registers AsyncTransactionAPIView with a SimpleRouter; same routes as urls.py.
+Mounted at /api/async/transactions/ in the main urls.py.
+"""
+
+from rest_framework import routers
+from . import async_views
+
+app_name = "async_transactions"
+router = routers.SimpleRouter()
+router.register('', async_views.AsyncTransactionAPIView, basename='transaction')
+
+urlpatterns = router.urls
@@ -0,0 +1,107 @@
+"""
+Async views for the Transactions app.
+
+AsyncTransactionAPIView mirrors TransactionAPIView for ASGI deployments and is mounted
+at /api/async/transactions/. Reads run on Django's async ORM end to end; writes that
+need a database transaction (budget debit, rollups) run the existing sync code in a
+single sync_to_async hop, because the async ORM has no atomic().
+"""
+
+from adrf.viewsets import ViewSet
+from asgiref.sync import sync_to_async
+from rest_framework import status
+from rest_framework.response import Response
+from rest_framework.permissions import IsAuthenticated
+from accounts.authentication import ClaimsJWTAuthentication
+from django.shortcuts import aget_object_or_404
+from budgets.models import Budget
+from Finance_Management.cache import cached_response
+from Finance_Management.pagination import KeysetPagination
+from .models import Transaction
+from .rows import compile_formatter
+from .serializers import TransactionSerializer
+from .services import delete_transaction
+from .views import TransactionAPIView
+
+
+class AsyncTransactionAPIView(ViewSet):
+    """
+    Async API ViewSet for Transaction model.
+    Same list/create/retrieve/partial_update/destroy contract as TransactionAPIView.
+    """
+    permission_classes = [IsAuthenticated]
+    authentication_classes = [ClaimsJWTAuthentication]
+    queryset = Transaction.objects.all()
+    serializer_class = TransactionSerializer
+    ordering = TransactionAPIView.ordering
+
+    get_filtered_queryset = TransactionAPIView.get_filtered_queryset
+
+    async def get_budgets(self, request):
+        """
+        Preload the referenced budget, if it is the user's, for BudgetField (`context['budgets']`),
+        so serializer validation needs no sync query. A body that isn't an object is left to the serializer.
+        """
+        if not isinstance(request.data, dict):
+            return {}
+        try:
+            budget_id = int(request.data.get('budget'))
+        except (TypeError, ValueError):
+            return {}
+        return {budget.pk: budget async for budget in Budget.objects.filter(pk=budget_id, user=request.user)}
+
+    @cached_response
+    async def list(self, request):
+        """
+        List transactions for the authenticated user, one keyset page at a time.
+        Supports the same cursor, limit, fields and filter params as TransactionAPIView.list.
+        """
+        fields = self.serializer_class.get_requested_fields(request)
+        columns, format_row = compile_formatter(fields)
+        transactions = self.get_filtered_queryset(request).values(*dict.fromkeys(columns + self.ordering))
+        paginator = KeysetPagination(ordering=self.ordering)
+        page = await paginator.apaginate_queryset(transactions, request, view=self)
+        return paginator.get_paginated_response([format_row(row) for row in page])
+
+    async def create(self, request):
+        """
+        Create a new transaction for the authenticated user.
+        The budget debit and insert run atomically in one sync_to_async call.
+        """
+        context = {'budgets': await self.get_budgets(request)}
+        serializer = self.serializer_class(data=request.data, context=context)
+        serializer.is_valid(raise_exception=True)
+        await sync_to_async(serializer.save)(user=request.user)
+        return Response(serializer.data, status=status.HTTP_201_CREATED)
+
+    @cached_response
+    async def retrieve(self, request, pk=None):
+        """
+        Retrieve a specific transaction by ID.
+        Ensures the transaction belongs to the authenticated user.
+        """
+        transaction = await aget_object_or_404(self.queryset, pk=pk, user=request.user)
+        serializer = self.serializer_class(transaction)
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    async def partial_update(self, request, pk=None):
+        """
+        Partially update a transaction by ID.
+        Ensures the transaction belongs to the authenticated user. The saved budget is loaded
+        with it, since validation falls back to it when the request leaves the budget out.
+        """
+        transaction = await aget_object_or_404(self.queryset.select_related('budget'), pk=pk, user=request.user)
+        context = {'budgets': await self.get_budgets(request)}
+        serializer = self.serializer_class(transaction, data=request.data, partial=True, context=context)
+        serializer.is_valid(raise_exception=True)
+        await sync_to_async(serializer.save)()
+        return Response(serializer.data, status=status.HTTP_200_OK)
+
+    async def destroy(self, request, pk=None):
+        """
+        Delete a transaction by ID.
+        Ensures the transaction belongs to the authenticated user.
+        """
+        transaction = await aget_object_or_404(self.queryset, pk=pk, user=request.user)
+        await sync_to_async(delete_transaction)(transaction)
+        return Response({"message": "Transaction deleted"}, status=status.HTTP_204_NO_CONTENT)
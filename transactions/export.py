@@ -0,0 +1,61 @@
+"""
+Streaming export of a user's transactions.
+
+Rows are read with values() through a server-side cursor and formatted by the
+read-only fast path in rows.py, so memory stays flat regardless of how long the
+history is. The NDJSON output matches TransactionSerializer field for field.
+"""
+
+import csv
+import json
+
+from .rows import compile_formatter
+from .serializers import TransactionSerializer
+
+CHUNK_SIZE = 2000
+
+
+def iter_rows(queryset, chunk_size=CHUNK_SIZE):
+    """Yield serialized transaction dicts, as TransactionSerializer would render them."""
+    columns, format_row = compile_formatter()
+    for row in queryset.values(*columns).iterator(chunk_size=chunk_size):
+        yield format_row(row)
+
+
+def iter_ndjson(queryset, chunk_size=CHUNK_SIZE):
+    """Yield NDJSON text in chunks of `chunk_size` lines."""
+    dumps = json.JSONEncoder(ensure_ascii=False, separators=(',', ':')).encode
+    lines = []
+    for row in iter_rows(queryset, chunk_size):
+        lines.append(dumps(row))
+        if len(lines) >= chunk_size:
+            yield '\n'.join(lines) + '\n'
+            lines = []
+    if lines:
+        yield '\n'.join(lines) + '\n'
+
+
+class _Echo:
+    """File-like object whose write() returns the value instead of buffering it."""
+
+    def write(self, value):
+        return value
+
+
+def iter_csv(queryset, chunk_size=CHUNK_SIZE):
+    """Yield CSV text (header first) in chunks of `chunk_size` lines."""
+    writer = csv.writer(_Echo())
+    lines = [writer.writerow(TransactionSerializer.Meta.fields)]
+    for row in iter_rows(queryset, chunk_size):
+        lines.append(writer.writerow(row.values()))
+        if len(lines) >= chunk_size:
+            yield ''.join(lines)
+            lines = []
+    if lines:
+        yield ''.join(lines)
+
+
+EXPORT_FORMATS = {
+    'ndjson': (iter_ndjson, 'application/x-ndjson', 'ndjson'),
+    'csv': (iter_csv, 'text/csv', 'csv'),
+}
@@ -0,0 +1,383 @@
+"""
+Streaming import of bank statements (CSV or OFX) into transactions.
+
+The uploaded file is stored once and read back as a text stream, row by row, so memory
+stays flat whatever its size:
+- CSV rows are read with csv.reader; the date, amount (or debit/credit), description and
+  notes columns are found from the header or named in the import's options, as is the
+  thousands separator of the amounts (',' by default; '.' makes ',' the decimal mark);
+- OFX (1.x SGML or 2.x XML) is tokenized in fixed-size chunks and every <STMTTRN> becomes a row.
+A positive amount is an Income, a negative one an Expense; imported rows have no budget.
+
+Every row gets a fingerprint: a hash of the bank's FITID when the statement has one, else of
+date, amount, description and the row's ordinal among identical rows of that day. The
+(user, fingerprint) unique index turns re-importing an overlapping statement into a no-op.
+
+Rows are written STATEMENT_IMPORT_CHUNK_SIZE at a time, each chunk in its own database
+transaction: one SELECT of the known fingerprints, raw multi-row INSERTs (Finance_Management/db.py)
+that skip rows a concurrent import committed meanwhile, the record_created hooks, and the import's
+progress; skipped rows count as duplicates. An interrupted import resumes after its last committed chunk.
+"""
+
+import codecs
+import csv
+import hashlib
+import io
+import re
+import unicodedata
+from collections import Counter, namedtuple
+from datetime import datetime, timedelta, timezone as dt_timezone
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import IntegrityError, connection, transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+from Finance_Management.cache import invalidate_user
+from Finance_Management.db import insert_rows
+from .models import StatementImport, Transaction
+from .services import BULK_BATCH_SIZE, record_created
+
+MAX_REPORTED_ERRORS = 100
+CHUNK_ATTEMPTS = 3
+OFX_READ_SIZE = 64 * 1024
+DEFAULT_TITLE = 'Statement line'
+IMPORT_FIELDS = ('user', 'title', 'amount', 'type', 'date', 'notes', 'fingerprint')
+
+# Lower-cased header names tried, in order, when the import's options don't name a column.
+CSV_COLUMNS = {
+    'date_column': ('date', 'transaction date', 'posted', 'posting date', 'booking date', 'value date'),
+    'amount_column': ('amount', 'transaction amount', 'value'),
+    'debit_column': ('debit', 'withdrawal', 'withdrawals', 'paid out', 'money out'),
+    'credit_column': ('credit', 'deposit', 'deposits', 'paid in', 'money in'),
+    'description_column': ('description', 'title', 'payee', 'name', 'details', 'narrative'),
+    'notes_column': ('memo', 'notes', 'reference'),
+}
+
+StatementRow = namedtuple('StatementRow', 'date amount title notes reference')
+
+
+# Thousands separators an import may use, and the decimal mark that goes with each.
+DECIMAL_MARKS = {',': '.', '.': ',', ' ': '.', "'": '.'}
+
+
+@lru_cache(maxsize=None)
+def _amount_pattern(thousands):
+    group, mark = re.escape(thousands), re.escape(DECIMAL_MARKS[thousands])
+    return re.compile(rf'[+-]?(?:\d{{1,3}}(?:{group}\d{{3}})+|\d+)(?:{mark}\d+)?|[+-]?{mark}\d+')
+
+
+def parse_amount(text, scale=1, thousands=','):
+    """
+    A signed integer amount from statement text, in the repo's units times `scale`.
+    Accepts currency symbols, `thousands` separators between groups of three digits, a trailing
+    minus and (parentheses). Anything else, such as exponents, letters or a decimal mark that
+    doesn't go with `thousands`, raises ValueError.
+    """
+    cleaned = ''.join(char for char in text if unicodedata.category(char) != 'Sc').strip()
+    negative = cleaned.startswith('(') and cleaned.endswith(')')
+    if negative:
+        cleaned = cleaned[1:-1].strip()
+    if cleaned.endswith('-'):
+        negative, cleaned = True, cleaned[:-1].strip()
+    if thousands == ' ':
+        cleaned = re.sub(r'\s', ' ', cleaned)  # no-break spaces
+    if not _amount_pattern(thousands).fullmatch(cleaned):
+        raise ValueError(f"Invalid amount {text.strip()!r}")
+    value = Decimal(cleaned.replace(thousands, '').replace(DECIMAL_MARKS[thousands], '.')) * scale
+    value = int(value.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+    return -abs(value) if negative else value
+
+
+def parse_date(text, date_format=None):
+    """An aware datetime from a statement date; date-only values fall on midnight."""
+    try:
+        moment = datetime.strptime(text, date_format) if date_format else datetime.fromisoformat(text)
+    except ValueError:
+        raise ValueError(f"Invalid date {text!r}") from None
+    return moment if timezone.is_aware(moment) else timezone.make_aware(moment)
+
+
+def _resolve_columns(header, options):
+    lowered = {name.strip().lower(): index for index, name in enumerate(header)}
+    columns = {}
+    for option, candidates in CSV_COLUMNS.items():
+        name = options.get(option)
+        if name:
+            if name.strip().lower() not in lowered:
+                raise serializers.ValidationError({option: f"No column named {name!r} in the header"})
+            columns[option] = lowered[name.strip().lower()]
+            continue
+        columns[option] = next((lowered[c] for c in candidates if c in lowered), None)
+    if columns['date_column'] is None:
+        raise serializers.ValidationError({'date_column': "No date column found; name it with date_column"})
+    if columns['amount_column'] is None and columns['debit_column'] is None and columns['credit_column'] is None:
+        raise serializers.ValidationError({'amount_column': "No amount column found; name it with amount_column"})
+    return columns
+
+
+def parse_csv(stream, options):
+    """Yield (row_number, StatementRow or None, error or None) for each data row of a CSV stream."""
+    reader = csv.reader(stream, delimiter=options.get('delimiter') or ',')
+    header = next(reader, None)
+    if header is None:
+        raise serializers.ValidationError({'file': "The statement is empty"})
+    columns = _resolve_columns(header, options)
+    scale, date_format = options.get('amount_scale', 1), options.get('date_format')
+    thousands = options.get('thousands_separator', ',')
+    parse_day = lru_cache(maxsize=4096)(parse_date)  # statements repeat the same few dates over and over
+
+    def cell(row, option):
+        index = columns[option]
+        return row[index].strip() if index is not None and index < len(row) else ''
+
+    for row_number, row in enumerate(reader, start=1):
+        if not any(row):
+            continue
+        try:
+            date = parse_day(cell(row, 'date_column'), date_format)
+            if columns['amount_column'] is not None:
+                amount = parse_amount(cell(row, 'amount_column'), scale, thousands)
+            else:
+                debit, credit = cell(row, 'debit_column'), cell(row, 'credit_column')
+                amount = (
+                    (parse_amount(credit, scale, thousands) if credit else 0)
+                    - (abs(parse_amount(debit, scale, thousands)) if debit else 0)
+                )
+        except ValueError as exc:
+            yield row_number, None, str(exc)
+            continue
+        title, notes = cell(row, 'description_column'), cell(row, 'notes_column')
+        yield row_number, StatementRow(date, amount, title or notes or DEFAULT_TITLE, notes or None, None), None
+
+
+OFX_TOKEN = re.compile(r'<(/?)([A-Za-z0-9.]+)>([^<]*)')
+OFX_DATE = re.compile(r'(\d{8})(\d{6})?(?:\.\d+)?(?:\[([+-]?\d+(?:\.\d+)?)(?::[^\]]*)?\])?')
+
+
+def _ofx_tokens(stream):
+    """Yield (closing, TAG, text) from an OFX stream read OFX_READ_SIZE characters at a time."""
+    buffer = ''
+    while chunk := stream.read(OFX_READ_SIZE):
+        buffer += chunk
+        cut = buffer.rfind('<')  # the token starting here may continue in the next chunk
+        for match in OFX_TOKEN.finditer(buffer, 0, max(cut, 0)):
+            yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+        buffer = buffer[max(cut, 0):]
+    for match in OFX_TOKEN.finditer(buffer):
+        yield match.group(1) == '/', match.group(2).upper(), match.group(3).strip()
+
+
+def parse_ofx_date(text):
+    """An aware datetime from an OFX date: YYYYMMDD[HHMMSS[.XXX]][[offset:TZ]], GMT by default."""
+    match = OFX_DATE.match(text)
+    if not match:
+        raise ValueError(f"Invalid date {text!r}")
+    moment = datetime.strptime(match.group(1) + (match.group(2) or '000000'), '%Y%m%d%H%M%S')
+    offset = timedelta(hours=float(match.group(3) or 0))
+    return moment.replace(tzinfo=dt_timezone(offset))
+
+
+def parse_ofx(stream, options):
+    """Yield (row_number, StatementRow or None, error or None) for each <STMTTRN> of an OFX stream."""
+    scale, record, row_number = options.get('amount_scale', 1), None, 0
+    for closing, tag, text in _ofx_tokens(stream):
+        if tag == 'STMTTRN' and not closing:
+            record, row_number = {}, row_number + 1
+        elif tag == 'STMTTRN' and record is not None:
+            try:
+                date = parse_ofx_date(record.get('DTPOSTED', ''))
+                amount = parse_amount(record.get('TRNAMT', ''), scale)
+            except ValueError as exc:
+                yield row_number, None, str(exc)
+            else:
+                title = record.get('NAME') or record.get('MEMO') or DEFAULT_TITLE
+                notes = record.get('MEMO') if record.get('NAME') else None
+                yield row_number, StatementRow(date, amount, title, notes, record.get('FITID')), None
+            record = None
+        elif record is not None and not closing and text:
+            record.setdefault(tag, text)  # PAYEE's NAME must not replace the transaction's own
+
+
+PARSERS = {
+    'csv': parse_csv,
+    'ofx': parse_ofx,
+}
+
+
+def fingerprint(row, ordinal):
+    """Stable 32-hex-digit identity of a statement row; see the module docstring."""
+    if row.reference:
+        key = f'ref|{row.reference}'
+    else:
+        key = f'{row.date.isoformat()}|{row.amount}|{row.title}|{ordinal}'
+    return hashlib.blake2b(key.encode(), digest_size=16).hexdigest()
+
+
+def fingerprinted(rows):
+    """
+    Add each row's fingerprint. Identical rows are told apart by their ordinal within the
+    day; the counter is reset whenever the date changes, so memory is bounded by one day.
+    """
+    seen, day = Counter(), None
+    for row_number, row, error in rows:
+        if row is None:
+            yield row_number, None, None, error
+            continue
+        if row.date.date() != day:
+            seen.clear()
+            day = row.date.date()
+        key = (row.date, row.amount, row.title)
+        seen[key] += 1
+        yield row_number, row, fingerprint(row, seen[key] - 1), None
+
+
+def open_statement(statement_import):
+    binary = statement_import.file.open('rb')
+    return io.TextIOWrapper(
+        binary, encoding=statement_import.options.get('encoding') or 'utf-8-sig', errors='replace', newline=''
+    )
+
+
+def run_import(statement_import, chunk_size=None, force=False):
+    """
+    Import (or resume) a statement. A 'running' import is only taken over with `force`,
+    for one whose worker died. Row errors are counted and the first MAX_REPORTED_ERRORS kept;
+    a statement that can't be read at all marks the import 'failed'. Returns it refreshed.
+    """
+    chunk_size = chunk_size or settings.STATEMENT_IMPORT_CHUNK_SIZE
+    claimable = ['pending', 'failed', 'running'] if force else ['pending', 'failed']
+    if not StatementImport.objects.filter(pk=statement_import.pk, status__in=claimable).update(
+        status='running', message=''
+    ):
+        statement_import.refresh_from_db()
+        raise serializers.ValidationError({'status': f"The import is {statement_import.status}"})
+    statement_import.refresh_from_db()
+    user_id, resume_after = statement_import.user_id, statement_import.rows_read
+    try:
+        _import_rows(statement_import, resume_after, chunk_size)
+    except (serializers.ValidationError, UnicodeError, csv.Error, OSError) as exc:
+        StatementImport.objects.filter(pk=statement_import.pk).update(status='failed', message=_error_text(exc))
+    except BaseException:
+        StatementImport.objects.filter(pk=statement_import.pk).update(status='failed', message="Interrupted")
+        raise
+    else:
+        StatementImport.objects.filter(pk=statement_import.pk).update(status='done', finished=timezone.now())
+    finally:
+        invalidate_user(user_id)
+    statement_import.refresh_from_db()
+    return statement_import
+
+
+def _error_text(exc):
+    if not isinstance(exc, serializers.ValidationError):
+        return str(exc)
+    def text(errors):
+        return ' '.join(map(str, errors)) if isinstance(errors, list) else str(errors)
+
+    if isinstance(exc.detail, dict):
+        return '; '.join(f"{field}: {text(errors)}" for field, errors in exc.detail.items())
+    return text(exc.detail)
+
+
+def _import_rows(statement_import, resume_after, chunk_size):
+    pending, errors, chunk_start = [], [], resume_after
+    last_row = resume_after
+    with open_statement(statement_import) as stream:
+        rows = PARSERS[statement_import.format](stream, statement_import.options)
+        for row_number, row, key, error in fingerprinted(rows):
+            if row_number <= resume_after:
+                continue  # parsed anyway: the ordinals of the remaining rows depend on these
+            if error:
+                errors.append({'row': row_number, 'error': error})
+            elif row.amount == 0:
+                errors.append({'row': row_number, 'error': "Zero amount"})
+            else:
+                pending.append(Transaction(
+                    user_id=statement_import.user_id, title=row.title[:255], amount=abs(row.amount),
+                    type='Income' if row.amount > 0 else 'Expense', date=row.date, notes=row.notes,
+                    fingerprint=key,
+                ))
+            last_row = row_number
+            if last_row - chunk_start >= chunk_size:
+                _write_chunk(statement_import, pending, errors, last_row)
+                pending, errors, chunk_start = [], [], last_row
+    _write_chunk(statement_import, pending, errors, last_row)
+
+
+def _write_chunk(statement_import, transactions, errors, last_row):
+    """
+    Insert one chunk's new transactions and commit the import's progress with them.
+    A chunk that still hits the (user, fingerprint) index, because another import of the same
+    rows committed after the SELECT, is rolled back and written again: its SELECT sees them then.
+    """
+    reported = (statement_import.errors + errors)[:MAX_REPORTED_ERRORS]
+    for attempt in range(1, CHUNK_ATTEMPTS + 1):
+        try:
+            with db_transaction.atomic():
+                created = _insert_new(statement_import.user_id, transactions)
+                record_created(created)
+                StatementImport.objects.filter(pk=statement_import.pk).update(
+                    rows_read=last_row,
+                    created_count=F('created_count') + len(created),
+                    duplicate_count=F('duplicate_count') + len(transactions) - len(created),
+                    error_count=F('error_count') + len(errors),
+                    errors=reported,
+                )
+        except IntegrityError:
+            if attempt == CHUNK_ATTEMPTS:
+                raise
+        else:
+            statement_import.errors = reported
+            return
+
+
+def _insert_new(user_id, transactions):
+    """
+    Insert the transactions whose fingerprint the user doesn't have yet and return them.
+    Where the database can, the INSERT also skips rows that conflict with ones committed since
+    the SELECT (ON CONFLICT DO NOTHING) and returns only what it inserted.
+    """
+    unique = {t.fingerprint: t for t in transactions}
+    known = set(
+        Transaction.objects.filter(user_id=user_id, fingerprint__in=list(unique))
+        .values_list('fingerprint', flat=True)
+    )
+    fresh = [t for key, t in unique.items() if key not in known]
+    features = connection.features
+    if not (features.can_return_rows_from_bulk_insert and features.supports_ignore_conflicts):
+        Transaction.objects.bulk_create(fresh, batch_size=BULK_BATCH_SIZE)
+        return fresh
+    inserted = insert_rows(
+        Transaction, IMPORT_FIELDS,
+        [(t.user_id, t.title, t.amount, t.type, t.date, t.notes, t.fingerprint) for t in fresh],
+        returning=('id', 'fingerprint'), batch_size=BULK_BATCH_SIZE, ignore_conflicts=True,
+    )
+    for pk, key in inserted:
+        unique[key].pk = pk
+    return [unique[key] for _, key in inserted]
+
+
+def detect_format(name):
+    """'csv' or 'ofx' from a file name's extension (.qfx is OFX), None when unknown."""
+    extension = name.rsplit('.', 1)[-1].lower() if '.' in name else ''
+    return {'csv': 'csv', 'ofx': 'ofx', 'qfx': 'ofx'}.get(extension)
+
+
+def validate_encoding(value):
+    try:
+        codecs.lookup(value)
+    except LookupError:
+        raise serializers.ValidationError(f"Unknown encoding {value!r}") from None
+    return value
+
+
+# Upload fields kept on StatementImport.options.
+IMPORT_OPTIONS = tuple(CSV_COLUMNS) + ('date_format', 'amount_scale', 'thousands_separator', 'delimiter', 'encoding')
+
+
+def statement_options(data):
+    """The import options present in validated upload data."""
+    return {key: data[key] for key in IMPORT_OPTIONS if data.get(key) not in (None, '')}
@@ -0,0 +1,152 @@
+"""
+Append-only balance ledger with monthly snapshots.
+
+Every change to a balance is appended as a LedgerEntry, never edited:
+- a transaction's create, update and delete append its signed amount (Income +, Expense -)
+  to the user's account and, when it is booked against a budget, to that budget's account;
+  an update reverses the old values and books the new ones, a delete reverses;
+- a budget's allocation (and every later change of it) is appended to the budget's account.
+LedgerSnapshot checkpoints each account's balance at month starts (snapshot_ledger command),
+so balance() is one snapshot read plus a sum over at most about a month of entries.
+An entry dated before the current month start is folded into the snapshots after it when it
+is appended, which keeps checkpoints exact however far back a transaction is dated.
+"""
+
+from collections import defaultdict, namedtuple
+from datetime import datetime, time
+
+from django.db.models import Exists, F, Max, OuterRef, Sum
+from django.utils import timezone
+from Finance_Management.db import insert_rows
+from .models import LedgerEntry, LedgerSnapshot
+
+LEDGER_BATCH_SIZE = 1000
+LEDGER_FIELDS = ('user', 'budget', 'transaction', 'kind', 'amount', 'date', 'created')
+
+# A LedgerEntry to append, in LEDGER_FIELDS order; plain tuples keep large appends cheap.
+Entry = namedtuple('Entry', 'user_id budget_id transaction_id kind amount date')
+
+
+def month_start(moment):
+    """Midnight of the first day of `moment`'s month, in the current time zone."""
+    day = timezone.localtime(moment).date().replace(day=1)
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def signed_amount(transaction):
+    return transaction.amount if transaction.type == 'Income' else -transaction.amount
+
+
+def transaction_entries(transaction, sign, kind):
+    """The user's entry and, with a budget, the budget's entry for one side of a transaction write."""
+    amount = sign * signed_amount(transaction)
+    accounts = [None] if transaction.budget_id is None else [None, transaction.budget_id]
+    return [Entry(transaction.user_id, budget_id, transaction.pk, kind, amount, transaction.date) for budget_id in accounts]
+
+
+def ledger_changed(before, after):
+    return (before.amount, before.type, before.budget_id, before.date) != (after.amount, after.type, after.budget_id, after.date)
+
+
+def allocation_entry(budget, amount, date=None):
+    return Entry(budget.user_id, budget.pk, None, 'allocation', amount, date or timezone.now())
+
+
+def append_entries(entries):
+    """Insert entries with multi-row INSERTs and fold the back-dated ones into later snapshots."""
+    entries = [entry for entry in entries if entry.amount]
+    if not entries:
+        return
+    now = timezone.now()
+    insert_rows(
+        LedgerEntry, LEDGER_FIELDS,
+        [(*entry, now) for entry in entries],
+        batch_size=LEDGER_BATCH_SIZE,
+    )
+    horizon = month_start(now)
+    backdated = [entry for entry in entries if entry.date < horizon]
+    if backdated:
+        _fold_into_snapshots(backdated)
+
+
+def _fold_into_snapshots(entries):
+    by_account = defaultdict(list)
+    for entry in entries:
+        by_account[(entry.user_id, entry.budget_id)].append(entry)
+    snapshots = LedgerSnapshot.objects.filter(
+        user_id__in={entry.user_id for entry in entries}, cutoff__gt=min(entry.date for entry in entries)
+    ).only('id', 'user_id', 'budget_id', 'cutoff')
+    changed = []
+    for snapshot in snapshots:
+        delta = sum(
+            entry.amount for entry in by_account.get((snapshot.user_id, snapshot.budget_id), ())
+            if entry.date < snapshot.cutoff
+        )
+        if delta:
+            snapshot.balance = F('balance') + delta
+            changed.append(snapshot)
+    LedgerSnapshot.objects.bulk_update(changed, ['balance'], batch_size=LEDGER_BATCH_SIZE)
+
+
+def balance(user_id, budget_id=None, at=None):
+    """
+    Balance of the user's account (budget_id=None) or of one budget's account at `at` (default now):
+    the latest snapshot taken at or before `at` plus the entries dated from its cutoff up to `at`.
+    """
+    at = at or timezone.now()
+    snapshot = (
+        LedgerSnapshot.objects.filter(user_id=user_id, budget_id=budget_id, cutoff__lte=at)
+        .order_by('-cutoff').values_list('cutoff', 'balance').first()
+    )
+    entries = LedgerEntry.objects.filter(user_id=user_id, budget_id=budget_id, date__lte=at)
+    if snapshot:
+        entries = entries.filter(date__gte=snapshot[0])
+    return (snapshot[1] if snapshot else 0) + entries.aggregate(total=Sum('amount', default=0))['total']
+
+
+def take_snapshots(cutoff):
+    """
+    Checkpoint every account at `cutoff` (a month start) from the previous checkpoint plus the
+    entries dated in between. Accounts missing from the previous checkpoint are summed in full.
+    Returns the number of snapshots written; 0 when `cutoff` was already taken.
+    """
+    if LedgerSnapshot.objects.filter(cutoff=cutoff).exists():
+        return 0
+    previous = LedgerSnapshot.objects.filter(cutoff__lt=cutoff).aggregate(latest=Max('cutoff'))['latest']
+    balances = {}
+    if previous is not None:
+        rows = LedgerSnapshot.objects.filter(cutoff=previous).values_list('user_id', 'budget_id', 'balance')
+        balances = {(user_id, budget_id): amount for user_id, budget_id, amount in rows.iterator()}
+        window = LedgerEntry.objects.filter(date__gte=previous, date__lt=cutoff)
+    else:
+        window = LedgerEntry.objects.filter(date__lt=cutoff)
+    fresh = defaultdict(int)
+    for user_id, budget_id, total in _account_sums(window):
+        if (user_id, budget_id) in balances:
+            balances[(user_id, budget_id)] += total
+        else:
+            fresh[(user_id, budget_id)] += total
+    if previous is not None:
+        # Accounts with entries before `previous` but no snapshot there: sum their history in full.
+        checkpoint = LedgerSnapshot.objects.filter(cutoff=previous, user_id=OuterRef('user_id'))
+        for missing in (
+            LedgerEntry.objects.filter(date__lt=previous, budget__isnull=True)
+            .exclude(Exists(checkpoint.filter(budget__isnull=True))),
+            LedgerEntry.objects.filter(date__lt=previous, budget__isnull=False)
+            .exclude(Exists(checkpoint.filter(budget_id=OuterRef('budget_id')))),
+        ):
+            for user_id, budget_id, total in _account_sums(missing):
+                fresh[(user_id, budget_id)] += total
+    balances.update(fresh)
+    LedgerSnapshot.objects.bulk_create(
+        (
+            LedgerSnapshot(user_id=user_id, budget_id=budget_id, cutoff=cutoff, balance=amount)
+            for (user_id, budget_id), amount in balances.items()
+        ),
+        batch_size=LEDGER_BATCH_SIZE,
+    )
+    return len(balances)
+
+
+def _account_sums(entries):
+    return entries.values_list('user_id', 'budget_id').annotate(total=Sum('amount')).order_by().iterator()
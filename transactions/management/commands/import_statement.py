@@ -0,0 +1,78 @@
+"""
+Import a bank statement file for a user, or resume an interrupted import.
+
+    python manage.py import_statement statement.csv --user alice [--date-format %d/%m/%Y]
+    python manage.py import_statement --resume 42 [--force]
+The file is copied into MEDIA_ROOT first, so the import can be resumed from anywhere.
+"""
+
+from pathlib import Path
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from rest_framework import serializers
+from accounts.models import User
+from transactions.imports import CSV_COLUMNS, run_import
+from transactions.models import StatementImport
+from transactions.serializers import StatementUploadSerializer
+
+
+class Command(BaseCommand):
+    help = "Stream a CSV or OFX bank statement into transactions, in resumable chunks."
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', nargs='?', help="Statement file (.csv, .ofx or .qfx).")
+        parser.add_argument('--user', help="Username to import for.")
+        parser.add_argument('--format', choices=['csv', 'ofx'])
+        for option in CSV_COLUMNS:
+            parser.add_argument(f"--{option.replace('_', '-')}", dest=option)
+        parser.add_argument('--date-format', help="strptime format of the date column (default: ISO 8601).")
+        parser.add_argument('--amount-scale', type=int, help="Multiply amounts by this, e.g. 100 for cents.")
+        parser.add_argument('--thousands-separator', help="Of the amounts (default ','); '.' makes ',' the decimal mark.")
+        parser.add_argument('--delimiter')
+        parser.add_argument('--encoding')
+        parser.add_argument('--chunk-size', type=int, help="Rows per database transaction.")
+        parser.add_argument('--resume', type=int, metavar='ID', help="Resume this import instead.")
+        parser.add_argument('--force', action='store_true', help="Take over an import marked running.")
+
+    def handle(self, *args, path=None, resume=None, force=False, chunk_size=None, **options):
+        if resume is not None:
+            statement_import = StatementImport.objects.filter(pk=resume).first()
+            if statement_import is None:
+                raise CommandError(f"No import {resume}")
+        else:
+            statement_import = self.upload(path, options)
+        try:
+            statement_import = run_import(statement_import, chunk_size=chunk_size, force=force)
+        except serializers.ValidationError as exc:
+            raise CommandError(f"Import {statement_import.pk}: {exc.detail}")
+        summary = (
+            f"Import {statement_import.pk}: {statement_import.rows_read} rows read, "
+            f"{statement_import.created_count} created, {statement_import.duplicate_count} duplicates, "
+            f"{statement_import.error_count} errors"
+        )
+        for error in statement_import.errors[:10]:
+            self.stdout.write(self.style.WARNING(f"  row {error['row']}: {error['error']}"))
+        if statement_import.status != 'done':
+            raise CommandError(f"{summary}; {statement_import.status}: {statement_import.message}")
+        self.stdout.write(self.style.SUCCESS(summary))
+
+    def upload(self, path, options):
+        if not path or not options['user']:
+            raise CommandError("Give a statement path and --user, or --resume ID")
+        user = User.objects.filter(username=options['user']).first()
+        if user is None:
+            raise CommandError(f"No user named {options['user']}")
+        try:
+            handle = open(path, 'rb')
+        except OSError as exc:
+            raise CommandError(str(exc))
+        with handle:
+            fields = {
+                key: value for key, value in options.items()
+                if value is not None and key in StatementUploadSerializer().fields
+            }
+            upload = StatementUploadSerializer(data={**fields, 'file': File(handle, name=Path(path).name)})
+            if not upload.is_valid():
+                raise CommandError(upload.errors)
+            return upload.save(user=user)
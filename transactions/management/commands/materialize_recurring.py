@@ -0,0 +1,35 @@
+"""
+Materialize due recurring transactions.
+
+Meant to run from cron or any scheduler, e.g. hourly:
+    python manage.py materialize_recurring [--date YYYY-MM-DD] [--batch-size N] [--background]
+Safe to re-run and to run concurrently; see services.materialize_due.
+"""
+
+from datetime import date
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from jobs.queue import enqueue
+from transactions.services import RECURRING_BATCH_SIZE, materialize_due
+
+
+class Command(BaseCommand):
+    help = "Create the Transactions of every recurring rule due up to today (or --date)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--date', type=date.fromisoformat, help="Materialize up to this date (default: today).")
+        parser.add_argument('--batch-size', type=int, default=RECURRING_BATCH_SIZE, help="Rules per database transaction.")
+        parser.add_argument('--background', action='store_true', help="Queue a job for run_workers instead.")
+
+    def handle(self, *args, date=None, batch_size=RECURRING_BATCH_SIZE, background=False, **options):
+        if background:
+            job = enqueue('transactions.materialize_recurring', {'date': date.isoformat() if date else None})
+            self.stdout.write(self.style.SUCCESS(f"Queued job {job.pk}"))
+            return
+        created, skipped = materialize_due(date or timezone.localdate(), batch_size=batch_size)
+        self.stdout.write(self.style.SUCCESS(f"Created {created} transactions"))
+        if skipped:
+            self.stdout.write(self.style.WARNING(
+                f"Left {len(skipped)} rule(s) due for insufficient budget: {', '.join(map(str, skipped))}"
+            ))
@@ -0,0 +1,74 @@
+"""
+Maintain the date partitions of the transactions table (PostgreSQL only, see transactions/partitioning.py).
+
+Meant to run from cron, e.g. on the 1st of every month, to keep future partitions created:
+    python manage.py partition_transactions [--ahead N]
+Partition the table, or switch layouts after changing TRANSACTION_PARTITIONING (rewrites
+the table under a lock):
+    python manage.py partition_transactions --convert
+Detach partitions older than a date, to archive (pg_dump -t) and drop them:
+    python manage.py partition_transactions --detach-before YYYY-MM-DD
+"""
+
+from datetime import date, datetime, time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction as db_transaction
+from django.utils import timezone
+from transactions.models import Transaction
+from transactions.partitioning import create_partitions, detach_partitions, layout, next_period, period_start, rebuild
+
+
+class Command(BaseCommand):
+    help = "Create the upcoming transaction partitions, convert the table (--convert) or detach old partitions."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--ahead', type=int, default=settings.TRANSACTION_PARTITIONS_AHEAD,
+            help="Future periods to create partitions for (default: TRANSACTION_PARTITIONS_AHEAD).",
+        )
+        parser.add_argument(
+            '--convert', action='store_true',
+            help="Rebuild the table as TRANSACTION_PARTITIONING says (a plain table when it is empty).",
+        )
+        parser.add_argument(
+            '--detach-before', type=date.fromisoformat,
+            help="Detach the partitions holding only dates before this day.",
+        )
+
+    def handle(self, *args, ahead, convert, detach_before, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError("Transaction partitioning needs PostgreSQL")
+        with db_transaction.atomic():
+            current = layout(connection, Transaction)
+            if convert:
+                wanted = settings.TRANSACTION_PARTITIONING or None
+                if wanted == current:
+                    self.stdout.write(f"Transactions are already {self.describe(current)}")
+                else:
+                    with connection.schema_editor() as schema_editor:
+                        rebuild(schema_editor, Transaction, wanted, ahead=ahead)
+                    current = wanted
+                    self.stdout.write(self.style.SUCCESS(f"Rebuilt transactions {self.describe(current)}"))
+            if current is None:
+                if not convert:
+                    raise CommandError(
+                        "Transactions aren't partitioned: set TRANSACTION_PARTITIONING and run with --convert"
+                    )
+                return
+
+            through = period_start(timezone.now(), current)
+            for _ in range(ahead):
+                through = next_period(through, current)
+            created = create_partitions(connection, Transaction, current, through)
+            self.stdout.write(f"Created {len(created)} partition(s){': ' + ', '.join(created) if created else ''}")
+
+            if detach_before:
+                cutoff = timezone.make_aware(datetime.combine(detach_before, time.min))
+                detached = detach_partitions(connection, Transaction, cutoff)
+                self.stdout.write(f"Detached {len(detached)} partition(s){': ' + ', '.join(detached) if detached else ''}")
+
+    @staticmethod
+    def describe(granularity):
+        return f"partitioned by {granularity}" if granularity else "one plain table"
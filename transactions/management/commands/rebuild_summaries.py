@@ -0,0 +1,48 @@
+"""
+Rebuild the MonthlySummary rollups from the Transaction table.
+
+Used to backfill the rollups after deploying them, or to repair drift:
+    python manage.py rebuild_summaries [--user ID ...] [--background]
+"""
+
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncMonth
+from Finance_Management.cache import invalidate_user
+from jobs.queue import enqueue
+from transactions.models import MonthlySummary, Transaction
+from transactions.services import apply_summary_deltas
+
+
+class Command(BaseCommand):
+    help = "Recompute MonthlySummary rows from transactions (all users, or only --user)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=int, action='append', dest='users', help="Only rebuild this user id (repeatable).")
+        parser.add_argument('--background', action='store_true', help="Queue a job for run_workers instead.")
+
+    def handle(self, *args, users=None, background=False, **options):
+        if background:
+            job = enqueue('transactions.rebuild_summaries', {'users': users or []})
+            self.stdout.write(self.style.SUCCESS(f"Queued job {job.pk}"))
+            return
+        transactions = Transaction.objects.all()
+        summaries = MonthlySummary.objects.all()
+        if users:
+            transactions = transactions.filter(user_id__in=users)
+            summaries = summaries.filter(user_id__in=users)
+
+        rows = (
+            transactions.annotate(year_month=TruncMonth('date'))
+            .values_list('user_id', 'budget_id', 'year_month', 'type')
+            .annotate(total=Sum('amount'), count=Count('id'))
+            .order_by()
+        )
+        with db_transaction.atomic():
+            summaries.delete()
+            deltas = [(u, b, month.date(), t, total, count) for u, b, month, t, total, count in rows.iterator()]
+            apply_summary_deltas(deltas)
+            for user_id in set(users or []) | {delta[0] for delta in deltas}:
+                invalidate_user(user_id)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {len(deltas)} monthly summaries"))
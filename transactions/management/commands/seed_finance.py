@@ -0,0 +1,175 @@
+"""
+Generate a synthetic, production-shaped dataset with bulk_create.
+
+    python manage.py seed_finance --users 1000 --transactions 1000000 [--seed 42]
+
+- Per-user volume is skewed: each user's share is drawn from a Pareto distribution, so a
+  few heavy users own most of the rows (tune with --skew; lower is more skewed).
+- Dates follow a seasonal pattern over the last --days days: more spending in November and
+  December and at weekends, less in February; salaries land on the 1st and the 15th.
+- Expense amounts are log-normal; most expenses go to the user's category budgets, the
+  rest to the free budget or to no budget.
+- Every user gets the free budget plus --budgets category budgets whose allocation covers
+  what was spent, so total_amount/allocated_amount and the MonthlySummary rollups are
+  consistent with the transactions.
+Users are named <prefix><n> and share --password (hashed once), so benchmarks can log in.
+"""
+
+import math
+import random
+import time
+from datetime import datetime, timedelta
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+from django.utils import timezone
+from accounts.models import User
+from budgets.models import FREE_BUDGET_AMOUNT, FREE_BUDGET_TITLE, Budget
+from transactions.ledger import allocation_entry, append_entries
+from transactions.models import Transaction
+from transactions.services import BULK_BATCH_SIZE, record_created
+
+CATEGORIES = ('groceries', 'rent', 'transport', 'dining', 'utilities', 'travel', 'health', 'shopping')
+EXPENSE_TITLES = {
+    'groceries': ('Supermarket', 'Bakery', 'Farmers market'),
+    'rent': ('Rent',),
+    'transport': ('Fuel', 'Metro card', 'Taxi'),
+    'dining': ('Restaurant', 'Coffee', 'Takeaway'),
+    'utilities': ('Electricity', 'Internet', 'Water'),
+    'travel': ('Flight', 'Hotel', 'Train'),
+    'health': ('Pharmacy', 'Dentist', 'Gym'),
+    'shopping': ('Clothes', 'Electronics', 'Books'),
+}
+MONTH_WEIGHTS = (0.95, 0.8, 0.95, 1.0, 1.0, 1.05, 1.1, 1.05, 0.95, 1.0, 1.25, 1.5)
+WEEKEND_WEIGHT = 1.3
+INCOME_SHARE = 0.12
+USER_CHUNK = 200
+
+
+class Command(BaseCommand):
+    help = "Seed users, budgets and transactions with realistic distributions."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=100)
+        parser.add_argument('--transactions', type=int, default=100000, help="Total across all users.")
+        parser.add_argument('--budgets', type=int, default=4, help="Category budgets per user (besides 'free').")
+        parser.add_argument('--days', type=int, default=730, help="History length in days.")
+        parser.add_argument('--skew', type=float, default=1.2, help="Pareto shape of per-user volume.")
+        parser.add_argument('--prefix', default='seed', help="Username prefix.")
+        parser.add_argument('--password', default='seed-password')
+        parser.add_argument('--seed', type=int, default=None, help="Random seed, for reproducible datasets.")
+        parser.add_argument('--batch-size', type=int, default=BULK_BATCH_SIZE)
+
+    def handle(self, *args, **options):
+        if User.objects.filter(username__startswith=options['prefix']).exists():
+            raise CommandError(f"Users named {options['prefix']}* already exist; pick another --prefix")
+        if not 0 <= options['budgets'] <= len(CATEGORIES):
+            raise CommandError(f"--budgets must be between 0 and {len(CATEGORIES)}")
+
+        self.rng = random.Random(options['seed'])
+        self.options = options
+        self.now = timezone.now()
+        started = time.perf_counter()
+        counts = self.volumes(options['users'], options['transactions'])
+        password = make_password(options['password'])
+        totals = [0, 0, 0]
+        for start in range(0, options['users'], USER_CHUNK):
+            with db_transaction.atomic():
+                created = self.seed_chunk(start, counts[start:start + USER_CHUNK], password)
+            totals = [total + count for total, count in zip(totals, created)]
+            self.stdout.write(f"  {min(start + USER_CHUNK, options['users'])}/{options['users']} users")
+        self.stdout.write(self.style.SUCCESS(
+            f"Seeded {totals[0]} users, {totals[1]} budgets and {totals[2]} transactions "
+            f"in {time.perf_counter() - started:.1f}s"
+        ))
+
+    def volumes(self, users, transactions):
+        """Split `transactions` across users proportionally to Pareto-distributed weights."""
+        weights = [self.rng.paretovariate(self.options['skew']) for _ in range(users)]
+        scale = transactions / sum(weights)
+        counts = [int(weight * scale) for weight in weights]
+        for index in self.rng.sample(range(users), transactions - sum(counts)):
+            counts[index] += 1
+        return counts
+
+    def seed_chunk(self, offset, counts, password):
+        prefix = self.options['prefix']
+        users = User.objects.bulk_create(
+            User(username=f'{prefix}{offset + index}', email=f'{prefix}{offset + index}@example.com', password=password)
+            for index in range(len(counts))
+        )
+        budgets, transactions = [], []
+        for user, count in zip(users, counts):
+            user_budgets, user_transactions = self.seed_user(user, count)
+            budgets += user_budgets
+            transactions += user_transactions
+        Budget.objects.bulk_create(budgets, batch_size=self.options['batch_size'])
+        # bulk_create skips the post_save signal that books allocations into the ledger.
+        append_entries(allocation_entry(budget, budget.allocated_amount, self.start_of(budget)) for budget in budgets)
+        for start in range(0, len(transactions), self.options['batch_size']):
+            batch = transactions[start:start + self.options['batch_size']]
+            Transaction.objects.bulk_create(batch)
+            record_created(batch)
+        return len(users), len(budgets), len(transactions)
+
+    def seed_user(self, user, count):
+        today = self.now.date()
+        start_date = today - timedelta(days=self.options['days'])
+        free = Budget(
+            user=user, title=FREE_BUDGET_TITLE, total_amount=FREE_BUDGET_AMOUNT,
+            allocated_amount=FREE_BUDGET_AMOUNT, start_date=start_date,
+        )
+        categories = self.rng.sample(CATEGORIES, self.options['budgets'])
+        budgets = {
+            category: Budget(
+                user=user, title=category, start_date=start_date,
+                end_date=today + timedelta(days=self.rng.randint(30, 365)),
+            )
+            for category in categories
+        }
+        spent = dict.fromkeys(categories, 0)
+        transactions = []
+        for _ in range(count):
+            if self.rng.random() < INCOME_SHARE:
+                transactions.append(self.income(user, free))
+                continue
+            category = self.rng.choice(categories) if categories else self.rng.choice(CATEGORIES)
+            amount = max(1, round(math.exp(self.rng.gauss(3.5, 1.0))))
+            roll = self.rng.random()
+            budget = budgets.get(category) if roll < 0.6 else free if roll < 0.85 else None
+            if budget is not None and not budget.is_free:
+                spent[category] += amount
+            transactions.append(Transaction(
+                user=user, title=self.rng.choice(EXPENSE_TITLES[category]), amount=amount, type='Expense',
+                budget=budget, date=self.seasonal_datetime(),
+            ))
+        for category, budget in budgets.items():
+            headroom = self.rng.randint(100, 1000) + int(spent[category] * self.rng.uniform(0.1, 0.5))
+            budget.allocated_amount = spent[category] + headroom
+            budget.total_amount = headroom
+        return [free, *budgets.values()], transactions
+
+    def start_of(self, budget):
+        return timezone.make_aware(datetime.combine(budget.start_date, datetime.min.time()))
+
+    def income(self, user, free):
+        moment = self.seasonal_datetime()
+        payday = moment.replace(day=1 if moment.day < 15 else 15, hour=9, minute=0, second=0, microsecond=0)
+        return Transaction(
+            user=user, title='Salary', amount=round(self.rng.lognormvariate(8.0, 0.4)), type='Income',
+            budget=free if self.rng.random() < 0.5 else None, date=payday,
+        )
+
+    def seasonal_datetime(self):
+        """A moment in the last --days days, accepted with the month and weekday weights."""
+        ceiling = max(MONTH_WEIGHTS) * WEEKEND_WEIGHT
+        while True:
+            day = self.now - timedelta(days=self.rng.randrange(self.options['days']))
+            weight = MONTH_WEIGHTS[day.month - 1] * (WEEKEND_WEIGHT if day.weekday() >= 5 else 1)
+            if self.rng.random() * ceiling <= weight:
+                break
+        moment = datetime.combine(day.date(), datetime.min.time()) + timedelta(
+            hours=self.rng.triangular(7, 23, 18), minutes=self.rng.randrange(60)
+        )
+        return timezone.make_aware(moment)
@@ -0,0 +1,39 @@
+"""
+Checkpoint every ledger account's balance at each month start.
+
+Meant to run from cron shortly after a month starts (it catches up on missed months):
+    python manage.py snapshot_ledger [--through YYYY-MM-DD]
+"""
+
+from datetime import date, datetime, time, timedelta
+
+from django.core.management.base import BaseCommand
+from django.db import transaction as db_transaction
+from django.db.models import Min
+from django.utils import timezone
+from transactions.ledger import month_start, take_snapshots
+from transactions.models import LedgerEntry
+
+
+class Command(BaseCommand):
+    help = "Take the missing month-start LedgerSnapshots up to today (or --through)."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--through', type=date.fromisoformat, help="Last day to checkpoint up to (default: today).")
+
+    def handle(self, *args, through=None, **options):
+        through = timezone.make_aware(datetime.combine(through, time.max)) if through else timezone.now()
+        first = LedgerEntry.objects.aggregate(first=Min('date'))['first']
+        if first is None:
+            self.stdout.write("The ledger is empty")
+            return
+        cutoff, last = month_start(first), month_start(through)
+        taken = 0
+        while cutoff < last:
+            cutoff = month_start(cutoff + timedelta(days=32))
+            with db_transaction.atomic():
+                written = take_snapshots(cutoff)
+            if written:
+                taken += 1
+                self.stdout.write(f"  {timezone.localtime(cutoff):%Y-%m-%d}: {written} accounts")
+        self.stdout.write(self.style.SUCCESS(f"Took {taken} checkpoints"))
@@ -0,0 +1,114 @@
+"""
+Reconcile the balance ledger with the transactions and budgets it describes.
+
+Streams per-account sums from both sides in account order and merges them, so memory
+stays constant however large the tables are:
+    python manage.py verify_ledger [--snapshots]
+- each user's entries without a budget must add up to their Income minus Expense;
+- each existing budget's entries must add up to its allocation plus the Income minus
+  Expense booked against it;
+- each non-free budget's remaining funds (total_amount) must equal its ledger balance, which
+  replaces recomputing budgets from their full transaction history;
+- with --snapshots, the latest checkpoint of every account must equal its entries before it.
+Exits with an error when anything disagrees.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Case, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce
+from budgets.models import FREE_BUDGET_TITLE, Budget
+from transactions.models import LedgerEntry, LedgerSnapshot, Transaction
+
+SHOWN_MISMATCHES = 20
+
+
+def merge(expected, actual):
+    """Yield (key, expected, actual) for every key whose sums differ; both streams sorted by key."""
+    expected, actual = iter(expected), iter(actual)
+    left, right = next(expected, None), next(actual, None)
+    while left is not None or right is not None:
+        if right is None or (left is not None and left[0] < right[0]):
+            key, want, got = left[0], left[1], 0
+            left = next(expected, None)
+        elif left is None or right[0] < left[0]:
+            key, want, got = right[0], 0, right[1]
+            right = next(actual, None)
+        else:
+            key, want, got = left[0], left[1], right[1]
+            left, right = next(expected, None), next(actual, None)
+        if want != got:
+            yield key, want, got
+
+
+def signed(prefix=''):
+    return Case(When(**{f'{prefix}type': 'Income'}, then=F(f'{prefix}amount')), default=-F(f'{prefix}amount'))
+
+
+class Command(BaseCommand):
+    help = "Check that the ledger agrees with transactions, budget funds and (optionally) snapshots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--snapshots', action='store_true', help="Also check the latest checkpoint.")
+
+    def handle(self, *args, snapshots=False, **options):
+        checks = {
+            'user': merge(
+                (
+                    ((user_id,), total) for user_id, total in Transaction.objects.values_list('user_id')
+                    .annotate(total=Sum(signed())).order_by('user_id').iterator()
+                ),
+                (
+                    ((user_id,), total) for user_id, total in LedgerEntry.objects.filter(budget__isnull=True)
+                    .values_list('user_id').annotate(total=Sum('amount')).order_by('user_id').iterator()
+                ),
+            ),
+            'budget': merge(
+                (
+                    ((budget_id,), total) for budget_id, total in Budget.objects.annotate(
+                        total=F('allocated_amount') + Coalesce(Sum(signed('transaction__')), Value(0))
+                    ).values_list('id', 'total').order_by('id').iterator()
+                ),
+                (
+                    ((budget_id,), total) for budget_id, total in LedgerEntry.objects
+                    .filter(budget__isnull=False, budget_id__in=Budget.objects.values('id'))
+                    .values_list('budget_id').annotate(total=Sum('amount')).order_by('budget_id').iterator()
+                ),
+            ),
+            'funds': merge(
+                (
+                    ((budget_id,), total) for budget_id, total in Budget.objects.exclude(title=FREE_BUDGET_TITLE)
+                    .values_list('id', 'total_amount').order_by('id').iterator()
+                ),
+                (
+                    ((budget_id,), total) for budget_id, total in LedgerEntry.objects
+                    .filter(budget_id__in=Budget.objects.exclude(title=FREE_BUDGET_TITLE).values('id'))
+                    .values_list('budget_id').annotate(total=Sum('amount')).order_by('budget_id').iterator()
+                ),
+            ),
+        }
+        if snapshots:
+            cutoff = LedgerSnapshot.objects.aggregate(latest=Max('cutoff'))['latest']
+            if cutoff is not None:
+                checks['snapshot'] = merge(
+                    (
+                        ((user_id, budget_key), balance) for user_id, budget_key, balance in LedgerSnapshot.objects
+                        .filter(cutoff=cutoff).annotate(budget_key=Coalesce('budget_id', Value(0)))
+                        .values_list('user_id', 'budget_key', 'balance').order_by('user_id', 'budget_key').iterator()
+                    ),
+                    (
+                        ((user_id, budget_key), total) for user_id, budget_key, total in LedgerEntry.objects
+                        .filter(Q(date__lt=cutoff)).annotate(budget_key=Coalesce('budget_id', Value(0)))
+                        .values_list('user_id', 'budget_key').annotate(total=Sum('amount'))
+                        .order_by('user_id', 'budget_key').iterator()
+                    ),
+                )
+
+        failed = 0
+        for account, mismatches in checks.items():
+            for key, want, got in mismatches:
+                failed += 1
+                if failed <= SHOWN_MISMATCHES:
+                    self.stdout.write(self.style.WARNING(f"{account} {key}: expected {want}, ledger has {got}"))
+        if failed:
+            raise CommandError(f"{failed} ledger account(s) disagree")
+        self.stdout.write(self.style.SUCCESS(f"Ledger verified ({', '.join(checks)})"))
@@ -0,0 +1,74 @@
+# Generated by Django 5.2.3 on 2026-10-17 16:25
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0003_budget_user_free_idx"),
+        ("transactions", "0004_transaction_indexes"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="MonthlySummary",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("year_month", models.DateField()),
+                (
+                    "type",
+                    models.CharField(
+                        choices=[("Income", "income"), ("Expense", "expense")],
+                        max_length=8,
+                    ),
+                ),
+                ("total", models.BigIntegerField(default=0)),
+                ("count", models.BigIntegerField(default=0)),
+                (
+                    "budget",
+                    models.ForeignKey(
+                        blank=True,
+                        db_constraint=False,
+                        null=True,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        related_name="+",
+                        to="budgets.budget",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        condition=models.Q(("budget__isnull", False)),
+                        fields=("user", "budget", "year_month", "type"),
+                        name="summary_user_budget_month_uniq",
+                    ),
+                    models.UniqueConstraint(
+                        condition=models.Q(("budget__isnull", True)),
+                        fields=("user", "year_month", "type"),
+                        name="summary_user_month_uniq",
+                    ),
+                ],
+            },
+        ),
+    ]
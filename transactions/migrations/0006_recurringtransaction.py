@@ -0,0 +1,54 @@
+# Generated by Django 5.2.3 on 2026-10-17 17:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0004_backfill_free_budgets"),
+        ("transactions", "0005_monthlysummary"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="occurrence_date",
+            field=models.DateField(blank=True, null=True),
+        ),
+        migrations.CreateModel(
+            name="RecurringTransaction",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("title", models.CharField(max_length=255)),
+                ("amount", models.PositiveBigIntegerField()),
+                ("type", models.CharField(choices=[("Income", "income"), ("Expense", "expense")], max_length=8)),
+                ("notes", models.TextField(blank=True, null=True)),
+                ("frequency", models.CharField(choices=[("daily", "daily"), ("weekly", "weekly"), ("monthly", "monthly"), ("yearly", "yearly")], max_length=8)),
+                ("interval", models.PositiveSmallIntegerField(default=1)),
+                ("start_date", models.DateField()),
+                ("end_date", models.DateField(blank=True, null=True)),
+                ("count", models.PositiveIntegerField(blank=True, null=True)),
+                ("materialized_count", models.PositiveIntegerField(default=0, editable=False)),
+                ("next_occurrence", models.DateField(blank=True, editable=False, null=True)),
+                ("budget", models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="+", to="budgets.budget")),
+                ("user", models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="recurring",
+            field=models.ForeignKey(blank=True, db_index=False, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name="occurrences", to="transactions.recurringtransaction"),
+        ),
+        migrations.AddConstraint(
+            model_name="transaction",
+            constraint=models.UniqueConstraint(condition=models.Q(("recurring__isnull", False)), fields=("recurring", "occurrence_date"), name="txn_recurring_occurrence_uniq"),
+        ),
+        migrations.AddIndex(
+            model_name="recurringtransaction",
+            index=models.Index(condition=models.Q(("next_occurrence__isnull", False)), fields=["next_occurrence", "id"], name="recurring_due_idx"),
+        ),
+    ]
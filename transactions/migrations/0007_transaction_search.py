@@ -0,0 +1,105 @@
+from django.db import DatabaseError, migrations, transaction
+
+TABLE = "transactions_transaction"
+FTS_TABLE = f"{TABLE}_fts"
+
+POSTGRES_FORWARDS = [
+    f"""
+    ALTER TABLE {TABLE} ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+        setweight(to_tsvector('english'::regconfig, coalesce(title, '')), 'A') ||
+        setweight(to_tsvector('english'::regconfig, coalesce(notes, '')), 'B')
+    ) STORED
+    """,
+    f"CREATE INDEX txn_search_vector_idx ON {TABLE} USING gin (search_vector)",
+]
+TRIGRAM_INDEX = f"CREATE INDEX txn_title_trgm_idx ON {TABLE} USING gin (title gin_trgm_ops)"
+POSTGRES_BACKWARDS = [
+    "DROP INDEX IF EXISTS txn_title_trgm_idx",
+    "DROP INDEX IF EXISTS txn_search_vector_idx",
+    f"ALTER TABLE {TABLE} DROP COLUMN IF EXISTS search_vector",
+]
+
+SQLITE_FORWARDS = [
+    f"""
+    CREATE VIRTUAL TABLE {FTS_TABLE} USING fts5(
+        title, notes, content='{TABLE}', content_rowid='id', tokenize='porter unicode61'
+    )
+    """,
+    f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('rebuild')",
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ai AFTER INSERT ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}(rowid, title, notes) VALUES (new.id, new.title, new.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_ad AFTER DELETE ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, notes) VALUES ('delete', old.id, old.title, old.notes);
+    END
+    """,
+    f"""
+    CREATE TRIGGER {FTS_TABLE}_au AFTER UPDATE OF title, notes ON {TABLE} BEGIN
+        INSERT INTO {FTS_TABLE}({FTS_TABLE}, rowid, title, notes) VALUES ('delete', old.id, old.title, old.notes);
+        INSERT INTO {FTS_TABLE}(rowid, title, notes) VALUES (new.id, new.title, new.notes);
+    END
+    """,
+]
+SQLITE_BACKWARDS = [
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_au",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ad",
+    f"DROP TRIGGER IF EXISTS {FTS_TABLE}_ai",
+    f"DROP TABLE IF EXISTS {FTS_TABLE}",
+]
+
+
+def _enable_trigram(schema_editor):
+    """
+    Install pg_trgm if the server ships it and the role may create it; True when it is installed.
+    Without it search runs on the tsvector alone (transactions/search.py).
+    """
+    with schema_editor.connection.cursor() as cursor:
+        cursor.execute("SELECT installed_version IS NOT NULL FROM pg_available_extensions WHERE name = 'pg_trgm'")
+        row = cursor.fetchone()
+    if row is None:
+        return False
+    if not row[0]:
+        try:
+            with transaction.atomic(using=schema_editor.connection.alias):
+                schema_editor.execute("CREATE EXTENSION IF NOT EXISTS pg_trgm")
+        except DatabaseError:
+            return False
+    return True
+
+
+def forwards(apps, schema_editor):
+    vendor = schema_editor.connection.vendor
+    for statement in {"postgresql": POSTGRES_FORWARDS, "sqlite": SQLITE_FORWARDS}.get(vendor, ()):
+        schema_editor.execute(statement)
+    if vendor == "postgresql" and _enable_trigram(schema_editor):
+        schema_editor.execute(TRIGRAM_INDEX)
+
+
+def _run(statements_by_vendor):
+    def run(apps, schema_editor):
+        for statement in statements_by_vendor.get(schema_editor.connection.vendor, ()):
+            schema_editor.execute(statement)
+
+    return run
+
+
+class Migration(migrations.Migration):
+    """
+    Search structures that Django does not model: a generated tsvector column with GIN
+    indexes (and a pg_trgm index on title, when the server provides pg_trgm) on PostgreSQL,
+    an FTS5 table on SQLite. See transactions/search.py.
+    """
+
+    dependencies = [
+        ("transactions", "0006_recurringtransaction"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            forwards,
+            _run({"postgresql": POSTGRES_BACKWARDS, "sqlite": SQLITE_BACKWARDS}),
+        ),
+    ]
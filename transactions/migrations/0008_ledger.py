@@ -0,0 +1,79 @@
+# Generated by Django 5.2.3 on 2026-10-17 17:58
+
+import django.db.models.deletion
+from django.conf import settings
+from datetime import datetime, time
+
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def backfill_ledger(apps, schema_editor):
+    """Open the ledger with every budget's allocation and every existing transaction."""
+    Budget = apps.get_model("budgets", "Budget")
+    Transaction = apps.get_model("transactions", "Transaction")
+    LedgerEntry = apps.get_model("transactions", "LedgerEntry")
+    batch = []
+
+    def append(entry):
+        batch.append(entry)
+        if len(batch) >= 1000:
+            LedgerEntry.objects.bulk_create(batch)
+            batch.clear()
+
+    for budget_id, user_id, allocated, start_date in Budget.objects.values_list(
+        "id", "user_id", "allocated_amount", "start_date"
+    ).iterator():
+        date = timezone.make_aware(datetime.combine(start_date, time.min))
+        append(LedgerEntry(user_id=user_id, budget_id=budget_id, kind="allocation", amount=allocated, date=date))
+    for pk, user_id, budget_id, amount, type_, date in Transaction.objects.values_list(
+        "id", "user_id", "budget_id", "amount", "type", "date"
+    ).iterator():
+        signed = amount if type_ == "Income" else -amount
+        for account in (None, budget_id) if budget_id else (None,):
+            append(LedgerEntry(
+                user_id=user_id, budget_id=account, transaction_id=pk, kind="create", amount=signed, date=date
+            ))
+    LedgerEntry.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0005_budget_allocated_amount"),
+        ("transactions", "0007_transaction_search"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="LedgerEntry",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("kind", models.CharField(choices=[("create", "create"), ("update", "update"), ("delete", "delete"), ("allocation", "allocation")], max_length=10)),
+                ("amount", models.BigIntegerField()),
+                ("date", models.DateTimeField()),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("budget", models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name="+", to="budgets.budget")),
+                ("transaction", models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name="+", to="transactions.transaction")),
+                ("user", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "indexes": [models.Index(fields=["user", "budget", "date"], name="ledger_account_date_idx")],
+            },
+        ),
+        migrations.CreateModel(
+            name="LedgerSnapshot",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("cutoff", models.DateTimeField()),
+                ("balance", models.BigIntegerField()),
+                ("budget", models.ForeignKey(blank=True, db_constraint=False, db_index=False, null=True, on_delete=django.db.models.deletion.DO_NOTHING, related_name="+", to="budgets.budget")),
+                ("user", models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                "constraints": [models.UniqueConstraint(condition=models.Q(("budget__isnull", False)), fields=("user", "budget", "cutoff"), name="ledger_snapshot_budget_uniq"), models.UniqueConstraint(condition=models.Q(("budget__isnull", True)), fields=("user", "cutoff"), name="ledger_snapshot_user_uniq")],
+            },
+        ),
+        migrations.RunPython(backfill_ledger, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.3 on 2026-10-17 18:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("budgets", "0005_budget_allocated_amount"),
+        ("transactions", "0008_ledger"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StatementImport",
+            fields=[
+                ("id", models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name="ID")),
+                ("file", models.FileField(upload_to="statements/%Y/%m/")),
+                ("format", models.CharField(choices=[("csv", "CSV"), ("ofx", "OFX")], max_length=3)),
+                ("options", models.JSONField(blank=True, default=dict)),
+                ("status", models.CharField(choices=[("pending", "pending"), ("running", "running"), ("done", "done"), ("failed", "failed")], default="pending", max_length=7)),
+                ("rows_read", models.PositiveBigIntegerField(default=0)),
+                ("created_count", models.PositiveBigIntegerField(default=0)),
+                ("duplicate_count", models.PositiveBigIntegerField(default=0)),
+                ("error_count", models.PositiveBigIntegerField(default=0)),
+                ("errors", models.JSONField(blank=True, default=list)),
+                ("message", models.TextField(blank=True)),
+                ("created", models.DateTimeField(auto_now_add=True)),
+                ("finished", models.DateTimeField(blank=True, null=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="fingerprint",
+            field=models.CharField(blank=True, max_length=32, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name="transaction",
+            constraint=models.UniqueConstraint(condition=models.Q(("fingerprint__isnull", False)), fields=("user", "fingerprint"), name="txn_user_fingerprint_uniq"),
+        ),
+        migrations.AddField(
+            model_name="statementimport",
+            name="user",
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to=settings.AUTH_USER_MODEL),
+        ),
+    ]
@@ -1,3 +1,6 @@
+import calendar
+from datetime import date, timedelta
+
 from django.db import models
 from django.core.exceptions import ValidationError
 from accounts.models import User
@@ -13,13 +16,275 @@ class Transaction(models.Model):
         ('Expense', 'expense'),
     ]
 
-    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)  # covered by Meta.indexes
     title = models.CharField(max_length=255)
     amount = models.PositiveBigIntegerField()
     type = models.CharField(max_length=8, choices=TYPE_CHOICES)
     date = models.DateTimeField(default=timezone.now)
     notes = models.TextField(blank=True, null=True)
-    budget = models.ForeignKey(Budget, on_delete=models.SET_NULL, null=True, blank=True)
+    budget = models.ForeignKey(Budget, on_delete=models.SET_NULL, null=True, blank=True, db_index=False)
+    # Set on rows materialized from a RecurringTransaction; (recurring, occurrence_date) is unique.
+    recurring = models.ForeignKey(
+        'RecurringTransaction', on_delete=models.SET_NULL, null=True, blank=True,
+        db_index=False, related_name='occurrences'
+    )
+    occurrence_date = models.DateField(null=True, blank=True)
+    # Set on rows imported from a bank statement; (user, fingerprint) is unique, see imports.py.
+    fingerprint = models.CharField(max_length=32, null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            # Serves per-user lists in either direction and the (date, id) keyset cursor.
+            models.Index(fields=['user', '-date', '-id'], name='txn_user_date_id_idx'),
+            models.Index(fields=['user', 'type', 'date'], name='txn_user_type_date_idx'),
+            models.Index(fields=['budget', 'date'], name='txn_budget_date_idx'),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['recurring', 'occurrence_date'],
+                condition=models.Q(recurring__isnull=False),
+                name='txn_recurring_occurrence_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'fingerprint'],
+                condition=models.Q(fingerprint__isnull=False),
+                name='txn_user_fingerprint_uniq',
+            ),
+        ]
 
     def __str__(self):
         return f'{self.user} - {self.amount} - {self.type}'
+
+
+class RecurringTransaction(models.Model):
+    """
+    RRULE-like schedule (FREQ, INTERVAL, DTSTART, UNTIL, COUNT) that materializes into Transactions.
+    `next_occurrence` always holds the first date not yet materialized (NULL once the rule is
+    exhausted), so finding due rules is one indexed range scan; see services.materialize_due.
+    """
+
+    FREQUENCY_CHOICES = [
+        ('daily', 'daily'),
+        ('weekly', 'weekly'),
+        ('monthly', 'monthly'),
+        ('yearly', 'yearly'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    title = models.CharField(max_length=255)
+    amount = models.PositiveBigIntegerField()
+    type = models.CharField(max_length=8, choices=Transaction.TYPE_CHOICES)
+    notes = models.TextField(blank=True, null=True)
+    budget = models.ForeignKey(Budget, on_delete=models.SET_NULL, null=True, blank=True, related_name='+')
+    frequency = models.CharField(max_length=8, choices=FREQUENCY_CHOICES)
+    interval = models.PositiveSmallIntegerField(default=1)
+    start_date = models.DateField()
+    end_date = models.DateField(null=True, blank=True)  # UNTIL, inclusive
+    count = models.PositiveIntegerField(null=True, blank=True)  # COUNT
+    materialized_count = models.PositiveIntegerField(default=0, editable=False)
+    next_occurrence = models.DateField(null=True, blank=True, editable=False)
+
+    class Meta:
+        indexes = [
+            models.Index(
+                fields=['next_occurrence', 'id'],
+                condition=models.Q(next_occurrence__isnull=False),
+                name='recurring_due_idx',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user} - {self.title} - every {self.interval} {self.frequency}'
+
+    def clean(self):
+        if self.interval < 1:
+            raise ValidationError({'interval': 'Interval must be at least 1'})
+        if self.end_date and self.end_date < self.start_date:
+            raise ValidationError({'end_date': 'End date cannot be before start date'})
+        if self.budget and not self.budget.is_free and self.type == 'Income':
+            raise ValidationError({'type': 'You cannot add Income to non-free budgets'})
+
+    def save(self, *args, **kwargs):
+        # Re-derive the pointer so edits to the schedule take effect on the next run.
+        self.next_occurrence = self.schedule_after(self.materialized_count)
+        super().save(*args, **kwargs)
+
+    def occurrence(self, index):
+        """Date of the `index`-th occurrence (0-based), computed from start_date so months never drift."""
+        step = index * self.interval
+        if self.frequency == 'daily':
+            return self.start_date + timedelta(days=step)
+        if self.frequency == 'weekly':
+            return self.start_date + timedelta(weeks=step)
+        months = step if self.frequency == 'monthly' else step * 12
+        month_index = self.start_date.month - 1 + months
+        year, month = self.start_date.year + month_index // 12, month_index % 12 + 1
+        # Day 31 (or Feb 29) falls back to the last day of shorter months.
+        return date(year, month, min(self.start_date.day, calendar.monthrange(year, month)[1]))
+
+    def schedule_after(self, materialized):
+        """The occurrence following `materialized` ones, or None when COUNT/UNTIL is reached."""
+        if self.count is not None and materialized >= self.count:
+            return None
+        upcoming = self.occurrence(materialized)
+        if self.end_date is not None and upcoming > self.end_date:
+            return None
+        return upcoming
+
+
+class MonthlySummary(models.Model):
+    """
+    Rollup of a user's transaction totals per month, budget and type.
+    Maintained incrementally by transactions.services; rebuilt with `manage.py rebuild_summaries`.
+    Rows for a deleted budget are folded into the no-budget bucket, mirroring Transaction.budget's SET_NULL.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    budget = models.ForeignKey(
+        Budget, on_delete=models.DO_NOTHING, db_constraint=False, null=True, blank=True, related_name='+'
+    )
+    year_month = models.DateField()  # first day of the month
+    type = models.CharField(max_length=8, choices=Transaction.TYPE_CHOICES)
+    total = models.BigIntegerField(default=0)
+    count = models.BigIntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'budget', 'year_month', 'type'],
+                condition=models.Q(budget__isnull=False),
+                name='summary_user_budget_month_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'year_month', 'type'],
+                condition=models.Q(budget__isnull=True),
+                name='summary_user_month_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} - {self.year_month:%Y-%m} - {self.type} - {self.total}'
+
+
+class LedgerEntryQuerySet(models.QuerySet):
+    def update(self, **kwargs):
+        raise TypeError("LedgerEntry rows are append-only")
+
+    def delete(self):
+        raise TypeError("LedgerEntry rows are append-only")
+
+
+class LedgerEntry(models.Model):
+    """
+    Append-only record of a balance change, dated when it takes effect.
+    Entries without a budget move the user's balance (Income +, Expense -); entries with a budget
+    move that budget's balance (its allocations +, and the transactions booked against it).
+    Edits and deletions append reversing entries instead of changing earlier ones.
+    Written by transactions.ledger from the record_* hooks; checked with `manage.py verify_ledger`.
+    """
+
+    KIND_CHOICES = [
+        ('create', 'create'),
+        ('update', 'update'),
+        ('delete', 'delete'),
+        ('allocation', 'allocation'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)  # covered by Meta.indexes
+    budget = models.ForeignKey(
+        Budget, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, null=True, blank=True,
+        related_name='+'
+    )
+    transaction = models.ForeignKey(
+        Transaction, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, null=True, blank=True,
+        related_name='+'
+    )
+    kind = models.CharField(max_length=10, choices=KIND_CHOICES)
+    amount = models.BigIntegerField()
+    date = models.DateTimeField()
+    created = models.DateTimeField(auto_now_add=True)
+
+    objects = LedgerEntryQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'budget', 'date'], name='ledger_account_date_idx'),
+        ]
+
+    def save(self, *args, **kwargs):
+        if not self._state.adding:
+            raise TypeError("LedgerEntry rows are append-only")
+        super().save(*args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        raise TypeError("LedgerEntry rows are append-only")
+
+    def __str__(self):
+        return f'{self.user_id} - {self.budget_id or "-"} - {self.kind} - {self.amount}'
+
+
+class LedgerSnapshot(models.Model):
+    """
+    Checkpoint of an account's balance: the sum of its LedgerEntry amounts dated before `cutoff`.
+    Taken at month starts by `manage.py snapshot_ledger`; entries appended later with an earlier
+    date are folded into the snapshots they precede, so a snapshot never goes stale.
+    """
+    user = models.ForeignKey(User, on_delete=models.CASCADE, db_index=False)
+    budget = models.ForeignKey(
+        Budget, on_delete=models.DO_NOTHING, db_constraint=False, db_index=False, null=True, blank=True,
+        related_name='+'
+    )
+    cutoff = models.DateTimeField()
+    balance = models.BigIntegerField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'budget', 'cutoff'],
+                condition=models.Q(budget__isnull=False),
+                name='ledger_snapshot_budget_uniq',
+            ),
+            models.UniqueConstraint(
+                fields=['user', 'cutoff'],
+                condition=models.Q(budget__isnull=True),
+                name='ledger_snapshot_user_uniq',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} - {self.budget_id or "-"} - {self.cutoff:%Y-%m-%d} - {self.balance}'
+
+
+class StatementImport(models.Model):
+    """
+    One uploaded bank statement (CSV or OFX) and how far its import got.
+    `rows_read` is committed together with every chunk of inserted transactions, so an
+    interrupted import resumes right after the last committed chunk; see imports.run_import.
+    """
+
+    FORMAT_CHOICES = [
+        ('csv', 'CSV'),
+        ('ofx', 'OFX'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'pending'),
+        ('running', 'running'),
+        ('done', 'done'),
+        ('failed', 'failed'),
+    ]
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE)
+    file = models.FileField(upload_to='statements/%Y/%m/')
+    format = models.CharField(max_length=3, choices=FORMAT_CHOICES)
+    options = models.JSONField(default=dict, blank=True)  # column mapping, date format, amount scale
+    status = models.CharField(max_length=7, choices=STATUS_CHOICES, default='pending')
+    rows_read = models.PositiveBigIntegerField(default=0)
+    created_count = models.PositiveBigIntegerField(default=0)
+    duplicate_count = models.PositiveBigIntegerField(default=0)
+    error_count = models.PositiveBigIntegerField(default=0)
+    errors = models.JSONField(default=list, blank=True)  # the first few {"row", "error"}
+    message = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    def __str__(self):
+        return f'{self.user_id} - {self.file.name} - {self.status} - {self.rows_read}'
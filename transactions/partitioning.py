@@ -0,0 +1,406 @@
+"""
+Optional range partitioning of transactions by date on PostgreSQL.
+
+With TRANSACTION_PARTITIONING = 'month' (or 'year') the transactions table is partitioned
+by RANGE (date): one partition per month (year), named like transactions_transaction_y2024m01
+(_y2024), plus a _default partition for any date outside them. Django still sees one table,
+so the ORM, the views and the raw SQL in imports and search are unchanged:
+- queries bounded by date (TransactionAPIView's start/end filters, keyset cursors on
+  (date, id)) only touch the partitions in range; Postgres prunes the rest when planning;
+- per-user lists ordered by date read the partitions in order and stop at the page limit;
+- every partition has its own, smaller copy of each index, and vacuum works per partition;
+- an old partition leaves the table with a metadata-only DETACH, after which it can be
+  archived (pg_dump -t) and dropped, instead of a DELETE of millions of rows and a VACUUM.
+
+Postgres only enforces uniqueness within a partition, so:
+- The primary key becomes (id, date). ids still come from one sequence, so they stay
+  unique, but a lookup by id alone probes each partition's index; with many years of
+  history, prefer yearly partitions.
+- The model's unique constraints move to a plain side table, transactions_transaction_keys,
+  holding the id and key columns of every row that one of them applies to. Its unique
+  indexes carry the constraints' names, and a trigger on the partitioned table keeps it in
+  step with every INSERT, UPDATE, DELETE and TRUNCATE, so a duplicate still raises
+  IntegrityError whatever the dates. The partitioned table keeps plain indexes on the same
+  columns (named *_idx instead of *_uniq) for lookups.
+Detached rows leave the side table, and disappear from lists, search and verify_ledger's
+transaction totals, while MonthlySummary and the ledger keep their history.
+
+Partitioning is a deployment choice, not part of the migrations: the schema they create is
+always one plain table. `manage.py partition_transactions --convert` rebuilds the table as
+TRANSACTION_PARTITIONING says, after which the command (run from cron, e.g. monthly) keeps
+TRANSACTION_PARTITIONS_AHEAD future partitions created, and --detach-before detaches old ones.
+Converting copies every row under an ACCESS EXCLUSIVE lock, so it needs a maintenance window;
+convert back to one plain table before migrating the transactions table itself.
+benchmarks/partitioning.py compares the two layouts.
+"""
+
+import re
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+from django.db import NotSupportedError
+from django.db.models import Index, UniqueConstraint
+from django.db.models.sql import Query
+from django.utils import timezone
+
+GRANULARITIES = ('month', 'year')
+PARTITION_FIELD = 'date'
+BOUNDS_RE = re.compile(r"FROM \('([^']+)'\) TO \('([^']+)'\)")
+
+
+def period_start(moment, granularity):
+    """Start of the month (year) holding `moment`, in the default time zone."""
+    start = timezone.localtime(moment).replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+    return start.replace(month=1) if granularity == 'year' else start
+
+
+def next_period(start, granularity):
+    if granularity == 'year':
+        return start.replace(year=start.year + 1)
+    return (start + timedelta(days=32)).replace(day=1)
+
+
+def partition_name(table, start, granularity):
+    return f'{table}_y{start:%Y}' if granularity == 'year' else f'{table}_y{start:%Y}m{start:%m}'
+
+
+def default_partition_name(table):
+    return f'{table}_default'
+
+
+def keys_table_name(table):
+    """The side table enforcing the unique constraints of partitioned `table`."""
+    return f'{table}_keys'
+
+
+def lookup_index(constraint):
+    """The plain index a partitioned table keeps in place of unique `constraint`."""
+    return Index(fields=constraint.fields, condition=constraint.condition, name=f"{constraint.name.removesuffix('_uniq')}_idx")
+
+
+def is_partitioned(connection, table):
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT relkind FROM pg_class WHERE oid = %s::regclass", [table])
+        return cursor.fetchone()[0] == 'p'
+
+
+def partitions(connection, table):
+    """(name, start, end) of every range partition of `table`, oldest first."""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+            "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass",
+            [table],
+        )
+        bounds = cursor.fetchall()
+    found = []
+    for name, bound in bounds:
+        match = BOUNDS_RE.search(bound)
+        if match:
+            found.append((name, *(datetime.fromisoformat(value) for value in match.groups())))
+    return sorted(found, key=lambda partition: partition[1])
+
+
+def layout(connection, model):
+    """'month' or 'year' when `model`'s table is partitioned (judged by its partitions), else None."""
+    table = model._meta.db_table
+    if connection.vendor != 'postgresql' or not is_partitioned(connection, table):
+        return None
+    if any(end - start > timedelta(days=31) for _, start, end in partitions(connection, table)):
+        return 'year'
+    return 'month'
+
+
+def rebuild(schema_editor, model, granularity=None, ahead=0):
+    """
+    Rebuild `model`'s table partitioned by `granularity` ('month' or 'year'), or as one plain
+    table without it, keeping its rows, ids, defaults, indexes and constraints (unique ones in
+    the side table when partitioned). Partitions are created for every period holding rows,
+    and for the current period and `ahead` more. Runs in the caller's database transaction.
+    """
+    if granularity and granularity not in GRANULARITIES:
+        raise ValueError(f"Unknown partitioning {granularity!r}, expected one of {GRANULARITIES}")
+    connection, quote = schema_editor.connection, schema_editor.quote_name
+    meta = model._meta
+    table, pk, column = meta.db_table, meta.pk.column, meta.get_field(PARTITION_FIELD).column
+    unique_constraints = [constraint for constraint in meta.constraints if isinstance(constraint, UniqueConstraint)]
+    lookups = [lookup_index(constraint) for constraint in unique_constraints]
+    old = f'{table}_rebuild'
+    with connection.cursor() as cursor, _checks_now(cursor):
+        cursor.execute(f'LOCK TABLE {quote(table)} IN ACCESS EXCLUSIVE MODE')
+        _drop_keys_table(cursor, quote, table)
+        columns = _copied_columns(cursor, table)
+        indexes, unique_indexes = _indexes(cursor, table, exclude={index.name for index in lookups})
+        unknown = unique_indexes - {constraint.name for constraint in unique_constraints}
+        if unknown or any(not constraint.fields for constraint in unique_constraints):
+            raise NotSupportedError(f"Can't rebuild {table}: unique indexes {sorted(unknown)} aren't plain model constraints")
+        cursor.execute(
+            "SELECT conname, pg_get_constraintdef(oid) FROM pg_constraint WHERE conrelid = %s::regclass AND contype = 'f'",
+            [table],
+        )
+        foreign_keys = cursor.fetchall()
+        sequence = _id_sequence(cursor, table, pk, quote)
+
+        cursor.execute(f'ALTER TABLE {quote(table)} RENAME TO {quote(old)}')
+        # Rebuilding a partitioned table: its partitions leave with it, out of the new ones' way.
+        cursor.execute(
+            "SELECT c.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = %s::regclass",
+            [old],
+        )
+        for position, (name,) in enumerate(cursor.fetchall()):
+            cursor.execute(f'ALTER TABLE {quote(name)} RENAME TO {quote(f"{old}_{position}")}')
+        default = default_partition_name(table)
+        cursor.execute(
+            f'CREATE TABLE {quote(table)} (LIKE {quote(old)} INCLUDING DEFAULTS INCLUDING CONSTRAINTS '
+            f'INCLUDING GENERATED INCLUDING STORAGE INCLUDING COMMENTS)'
+            + (f' PARTITION BY RANGE ({quote(column)})' if granularity else '')
+        )
+        cursor.execute(f'ALTER TABLE {quote(table)} ALTER COLUMN {quote(pk)} SET DEFAULT nextval(%s::regclass)', [sequence])
+        cursor.execute(f'ALTER SEQUENCE {sequence} OWNED BY {quote(table)}.{quote(pk)}')
+        if granularity:
+            cursor.execute(
+                f'SELECT DISTINCT date_trunc(%s, {quote(column)}, %s) FROM {quote(old)}',
+                [granularity, timezone.get_default_timezone_name()],
+            )
+            periods = {period_start(start, granularity) for start, in cursor.fetchall()}
+            start = period_start(timezone.now(), granularity)
+            for _ in range(ahead + 1):
+                periods.add(start)
+                start = next_period(start, granularity)
+            for start in sorted(periods):
+                _create_partition(cursor, quote, table, column, start, granularity)
+            cursor.execute(f'CREATE TABLE {quote(default)} PARTITION OF {quote(table)} DEFAULT')
+
+        names = ', '.join(quote(name) for name in columns)
+        cursor.execute(f'INSERT INTO {quote(table)} ({names}) SELECT {names} FROM {quote(old)}')
+        cursor.execute(f'DROP TABLE {quote(old)}')
+        key = ', '.join(quote(name) for name in ([pk, column] if granularity else [pk]))
+        cursor.execute(f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(table + "_pkey")} PRIMARY KEY ({key})')
+        for definition in indexes:
+            cursor.execute(definition)
+        for name, definition in foreign_keys:
+            cursor.execute(f'ALTER TABLE {quote(table)} ADD CONSTRAINT {quote(name)} {definition}')
+    if granularity:
+        for index in lookups:
+            schema_editor.add_index(model, index)
+        _create_keys_table(schema_editor, model, unique_constraints)
+    else:
+        for constraint in unique_constraints:
+            schema_editor.add_constraint(model, constraint)
+    with connection.cursor() as cursor:
+        cursor.execute(f'ANALYZE {quote(table)}')
+
+
+def create_partitions(connection, model, granularity, through):
+    """
+    Create the missing partitions from the current period up to the one holding `through`,
+    moving any of their rows out of the default partition. Returns the names created.
+    """
+    quote = connection.ops.quote_name
+    table, column = model._meta.db_table, model._meta.get_field(PARTITION_FIELD).column
+    existing = {name for name, _, _ in partitions(connection, table)}
+    default = default_partition_name(table)
+    created = []
+    with connection.cursor() as cursor, _checks_now(cursor):
+        cursor.execute("SELECT to_regclass(%s) IS NOT NULL", [quote(default)])
+        has_default = cursor.fetchone()[0]
+        columns = ', '.join(quote(name) for name in _copied_columns(cursor, table))
+        start, last = period_start(timezone.now(), granularity), period_start(through, granularity)
+        while start <= last:
+            name, end = partition_name(table, start, granularity), next_period(start, granularity)
+            start, period = end, (start, end)
+            if name in existing:
+                continue
+            misplaced = False
+            if has_default:
+                cursor.execute(
+                    f'SELECT EXISTS (SELECT 1 FROM {quote(default)} WHERE {quote(column)} >= %s AND {quote(column)} < %s)',
+                    period,
+                )
+                misplaced = cursor.fetchone()[0]
+            if not misplaced:
+                _create_partition(cursor, quote, table, column, period[0], granularity)
+            else:
+                # A new partition may not overlap rows in the default one: move them across. Detached,
+                # the default has no copy of the keys trigger; the INSERT's trigger rewrites the keys.
+                cursor.execute(f'ALTER TABLE {quote(table)} DETACH PARTITION {quote(default)}')
+                _create_partition(cursor, quote, table, column, period[0], granularity)
+                in_period = f'{quote(column)} >= %s AND {quote(column)} < %s'
+                cursor.execute(
+                    f'INSERT INTO {quote(table)} ({columns}) SELECT {columns} FROM {quote(default)} WHERE {in_period}',
+                    period,
+                )
+                cursor.execute(f'DELETE FROM {quote(default)} WHERE {in_period}', period)
+                cursor.execute(f'ALTER TABLE {quote(table)} ATTACH PARTITION {quote(default)} DEFAULT')
+            created.append(name)
+    return created
+
+
+def detach_partitions(connection, model, before):
+    """
+    Detach the partitions whose dates all fall before `before`, and drop their rows' keys
+    from the side table. Returns their names.
+    """
+    quote = connection.ops.quote_name
+    table, pk = model._meta.db_table, quote(model._meta.pk.column)
+    keys = quote(keys_table_name(table))
+    detached = [name for name, _, end in partitions(connection, table) if end <= before]
+    with connection.cursor() as cursor, _checks_now(cursor):
+        for name in detached:
+            cursor.execute(f'DELETE FROM {keys} WHERE {pk} IN (SELECT {pk} FROM {quote(name)})')
+            cursor.execute(f'ALTER TABLE {quote(table)} DETACH PARTITION {quote(name)}')
+    return detached
+
+
+@contextmanager
+def _checks_now(cursor):
+    """
+    Run the pending deferred constraint checks first: Postgres won't alter a table that has any.
+    Afterwards only the constraints declared INITIALLY DEFERRED (all of Django's foreign keys) are
+    deferred again, so deferrable INITIALLY IMMEDIATE ones keep checking per statement. SET
+    CONSTRAINTS state can't be read back, so modes the caller set by hand are not restored.
+    """
+    cursor.execute(
+        "SELECT DISTINCT quote_ident(n.nspname) || '.' || quote_ident(c.conname) FROM pg_constraint c "
+        "JOIN pg_namespace n ON n.oid = c.connamespace WHERE c.condeferred"
+    )
+    deferred = [name for name, in cursor.fetchall()]
+    cursor.execute('SET CONSTRAINTS ALL IMMEDIATE')
+    yield
+    if deferred:
+        cursor.execute(f'SET CONSTRAINTS {", ".join(deferred)} DEFERRED')
+
+
+def _create_partition(cursor, quote, table, column, start, granularity):
+    end = next_period(start, granularity)
+    cursor.execute(
+        f'CREATE TABLE {quote(partition_name(table, start, granularity))} PARTITION OF {quote(table)} '
+        f"FOR VALUES FROM ('{start.isoformat()}') TO ('{end.isoformat()}')"
+    )
+
+
+def _copied_columns(cursor, table):
+    """The columns an INSERT ... SELECT copies: all but the generated ones (the search vector)."""
+    cursor.execute(
+        "SELECT attname FROM pg_attribute WHERE attrelid = %s::regclass AND attnum > 0 "
+        "AND NOT attisdropped AND attgenerated = '' ORDER BY attnum",
+        [table],
+    )
+    return [name for name, in cursor.fetchall()]
+
+
+def _indexes(cursor, table, exclude=()):
+    """
+    CREATE statements of the non-unique indexes, and the names of the unique ones bar the
+    primary key. Indexes named in `exclude` are left out.
+    """
+    cursor.execute(
+        "SELECT c.relname, pg_get_indexdef(i.indexrelid), i.indisunique, i.indisprimary "
+        "FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid WHERE i.indrelid = %s::regclass",
+        [table],
+    )
+    indexes, unique = [], set()
+    for name, definition, is_unique, is_primary in cursor.fetchall():
+        if name in exclude:
+            continue
+        if is_unique:
+            if not is_primary:
+                unique.add(name)
+        else:
+            # Indexes of a partitioned table are defined ON ONLY it; recreated, they cascade.
+            indexes.append(definition.replace(' ON ONLY ', ' ON ', 1))
+    return indexes, unique
+
+
+def _create_keys_table(schema_editor, model, constraints):
+    """
+    Create the side table enforcing `constraints` for partitioned `model`, fill it from the
+    table and install the trigger that keeps it in step.
+    """
+    connection, quote = schema_editor.connection, schema_editor.quote_name
+    meta = model._meta
+    table, pk = meta.db_table, meta.pk
+    keys, sync = quote(keys_table_name(table)), quote(f'{table}_keys_sync')
+    fields = list(dict.fromkeys(meta.get_field(name) for constraint in constraints for name in constraint.fields))
+    columns = [quote(field.column) for field in fields]
+    selected = ', '.join([quote(pk.column), *columns])
+    # The rows at least one constraint applies to; the others need no key.
+    keyed = ' OR '.join(
+        f'({_condition_sql(schema_editor, model, constraint.condition)})' if constraint.condition else 'TRUE'
+        for constraint in constraints
+    ) or 'FALSE'
+    with connection.cursor() as cursor:
+        definitions = ', '.join(f'{quote(field.column)} {field.db_type(connection)}' for field in fields)
+        cursor.execute(
+            f'CREATE TABLE {keys} ({quote(pk.column)} {pk.rel_db_type(connection)} PRIMARY KEY'
+            + (f', {definitions})' if definitions else ')')
+        )
+        cursor.execute(f'INSERT INTO {keys} ({selected}) SELECT {selected} FROM {quote(table)} WHERE {keyed}')
+        for constraint in constraints:
+            statement = constraint.create_sql(model, schema_editor)
+            statement.rename_table_references(table, keys_table_name(table))
+            cursor.execute(str(statement))
+        refresh = ', '.join(f'{column} = EXCLUDED.{column}' for column in columns)
+        cursor.execute(f"""
+            CREATE FUNCTION {sync}() RETURNS trigger LANGUAGE plpgsql AS $$
+            BEGIN
+                IF TG_OP = 'TRUNCATE' THEN
+                    TRUNCATE {keys};
+                    RETURN NULL;
+                END IF;
+                IF TG_OP <> 'INSERT' THEN
+                    DELETE FROM {keys} WHERE {quote(pk.column)} = OLD.{quote(pk.column)};
+                END IF;
+                IF TG_OP <> 'DELETE' THEN
+                    INSERT INTO {keys} ({selected}) SELECT {selected} FROM (SELECT NEW.*) AS new_row WHERE {keyed}
+                    ON CONFLICT ({quote(pk.column)}) DO {f'UPDATE SET {refresh}' if refresh else 'NOTHING'};
+                END IF;
+                RETURN NULL;
+            END
+            $$
+        """)
+        watched = ', '.join([quote(pk.column), *columns])
+        cursor.execute(
+            f'CREATE TRIGGER {sync} AFTER INSERT OR DELETE OR UPDATE OF {watched} ON {quote(table)} '
+            f'FOR EACH ROW EXECUTE FUNCTION {sync}()'
+        )
+        cursor.execute(
+            f'CREATE TRIGGER {quote(f"{table}_keys_truncate")} AFTER TRUNCATE ON {quote(table)} '
+            f'FOR EACH STATEMENT EXECUTE FUNCTION {sync}()'
+        )
+
+
+def _drop_keys_table(cursor, quote, table):
+    """Drop the side table, its function and (with it) the triggers, if `table` has them."""
+    cursor.execute(f'DROP FUNCTION IF EXISTS {quote(f"{table}_keys_sync")}() CASCADE')
+    cursor.execute(f'DROP TABLE IF EXISTS {quote(keys_table_name(table))}')
+
+
+def _condition_sql(schema_editor, model, condition):
+    """`condition` as SQL on unqualified columns, as in a partial index's WHERE clause."""
+    query = Query(model, alias_cols=False)
+    where = query.build_where(condition)
+    sql, params = where.as_sql(query.get_compiler(connection=schema_editor.connection), schema_editor.connection)
+    return sql % tuple(schema_editor.quote_value(param) for param in params)
+
+
+def _id_sequence(cursor, table, pk, quote):
+    """
+    The sequence that numbers `pk`. An identity column (what Django creates) is turned into a
+    plain column fed by an equivalent sequence, as partitioned tables can't have identity
+    columns before PostgreSQL 17.
+    """
+    cursor.execute(
+        "SELECT pg_get_serial_sequence(%s, %s), attidentity <> '' FROM pg_attribute "
+        "WHERE attrelid = %s::regclass AND attname = %s",
+        [table, pk, table, pk],
+    )
+    sequence, identity = cursor.fetchone()
+    if not identity:
+        return sequence
+    cursor.execute("SELECT nextval(%s)", [sequence])
+    start = cursor.fetchone()[0]
+    cursor.execute(f'ALTER TABLE {quote(table)} ALTER COLUMN {quote(pk)} DROP IDENTITY')
+    sequence = quote(f'{table}_{pk}_seq')
+    cursor.execute(f'CREATE SEQUENCE {sequence} START WITH {int(start)}')
+    return sequence
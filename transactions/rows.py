@@ -0,0 +1,59 @@
+"""
+Read-only fast path for serializing transactions.
+
+List and export responses never need the validation machinery of
+TransactionSerializer, so rows are fetched with values() and turned into the
+exact same dicts by a formatter compiled once per field selection, instead of
+building model instances and running every field's to_representation().
+"""
+
+from django.utils import timezone
+from .serializers import TransactionSerializer
+
+# Serializer field name -> values() column.
+COLUMNS = {
+    'id': 'id',
+    'user': 'user_id',
+    'title': 'title',
+    'amount': 'amount',
+    'type': 'type',
+    'notes': 'notes',
+    'budget': 'budget_id',
+    'date': 'date',
+}
+
+
+def format_datetime(value, tz=None):
+    """
+    Format a datetime exactly like DRF's DateTimeField (ISO 8601, 'Z' for UTC).
+    `tz` defaults to the current time zone; formatters resolve it once, not per row.
+    """
+    if value is None:
+        return None
+    value = value.astimezone(tz or timezone.get_current_timezone()).isoformat()
+    if value.endswith('+00:00'):
+        value = value[:-6] + 'Z'
+    return value
+
+
+def compile_formatter(fields=None):
+    """
+    Build the formatter for `fields` (all of TransactionSerializer.Meta.fields when None).
+    Returns (columns, format_row): pass `columns` to values(), then format_row(row) returns
+    the dict TransactionSerializer(fields=fields) would produce, keys in the same order.
+    """
+    fields = [name for name in TransactionSerializer.Meta.fields if fields is None or name in fields]
+    pairs = tuple((name, COLUMNS[name]) for name in fields)
+    columns = tuple(column for _, column in pairs)
+    tz = timezone.get_current_timezone()
+
+    if 'date' in fields:
+        def format_row(row):
+            data = {name: row[column] for name, column in pairs}
+            data['date'] = format_datetime(data['date'], tz)
+            return data
+    else:
+        def format_row(row):
+            return {name: row[column] for name, column in pairs}
+
+    return columns, format_row
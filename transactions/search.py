@@ -0,0 +1,85 @@
+"""
+Ranked full-text search over transaction titles and notes.
+
+On PostgreSQL (see migration 0007) every row carries a stored, generated `search_vector`
+tsvector (title weighted A, notes B) under a GIN index, and `title` has a pg_trgm GIN
+index. A row matches when its vector matches the websearch-style query or its title is
+trigram-similar to it, so typos in titles still hit; rank is ts_rank plus the title
+similarity. The column is maintained by the database and is not a model field. Where the
+server lacks pg_trgm the migration skips it and search uses the tsvector alone (no typo
+matching); install the extension and rerun 0007 to get it back.
+
+On SQLite (tests, local runs) an external-content FTS5 table kept in step by triggers
+takes its place: the terms are prefix-matched and ranked with bm25. Other backends fall
+back to icontains.
+"""
+
+import re
+
+from django.db import connection
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+from django.db.models.functions import Cast
+from .models import Transaction
+
+SEARCH_VECTOR_COLUMN = 'search_vector'
+SEARCH_CONFIG = 'english'
+FTS_TABLE = f'{Transaction._meta.db_table}_fts'
+
+
+def search_transactions(queryset, q):
+    """Narrow a Transaction queryset to the rows matching `q`, annotated with a float `rank`."""
+    if connection.vendor == 'postgresql':
+        return _search_postgres(queryset, q, trigram=has_trigram())
+    if connection.vendor == 'sqlite':
+        return _search_sqlite(queryset, q)
+    return queryset.filter(Q(title__icontains=q) | Q(notes__icontains=q)).annotate(
+        rank=Value(0.0, output_field=FloatField())
+    )
+
+
+def has_trigram():
+    """Whether pg_trgm is installed in the database; checked once per process and connection alias."""
+    if connection.alias not in _trigram:
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'")
+            _trigram[connection.alias] = cursor.fetchone() is not None
+    return _trigram[connection.alias]
+
+
+_trigram = {}
+
+
+def _search_postgres(queryset, q, trigram=True):
+    from django.contrib.postgres.search import SearchQuery, SearchRank, SearchVectorField, TrigramSimilarity
+
+    query = SearchQuery(q, config=SEARCH_CONFIG, search_type='websearch')
+    vector = RawSQL(f'"{Transaction._meta.db_table}"."{SEARCH_VECTOR_COLUMN}"', [], output_field=SearchVectorField())
+    queryset, rank = queryset.alias(search_vector=vector), SearchRank(F('search_vector'), query)
+    if trigram:
+        queryset = queryset.filter(Q(search_vector=query) | Q(title__trigram_similar=q))
+        rank += TrigramSimilarity('title', q)
+    else:
+        queryset = queryset.filter(search_vector=query)
+    # ts_rank is a float4: as double precision it round-trips through the page cursor exactly.
+    return queryset.annotate(rank=Cast(rank, FloatField()))
+
+
+def fts5_query(q):
+    """Quote every word of `q` as an FTS5 prefix term (implicitly ANDed); '' when there are none."""
+    return ' '.join('"{}"*'.format(term.replace('"', '""')) for term in re.findall(r'\w+', q))
+
+
+def _search_sqlite(queryset, q):
+    match = fts5_query(q)
+    if not match:
+        return queryset.none().annotate(rank=Value(0.0, output_field=FloatField()))
+    table = Transaction._meta.db_table
+    return queryset.filter(
+        id__in=RawSQL(f'SELECT rowid FROM "{FTS_TABLE}" WHERE "{FTS_TABLE}" MATCH %s', (match,))
+    ).annotate(rank=RawSQL(
+        f'(SELECT -bm25("{FTS_TABLE}", 10.0, 5.0) FROM "{FTS_TABLE}" '
+        f'WHERE "{FTS_TABLE}" MATCH %s AND "{FTS_TABLE}".rowid = "{table}"."id")',
+        (match,),
+        output_field=FloatField(),
+    ))
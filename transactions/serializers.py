@@ -5,19 +5,57 @@ Handles serialization/deserialization of Transaction objects for API requests.
 Includes validations for budget constraints and transaction types.
 """
 
+import copy
+from datetime import datetime, time, timedelta
+
 from rest_framework import serializers
-from .models import Transaction
+from .models import StatementImport, Transaction
 from budgets.models import Budget
 from django.db import transaction as db_transaction
+from django.conf import settings
+from django.utils import timezone
+from Finance_Management.serializers import DynamicFieldsModelSerializer
+from .imports import DECIMAL_MARKS, detect_format, statement_options, validate_encoding
+from .services import debit_budget, is_debited, record_created, record_updated
+
+
+class BudgetField(serializers.PrimaryKeyRelatedField):
+    """
+    Budget primary key field limited to the requesting user's budgets (`context['request']`;
+    without one no id is accepted). Ids are resolved from `context['budgets']` when the caller
+    has preloaded them, already filtered by user (bulk ingestion), instead of issuing one query per item.
+    """
+
+    def get_queryset(self):
+        request = self.context.get('request')
+        if request is None:
+            return Budget.objects.none()
+        return Budget.objects.filter(user=request.user)
+
+    def to_internal_value(self, data):
+        budgets = self.context.get('budgets')
+        if budgets is None:
+            return super().to_internal_value(data)
+        if isinstance(data, bool):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        try:
+            budget = budgets.get(int(data))
+        except (TypeError, ValueError):
+            self.fail('incorrect_type', data_type=type(data).__name__)
+        if budget is None:
+            self.fail('does_not_exist', pk_value=data)
+        return budget
 
 
-class TransactionSerializer(serializers.ModelSerializer):
+class TransactionSerializer(DynamicFieldsModelSerializer):
     """
     Serializer for Transaction model.
     - Marks 'user' as read-only since it's set from request.user.
     - Validates budget-related rules (e.g., sufficient funds for Expense, no Income for non-free budgets).
     """
 
+    budget = BudgetField(queryset=Budget.objects.all(), required=False, allow_null=True)  # scoped by get_queryset
+
     class Meta:
         model = Transaction
         fields = ('id', 'user', 'title', 'amount', 'type', 'notes', 'budget', 'date')
@@ -26,30 +64,55 @@ class TransactionSerializer(serializers.ModelSerializer):
     def validate(self, data):
         """
         Validate transaction data.
-        - For Expense transactions with a non-free budget, ensure budget has sufficient funds.
+        - For Expense transactions with a non-free budget, reject amounts above the budget's funds.
         - Prevent Income transactions for non-free budgets.
+        On a partial update missing fields keep their saved values, and an expense moved within
+        the same budget counts its own debit as available. The authoritative funds check is the
+        conditional debit in create() and in the update hook.
         """
-        budget = data.get('budget')
-        amount = data.get('amount')
-        type_ = data.get('type')
-
-        if budget and budget.title != "free":
-            budget_ = Budget.objects.filter(pk=budget.id).first()
-            if not budget_:
-                raise serializers.ValidationError({"budget": "Invalid budget ID"})
+        instance = self.instance
+        budget = data.get('budget', instance.budget if instance else None)
+        amount = data.get('amount', instance.amount if instance else None)
+        type_ = data.get('type', instance.type if instance else None)
+
+        if budget and not budget.is_free:
             if type_ == "Expense":
-                if budget_.total_amount < amount:
+                available = budget.total_amount
+                if instance is not None and instance.budget_id == budget.pk and instance.type == "Expense":
+                    available += instance.amount
+                if amount is not None and available < amount:
                     raise serializers.ValidationError({
-                        "amount": f"You can't expense more than this budget, available: {budget_.total_amount}"
+                        "amount": f"You can't expense more than this budget, available: {available}"
                     })
-                # Update budget total_amount within a transaction
-                with db_transaction.atomic():
-                    budget_.total_amount -= amount
-                    budget_.save()
             else:
                 raise serializers.ValidationError({"type": "You cannot add Income to non-free budgets"})
         return data
 
+    def create(self, validated_data):
+        """
+        Debit the budget and insert the transaction in one database transaction.
+        The debit is a conditional UPDATE, so concurrent expenses can never overspend a budget.
+        """
+        budget = validated_data.get('budget')
+        with db_transaction.atomic():
+            if is_debited(budget, validated_data.get('type')):
+                if not debit_budget(budget.pk, validated_data['amount']):
+                    available = Budget.objects.filter(pk=budget.pk).values_list('total_amount', flat=True).first()
+                    raise serializers.ValidationError({
+                        "amount": f"You can't expense more than this budget, available: {available}"
+                    })
+            instance = super().create(validated_data)
+            record_created([instance])
+        return instance
+
+    def update(self, instance, validated_data):
+        """Save the changes, move the transaction's contribution between rollups and re-balance its budgets."""
+        before = copy.copy(instance)
+        with db_transaction.atomic():
+            instance = super().update(instance, validated_data)
+            record_updated(before, instance)
+        return instance
+
     def validate_amount(self, value):
         """Ensure amount is positive."""
         if value <= 0:
@@ -61,4 +124,132 @@ class TransactionSerializer(serializers.ModelSerializer):
         valid_types = [choice[0] for choice in Transaction.TYPE_CHOICES]
         if value not in valid_types:
             raise serializers.ValidationError(f"Type must be one of {valid_types}")
-        return value
\ No newline at end of file
+        return value
+
+
+class MonthFilterSerializer(serializers.Serializer):
+    """Query parameters of the monthly summary endpoint: an optional YYYY-MM range and a grouping."""
+
+    start = serializers.DateField(input_formats=['%Y-%m'], required=False)
+    end = serializers.DateField(input_formats=['%Y-%m'], required=False)
+    group_by = serializers.ChoiceField(choices=['month', 'budget'], default='month')
+
+    def validate(self, data):
+        """Reject an inverted month range."""
+        if data.get('start') and data.get('end') and data['start'] > data['end']:
+            raise serializers.ValidationError({"end": "End month must not be before start month"})
+        return data
+
+
+
+class TransactionSearchSerializer(serializers.Serializer):
+    """Query parameter of the search endpoint; the list filters are validated separately."""
+
+    q = serializers.CharField(min_length=2, max_length=200)
+
+
+class BalanceQuerySerializer(serializers.Serializer):
+    """Query parameters of the balance endpoint: the account (no budget = the user's own) and the moment."""
+
+    budget = serializers.IntegerField(required=False, min_value=1)
+    at = serializers.DateTimeField(required=False)
+
+
+class TransactionFilterSerializer(serializers.Serializer):
+    """
+    Query parameters of the transaction list and export.
+    Every filter maps to a plain column predicate, so it is served by the (user, date, id),
+    (user, type, date) and (budget, date) indexes instead of being applied after the fact.
+    """
+
+    date_from = serializers.DateField(required=False)
+    date_to = serializers.DateField(required=False)
+    type = serializers.ChoiceField(choices=Transaction.TYPE_CHOICES, required=False)
+    budget = serializers.IntegerField(min_value=1, required=False)
+    min_amount = serializers.IntegerField(min_value=0, required=False)
+    max_amount = serializers.IntegerField(min_value=0, required=False)
+    title = serializers.CharField(max_length=255, required=False, trim_whitespace=False)
+
+    def validate(self, data):
+        """Reject inverted date and amount ranges."""
+        if data.get('date_from') and data.get('date_to') and data['date_from'] > data['date_to']:
+            raise serializers.ValidationError({"date_to": "date_to must not be before date_from"})
+        if (
+            data.get('min_amount') is not None and data.get('max_amount') is not None
+            and data['min_amount'] > data['max_amount']
+        ):
+            raise serializers.ValidationError({"max_amount": "max_amount must not be below min_amount"})
+        return data
+
+    def get_filters(self):
+        """
+        Translate the validated params into queryset lookups.
+        Dates are inclusive calendar days in the current time zone, compared against `date`
+        as a datetime range (never `date__date`, which would defeat the index).
+        """
+        data = self.validated_data
+        filters = {}
+        if 'date_from' in data:
+            filters['date__gte'] = timezone.make_aware(datetime.combine(data['date_from'], time.min))
+        if 'date_to' in data:
+            filters['date__lt'] = timezone.make_aware(datetime.combine(data['date_to'] + timedelta(days=1), time.min))
+        if 'type' in data:
+            filters['type'] = data['type']
+        if 'budget' in data:
+            filters['budget_id'] = data['budget']
+        if 'min_amount' in data:
+            filters['amount__gte'] = data['min_amount']
+        if 'max_amount' in data:
+            filters['amount__lte'] = data['max_amount']
+        if data.get('title'):
+            filters['title__startswith'] = data['title']
+        return filters
+
+
+class StatementUploadSerializer(serializers.Serializer):
+    """
+    A bank statement upload and how to read it. The format defaults to the file's extension;
+    the column options override the header names the CSV parser looks for (see imports.py).
+    """
+
+    file = serializers.FileField()
+    format = serializers.ChoiceField(choices=StatementImport.FORMAT_CHOICES, required=False)
+    date_column = serializers.CharField(required=False, max_length=100)
+    amount_column = serializers.CharField(required=False, max_length=100)
+    debit_column = serializers.CharField(required=False, max_length=100)
+    credit_column = serializers.CharField(required=False, max_length=100)
+    description_column = serializers.CharField(required=False, max_length=100)
+    notes_column = serializers.CharField(required=False, max_length=100)
+    date_format = serializers.CharField(required=False, max_length=50)
+    amount_scale = serializers.IntegerField(required=False, min_value=1, max_value=10**6)
+    thousands_separator = serializers.ChoiceField(choices=list(DECIMAL_MARKS), required=False)
+    delimiter = serializers.CharField(required=False, min_length=1, max_length=1, trim_whitespace=False)
+    encoding = serializers.CharField(required=False, max_length=30, validators=[validate_encoding])
+    background = serializers.BooleanField(default=False)
+
+    def validate(self, data):
+        """Resolve the format and reject oversized uploads."""
+        data['format'] = data.get('format') or detect_format(data['file'].name)
+        if data['format'] is None:
+            raise serializers.ValidationError({"format": "Can't tell the format from the file name; set csv or ofx"})
+        if data['file'].size > settings.STATEMENT_IMPORT_MAX_BYTES:
+            raise serializers.ValidationError({"file": f"At most {settings.STATEMENT_IMPORT_MAX_BYTES} bytes"})
+        return data
+
+    def create(self, validated_data):
+        return StatementImport.objects.create(
+            user=validated_data['user'], file=validated_data['file'], format=validated_data['format'],
+            options=statement_options(validated_data),
+        )
+
+
+class StatementImportSerializer(serializers.ModelSerializer):
+    """Read-only view of an import and its progress."""
+
+    class Meta:
+        model = StatementImport
+        fields = (
+            'id', 'format', 'options', 'status', 'rows_read', 'created_count', 'duplicate_count',
+            'error_count', 'errors', 'message', 'created', 'finished',
+        )
+        read_only_fields = fields
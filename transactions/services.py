@@ -0,0 +1,303 @@
+"""
+Write-side services for the Transactions app.
+
+Budget balances are changed with conditional, F()-based UPDATE statements so the
+funds check and the write happen atomically in the database, never in Python.
+Every write path also reports to the record_* hooks, which keep the MonthlySummary
+rollups in step without rescanning a user's history and append to the balance ledger;
+the update and delete hooks also give back (or take) the exact funds that changed.
+"""
+
+from collections import defaultdict
+from datetime import datetime, time
+
+from django.db import connection, transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+from rest_framework import serializers
+from budgets.models import FREE_BUDGET_TITLE, Budget
+from Finance_Management.cache import invalidate_user
+from .ledger import append_entries, ledger_changed, transaction_entries
+from .models import MonthlySummary, RecurringTransaction, Transaction
+
+BULK_BATCH_SIZE = 1000
+RECURRING_BATCH_SIZE = 500
+SUMMARY_BATCH_SIZE = 1000
+
+
+def is_debited(budget, type_):
+    """Only Expense transactions against a non-free budget draw down its funds."""
+    return budget is not None and not budget.is_free and type_ == "Expense"
+
+
+def debit_budget(budget_id, amount):
+    """
+    Subtract `amount` from a budget if, and only if, it has enough funds.
+    Runs a single `UPDATE ... WHERE id = %s AND total_amount >= %s`; the row lock taken by
+    the UPDATE serializes concurrent debits. Returns True when the debit was applied.
+    """
+    updated = Budget.objects.filter(pk=budget_id, total_amount__gte=amount).update(
+        total_amount=F('total_amount') - amount
+    )
+    return updated == 1
+
+
+def budget_deltas(transactions, sign):
+    """(budget_id, amount) of the funds each Expense drew; sign=1 gives them back, -1 takes them."""
+    return [(t.budget_id, sign * t.amount) for t in transactions if t.budget_id is not None and t.type == "Expense"]
+
+
+def apply_budget_deltas(deltas):
+    """
+    Merge the deltas per budget and apply each with a single F()-based UPDATE; free budgets are skipped.
+    A credit always applies. A debit is conditional on the funds, like debit_budget, and raises a
+    ValidationError when they fall short, so the caller's atomic block rolls the whole write back.
+    """
+    merged = defaultdict(int)
+    for budget_id, amount in deltas:
+        merged[budget_id] += amount
+    for budget_id, amount in sorted(merged.items()):  # a fixed order keeps concurrent writers from deadlocking
+        budgets = Budget.objects.filter(pk=budget_id).exclude(title=FREE_BUDGET_TITLE)
+        if amount > 0:
+            budgets.update(total_amount=F('total_amount') + amount)
+        elif amount < 0 and not budgets.filter(total_amount__gte=-amount).update(total_amount=F('total_amount') + amount):
+            available = budgets.values_list('total_amount', flat=True).first()
+            if available is not None:  # None: the free budget, or gone
+                raise serializers.ValidationError({
+                    "amount": f"You can't expense more than this budget, available: {available}"
+                })
+
+
+def _referenced_budget_ids(items):
+    ids = set()
+    for item in items:
+        try:
+            ids.add(int(item['budget']))
+        except (TypeError, ValueError, KeyError):
+            continue
+    return ids
+
+
+def bulk_create_transactions(user, items, batch_size=BULK_BATCH_SIZE):
+    """
+    Validate and insert many transactions for one user.
+    - All referenced budgets are loaded and row-locked with one SELECT ... FOR UPDATE.
+    - Each item goes through TransactionSerializer; expenses are checked against the running balance.
+    - Rows are inserted with bulk_create and each budget gets a single UPDATE for its summed debit.
+    Returns (created_transactions, errors) where errors is a list of {"index", "errors"}.
+    """
+    from .serializers import TransactionSerializer
+
+    created, errors, debits = [], [], defaultdict(int)
+    with db_transaction.atomic():
+        budgets = Budget.objects.select_for_update().filter(
+            user=user, pk__in=_referenced_budget_ids(items)
+        ).in_bulk()
+        # One serializer validates every item: building its fields is the dominant per-item cost.
+        serializer = TransactionSerializer(context={'budgets': budgets})
+        for index, item in enumerate(items):
+            try:
+                data = serializer.run_validation(item)
+            except serializers.ValidationError as exc:
+                errors.append({'index': index, 'errors': exc.detail})
+                continue
+            budget = data.get('budget')
+            if is_debited(budget, data.get('type')):
+                # validate() compared against this in-memory balance, so keep it running.
+                budget.total_amount -= data['amount']
+                debits[budget.pk] += data['amount']
+            created.append(Transaction(user=user, **data))
+
+        Transaction.objects.bulk_create(created, batch_size=batch_size)
+        record_created(created)
+        if created:
+            invalidate_user(user.pk)
+        for budget_id, amount in debits.items():
+            Budget.objects.filter(pk=budget_id).update(total_amount=F('total_amount') - amount)
+    return created, errors
+
+
+def summary_month(date):
+    """First day of the month `date` falls in, in the current time zone (matches TruncMonth)."""
+    return timezone.localtime(date).date().replace(day=1)
+
+
+def apply_summary_deltas(deltas):
+    """
+    Add `(user_id, budget_id, year_month, type, total, count)` deltas to MonthlySummary.
+    Deltas for the same key are merged first, then each half of the partial unique index
+    (with and without a budget) is upserted with INSERT ... ON CONFLICT DO UPDATE,
+    SUMMARY_BATCH_SIZE rows per statement.
+    """
+    merged = defaultdict(lambda: [0, 0])
+    for user_id, budget_id, year_month, type_, total, count in deltas:
+        entry = merged[(user_id, budget_id, year_month, type_)]
+        entry[0] += total
+        entry[1] += count
+
+    table = MonthlySummary._meta.db_table
+    with_budget = [key + tuple(value) for key, value in merged.items() if key[1] is not None and any(value)]
+    without_budget = [key + tuple(value) for key, value in merged.items() if key[1] is None and any(value)]
+    with connection.cursor() as cursor:
+        for rows, conflict in (
+            (with_budget, '(user_id, budget_id, year_month, type) WHERE budget_id IS NOT NULL'),
+            (without_budget, '(user_id, year_month, type) WHERE budget_id IS NULL'),
+        ):
+            for start in range(0, len(rows), SUMMARY_BATCH_SIZE):
+                batch = rows[start:start + SUMMARY_BATCH_SIZE]
+                placeholders = ', '.join(['(%s, %s, %s, %s, %s, %s)'] * len(batch))
+                cursor.execute(
+                    f'INSERT INTO {table} (user_id, budget_id, year_month, type, total, count) '
+                    f'VALUES {placeholders} '
+                    f'ON CONFLICT {conflict} DO UPDATE SET '
+                    f'total = {table}.total + EXCLUDED.total, count = {table}.count + EXCLUDED.count',
+                    [value for row in batch for value in row],
+                )
+
+
+def _summary_delta(transaction, sign):
+    return (
+        transaction.user_id,
+        transaction.budget_id,
+        summary_month(transaction.date),
+        transaction.type,
+        sign * transaction.amount,
+        sign,
+    )
+
+
+def record_created(transactions):
+    """Account for newly inserted transactions in the rollups and the ledger."""
+    transactions = list(transactions)
+    apply_summary_deltas(_summary_delta(t, 1) for t in transactions)
+    append_entries(entry for t in transactions for entry in transaction_entries(t, 1, 'create'))
+
+
+def record_updated(before, after):
+    """
+    Move an edited transaction's contribution from its old rollup key and ledger entries to its new ones,
+    and re-credit its old budget with the old amount while debiting the new one with the new amount.
+    """
+    apply_summary_deltas([_summary_delta(before, -1), _summary_delta(after, 1)])
+    if ledger_changed(before, after):
+        apply_budget_deltas(budget_deltas([before], 1) + budget_deltas([after], -1))
+        append_entries(transaction_entries(before, -1, 'update') + transaction_entries(after, 1, 'update'))
+
+
+def record_deleted(transactions):
+    """Remove deleted transactions from the rollups, re-credit their budgets and reverse them in the ledger."""
+    transactions = list(transactions)
+    apply_summary_deltas(_summary_delta(t, -1) for t in transactions)
+    apply_budget_deltas(budget_deltas(transactions, 1))
+    append_entries(entry for t in transactions for entry in transaction_entries(t, -1, 'delete'))
+
+
+def delete_transaction(transaction):
+    """Delete a transaction and keep the rollups and ledger in step, atomically."""
+    with db_transaction.atomic():
+        record_deleted([transaction])  # first: delete() clears the primary key the ledger refers to
+        transaction.delete()
+
+
+def fold_budget_summaries(budget_id):
+    """
+    Move a deleted budget's rollup rows into the no-budget bucket, as Transaction.budget is SET_NULL.
+    When the budget goes away because its user is deleted, the rows are already gone and nothing happens.
+    """
+    rows = MonthlySummary.objects.filter(budget_id=budget_id)
+    deltas = [(r.user_id, None, r.year_month, r.type, r.total, r.count) for r in rows]
+    if deltas:
+        rows.delete()
+        apply_summary_deltas(deltas)
+
+
+def materialize_due(today, batch_size=RECURRING_BATCH_SIZE):
+    """
+    Turn every due RecurringTransaction occurrence (up to and including `today`) into a Transaction.
+    Rules are processed in batches, each in its own database transaction:
+    - due rules are claimed with SELECT ... FOR UPDATE SKIP LOCKED, so concurrent runs split the work;
+    - their budgets are locked once, each rule's expenses are checked in id order against the
+      budget's running balance, and each budget is debited once with the accepted total;
+    - occurrences are inserted with one bulk_create and the rules advanced with one bulk_update.
+    A rule whose budget cannot cover its due expenses, or whose budget belongs to another user,
+    is left due for a later run.
+    Re-running is cheap (one empty index range scan) and (rule, occurrence_date) is unique, so an
+    occurrence is never inserted twice. Returns (created_count, skipped_rule_ids).
+    """
+    created_total, skipped, last_id = 0, [], 0
+    while True:
+        with db_transaction.atomic():
+            rules = list(
+                RecurringTransaction.objects.select_for_update(skip_locked=True)
+                .filter(next_occurrence__lte=today, id__gt=last_id)
+                .order_by('id')[:batch_size]
+            )
+            if not rules:
+                break
+            last_id = rules[-1].id
+            created, rejected = _materialize_batch(rules, today)
+            created_total += len(created)
+            skipped += rejected
+    return created_total, skipped
+
+
+def _materialize_batch(rules, today):
+    budgets = Budget.objects.select_for_update().in_bulk({rule.budget_id for rule in rules if rule.budget_id})
+    pending = {}
+    for rule in rules:
+        dates, materialized = [], rule.materialized_count
+        upcoming = rule.next_occurrence
+        while upcoming is not None and upcoming <= today:
+            dates.append(upcoming)
+            materialized += 1
+            upcoming = rule.schedule_after(materialized)
+        pending[rule.pk] = (dates, materialized, upcoming)
+
+    # Rules debit their budget one by one in id order; a rule the running balance can't cover, or
+    # whose budget isn't its user's, is rejected alone and the rules after it still get their turn.
+    balances = {pk: budget.total_amount for pk, budget in budgets.items()}
+    debits, rejected = defaultdict(int), []
+    for rule in sorted(rules, key=lambda rule: rule.pk):
+        budget = budgets.get(rule.budget_id)
+        if rule.budget_id and (budget is None or budget.user_id != rule.user_id):
+            rejected.append(rule.pk)
+            continue
+        if not is_debited(budget, rule.type):
+            continue
+        amount = rule.amount * len(pending[rule.pk][0])
+        if balances[rule.budget_id] < amount:
+            rejected.append(rule.pk)
+            continue
+        balances[rule.budget_id] -= amount
+        debits[rule.budget_id] += amount
+
+    created, advanced = [], []
+    for rule in rules:
+        if rule.pk in rejected:
+            continue
+        dates, rule.materialized_count, rule.next_occurrence = pending[rule.pk]
+        advanced.append(rule)
+        created.extend(
+            Transaction(
+                user_id=rule.user_id,
+                title=rule.title,
+                amount=rule.amount,
+                type=rule.type,
+                notes=rule.notes,
+                budget_id=rule.budget_id,
+                date=timezone.make_aware(datetime.combine(occurrence, time.min)),
+                recurring=rule,
+                occurrence_date=occurrence,
+            )
+            for occurrence in dates
+        )
+
+    Transaction.objects.bulk_create(created, batch_size=BULK_BATCH_SIZE)
+    RecurringTransaction.objects.bulk_update(advanced, ['materialized_count', 'next_occurrence'])
+    for budget_id, amount in debits.items():
+        if amount:
+            Budget.objects.filter(pk=budget_id).update(total_amount=F('total_amount') - amount)
+    record_created(created)
+    for user_id in {t.user_id for t in created}:
+        invalidate_user(user_id)
+    return created, rejected
@@ -0,0 +1,48 @@
+"""
+Signals for the Transactions app.
+
+Keeps the MonthlySummary rollups consistent when a budget is deleted, books budget
+allocations in the ledger, and drops a user's cached API responses whenever one of
+their transactions changes.
+"""
+
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from budgets.models import Budget
+from Finance_Management.cache import invalidate_user
+from .ledger import allocation_entry, append_entries
+from .models import Transaction
+from .services import fold_budget_summaries
+
+
+@receiver(post_delete, sender=Budget)
+def fold_deleted_budget_summaries(sender, instance, **kwargs):
+    """
+    Signal handler that moves a deleted budget's rollups to the no-budget bucket,
+    matching the SET_NULL its transactions receive.
+    """
+    fold_budget_summaries(instance.pk)
+
+
+@receiver(post_save, sender=Budget)
+def book_budget_allocation(sender, instance, created, **kwargs):
+    """
+    Signal handler that appends a budget's allocation, or its change since the budget was loaded,
+    to the budget's ledger account. bulk_create skips signals, so bulk seeders book it themselves.
+    """
+    saved = 0 if created else getattr(instance, '_saved_allocated_amount', None)
+    if saved is None:  # loaded without allocated_amount, so this save did not change it
+        return
+    if instance.allocated_amount != saved:
+        append_entries([allocation_entry(instance, instance.allocated_amount - saved)])
+    instance._saved_allocated_amount = instance.allocated_amount
+
+
+@receiver(post_save, sender=Transaction)
+@receiver(post_delete, sender=Transaction)
+def invalidate_transaction_owner(sender, instance, **kwargs):
+    """
+    Signal handler that invalidates the owner's cached responses after a transaction write.
+    bulk_create skips signals, so bulk_create_transactions invalidates explicitly.
+    """
+    invalidate_user(instance.user_id)
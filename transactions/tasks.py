@@ -0,0 +1,62 @@
+"""
+Background jobs of the Transactions app (see jobs/queue.py).
+
+The heavy operations that used to run inside request workers or cron invocations:
+statement imports, exports, MonthlySummary rebuilds and recurring materialization.
+"""
+
+import tempfile
+from datetime import date
+
+from django.core.files import File
+from django.core.files.storage import default_storage
+from django.core.management import call_command
+from django.utils import timezone
+from jobs.queue import task, worker_lost
+from .export import EXPORT_FORMATS
+from .imports import run_import
+from .models import StatementImport, Transaction
+from .serializers import StatementImportSerializer, TransactionFilterSerializer
+from .services import materialize_due
+
+
+@task('transactions.import_statement')
+def import_statement(job):
+    """Run (or, on a retry, resume) the StatementImport `payload['import_id']`."""
+    statement_import = StatementImport.objects.get(pk=job.payload['import_id'])
+    # Only a worker that stopped heartbeating leaves the import marked running; after any other
+    # failure it is 'failed' and resumes without taking over an import another worker still runs.
+    statement_import = run_import(statement_import, force=worker_lost(job))
+    return StatementImportSerializer(statement_import).data
+
+
+@task('transactions.export')
+def export_transactions(job):
+    """
+    Write the user's transactions, narrowed by `payload['filters']`, as `payload['output']`
+    (ndjson or csv) to storage. The file is spooled to disk first, so memory stays flat.
+    """
+    params = TransactionFilterSerializer(data=job.payload.get('filters', {}))
+    params.is_valid(raise_exception=True)
+    stream, _, extension = EXPORT_FORMATS[job.payload.get('output', 'ndjson')]
+    transactions = Transaction.objects.filter(user_id=job.user_id, **params.get_filters()).order_by('date', 'id')
+    with tempfile.TemporaryFile('w+b') as spool:
+        for chunk in stream(transactions):
+            spool.write(chunk.encode())
+        spool.seek(0)
+        name = default_storage.save(f'exports/{job.user_id}/transactions-{job.pk}.{extension}', File(spool))
+    return {'file': name, 'created': timezone.now().isoformat()}
+
+
+@task('transactions.rebuild_summaries')
+def rebuild_summaries(job):
+    """Recompute the MonthlySummary rollups of `payload['users']` (all users when empty)."""
+    call_command('rebuild_summaries', users=job.payload.get('users') or None, verbosity=0)
+
+
+@task('transactions.materialize_recurring')
+def materialize_recurring(job):
+    """Materialize the recurring transactions due up to `payload['date']` (default: today)."""
+    day = date.fromisoformat(job.payload['date']) if job.payload.get('date') else timezone.localdate()
+    created, skipped = materialize_due(day)
+    return {'created': created, 'skipped': skipped}
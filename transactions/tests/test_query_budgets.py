@@ -0,0 +1,84 @@
+"""
+Query-count and wall-time budgets for TransactionAPIView.
+
+Every test runs against users seeded with 1k, 10k and 100k transactions (see seeded_user in
+the root conftest.py) under the same budget, so an N+1 or any other query whose count grows
+with a user's data fails the build. The CSV/NDJSON export is left out: it streams the whole
+history in fixed-size chunks by design.
+"""
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from rest_framework import status
+from Finance_Management.cache import get_cache
+from transactions.models import Transaction
+
+
+@pytest.fixture
+def api_client(seeded_user):
+    """APIClient authenticated as the seeded user, with an empty response cache."""
+    get_cache().clear()
+    client = APIClient()
+    client.force_authenticate(user=seeded_user[0])
+    return client
+
+
+@pytest.mark.django_db
+def test_list_query_budget(api_client, query_budget):
+    """A list page, a filtered page and the next page via cursor."""
+    url = reverse('transactions:transaction-list')
+    with query_budget(max_queries=1, seconds=0.5):
+        response = api_client.get(url, {'limit': 100})
+    assert response.status_code == status.HTTP_200_OK
+    assert len(response.data) == 100
+    with query_budget(max_queries=1, seconds=0.5):
+        response = api_client.get(url, {'type': 'Expense', 'min_amount': 10, 'cursor': response['X-Next-Cursor']})
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_retrieve_query_budget(api_client, seeded_user, query_budget):
+    transaction = Transaction.objects.filter(user=seeded_user[0]).order_by('-id').first()
+    with query_budget(max_queries=1, seconds=0.2):
+        response = api_client.get(reverse('transactions:transaction-detail', kwargs={'pk': transaction.pk}))
+    assert response.status_code == status.HTTP_200_OK
+
+
+@pytest.mark.django_db
+def test_create_query_budget(api_client, seeded_user, query_budget):
+    _, budget = seeded_user
+    data = {'title': 'Rent', 'amount': 100, 'type': 'Expense', 'budget': budget.id}
+    with query_budget(max_queries=7, seconds=0.3):
+        response = api_client.post(reverse('transactions:transaction-list'), data, format='json')
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+
+
+@pytest.mark.django_db
+def test_update_and_delete_query_budget(api_client, seeded_user, query_budget):
+    transaction = Transaction.objects.filter(user=seeded_user[0], budget=seeded_user[1]).first()
+    url = reverse('transactions:transaction-detail', kwargs={'pk': transaction.pk})
+    with query_budget(max_queries=7, seconds=0.3):
+        response = api_client.patch(url, {'amount': 5}, format='json')
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    with query_budget(max_queries=7, seconds=0.3):
+        response = api_client.delete(url)
+    assert response.status_code == status.HTTP_204_NO_CONTENT
+
+
+@pytest.mark.django_db
+def test_bulk_query_budget(api_client, seeded_user, query_budget):
+    _, budget = seeded_user
+    items = [{'title': f'Item {i}', 'amount': 1, 'type': 'Expense', 'budget': budget.id} for i in range(200)]
+    with query_budget(max_queries=11, seconds=2.0):
+        response = api_client.post(reverse('transactions:transaction-bulk'), items, format='json')
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+
+
+@pytest.mark.django_db
+def test_summary_query_budget(api_client, query_budget):
+    url = reverse('transactions:transaction-summary')
+    with query_budget(max_queries=1, seconds=0.3):
+        response = api_client.get(url, {'group_by': 'budget'})
+    assert response.status_code == status.HTTP_200_OK
+    assert sum(row['count'] for row in response.data) > 0
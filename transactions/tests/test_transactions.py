@@ -0,0 +1,1369 @@
+"""
+Test suite for the Transactions app.
+
+This file contains tests for the Transaction model and TransactionAPIView.
+The tests cover:
+- Creating transactions with valid data (with/without budget, Income/Expense types).
+- Validating serializer constraints (e.g., insufficient budget, invalid transaction type).
+- Authentication requirements (ensuring unauthenticated requests fail).
+- CRUD operations (list, retrieve, partial update, delete).
+"""
+
+import pytest
+from rest_framework.test import APIClient
+from django.urls import reverse
+from rest_framework import status
+from transactions.models import Transaction
+from accounts.models import User
+from budgets.models import Budget
+from django.db import connection
+from django.utils import timezone
+
+
+@pytest.fixture
+def api_client():
+    """Fixture to provide an APIClient instance for making HTTP requests."""
+    return APIClient()
+
+
+@pytest.fixture
+def create_user():
+    """Fixture to create a test user."""
+    user = User.objects.create_user(
+        username='testuser',
+        email='testuser@example.com',
+        password='ComplexPass123!@#'
+    )
+    return user
+
+
+@pytest.fixture
+def create_free_budget(create_user):
+    """Fixture to create a 'free' budget for a test user."""
+    user = create_user
+    budget = Budget.objects.create(
+        user=user,
+        title='free',
+        total_amount=999999999999,
+        start_date=timezone.now().date()
+    )
+    return budget
+
+
+@pytest.fixture
+def create_regular_budget(create_user):
+    """Fixture to create a regular budget for a test user."""
+    user = create_user
+    budget = Budget.objects.create(
+        user=user,
+        title='regular',
+        total_amount=1000,
+        start_date=timezone.now().date(),
+        end_date=timezone.now().date()
+    )
+    return budget
+
+
+@pytest.mark.django_db
+def test_create_transaction_success_free_budget(api_client, create_user, create_free_budget):
+    """
+    Test creating a transaction with a 'free' budget successfully.
+    Ensures the transaction is created with correct fields and associated with the user and budget.
+    """
+    user = create_user
+    budget = create_free_budget
+    api_client.force_authenticate(user=user)
+    transaction_data = {
+        'title': 'Test Income',
+        'amount': 100,
+        'type': 'Income',
+        'notes': 'Test note',
+        'budget': budget.id
+    }
+    url = reverse('transactions:transaction-list')
+    response = api_client.post(url, transaction_data, format='json')
+    print(f"Response data: {response.data}")  # Debug output for response
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+    assert Transaction.objects.count() == 1
+    transaction = Transaction.objects.first()
+    assert transaction.user == user
+    assert transaction.title == transaction_data['title']
+    assert transaction.amount == transaction_data['amount']
+    assert transaction.type == transaction_data['type']
+    assert transaction.notes == transaction_data['notes']
+    assert transaction.budget == budget
+
+
+@pytest.mark.django_db
+def test_create_transaction_success_no_budget(api_client, create_user):
+    """
+    Test creating a transaction without a budget successfully.
+    Ensures the transaction is created with correct fields and no budget association.
+    """
+    user = create_user
+    api_client.force_authenticate(user=user)
+    transaction_data = {
+        'title': 'Test Expense',
+        'amount': 50,
+        'type': 'Expense',
+        'notes': 'No budget'
+    }
+    url = reverse('transactions:transaction-list')
+    response = api_client.post(url, transaction_data, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+    assert Transaction.objects.count() == 1
+    assert Transaction.objects.first().budget is None
+
+
+@pytest.mark.django_db
+def test_create_transaction_expense_regular_budget(api_client, create_user, create_regular_budget):
+    """
+    Test creating an Expense transaction with a regular budget.
+    Verifies that the budget's total_amount is reduced correctly.
+    """
+    user = create_user
+    budget = create_regular_budget
+    api_client.force_authenticate(user=user)
+    transaction_data = {
+        'title': 'Test Expense',
+        'amount': 500,
+        'type': 'Expense',
+        'notes': 'Test',
+        'budget': budget.id
+    }
+    url = reverse('transactions:transaction-list')
+    response = api_client.post(url, transaction_data, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+    budget.refresh_from_db()
+    assert budget.total_amount == 500  # 1000 - 500
+    assert Transaction.objects.count() == 1
+
+
+@pytest.mark.django_db
+def test_create_transaction_insufficient_budget(api_client, create_user, create_regular_budget):
+    """
+    Test creating an Expense transaction with insufficient budget funds.
+    Ensures the serializer validation rejects the request.
+    """
+    user = create_user
+    budget = create_regular_budget
+    api_client.force_authenticate(user=user)
+    transaction_data = {
+        'title': 'Test Expense',
+        'amount': 1500,  # Exceeds budget total_amount=1000
+        'type': 'Expense',
+        'notes': 'Test',
+        'budget': budget.id
+    }
+    url = reverse('transactions:transaction-list')
+    response = api_client.post(url, transaction_data, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, f"Error: {response.data}"
+    assert 'amount' in response.data
+    assert 'You can\'t expense more than this budget' in str(response.data['amount'])
+
+
+@pytest.mark.django_db
+def test_create_transaction_income_regular_budget(api_client, create_user, create_regular_budget):
+    """
+    Test creating an Income transaction with a non-free budget.
+    Ensures the serializer rejects Income transactions for non-free budgets.
+    """
+    user = create_user
+    budget = create_regular_budget
+    api_client.force_authenticate(user=user)
+    transaction_data = {
+        'title': 'Test Income',
+        'amount': 100,
+        'type': 'Income',
+        'notes': 'Test',
+        'budget': budget.id
+    }
+    url = reverse('transactions:transaction-list')
+    response = api_client.post(url, transaction_data, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, f"Error: {response.data}"
+    assert 'type' in response.data
+    assert 'You cannot add Income to non-free budgets' in str(response.data['type'])
+
+
+@pytest.mark.django_db
+def test_transaction_rejects_other_users_budget(api_client, create_user, create_free_budget):
+    """
+    Test that a transaction can't be booked against another user's budget.
+    Ensures create, partial update and the async create reject the budget id with 400 and
+    leave the other user's funds untouched.
+    """
+    user = create_user
+    other = User.objects.create_user(username='victim', email='victim@example.com', password='ComplexPass123!@#')
+    victim_budget = Budget.objects.create(user=other, title='savings', total_amount=1000, start_date=timezone.now().date())
+    api_client.force_authenticate(user=user)
+    data = {'title': 'Steal', 'amount': 400, 'type': 'Expense', 'budget': victim_budget.id}
+
+    response = api_client.post(reverse('transactions:transaction-list'), data, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'budget' in response.data
+    response = api_client.post(reverse('async_transactions:transaction-list'), data, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'budget' in response.data
+
+    transaction = Transaction.objects.create(user=user, title='Own', amount=400, type='Expense', budget=create_free_budget)
+    url = reverse('transactions:transaction-detail', args=[transaction.id])
+    response = api_client.patch(url, {'budget': victim_budget.id}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'budget' in response.data
+    victim_budget.refresh_from_db()
+    assert victim_budget.total_amount == 1000
+    assert not Transaction.objects.filter(budget=victim_budget).exists()
+
+
+@pytest.mark.django_db
+def test_create_transaction_unauthenticated(api_client, create_free_budget):
+    """
+    Test creating a transaction without authentication.
+    Ensures unauthenticated requests are rejected with 401.
+    """
+    transaction_data = {
+        'title': 'Test Income',
+        'amount': 100,
+        'type': 'Income',
+        'notes': 'Test',
+        'budget': create_free_budget.id
+    }
+    url = reverse('transactions:transaction-list')
+    response = api_client.post(url, transaction_data, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_401_UNAUTHORIZED, f"Error: {response.data}"
+
+
+@pytest.mark.django_db
+def test_list_transactions(api_client, create_user, create_free_budget):
+    """
+    Test listing transactions for an authenticated user.
+    Ensures only the user's transactions are returned.
+    """
+    user = create_user
+    budget = create_free_budget
+    Transaction.objects.create(user=user, title='Test1', amount=100, type='Income', budget=budget)
+    Transaction.objects.create(user=user, title='Test2', amount=200, type='Expense')
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-list')
+    response = api_client.get(url)
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    assert len(response.data) == 2
+    assert response.data[0]['title'] == 'Test1'
+    assert response.data[1]['title'] == 'Test2'
+
+
+@pytest.mark.django_db
+def test_retrieve_transaction(api_client, create_user, create_free_budget):
+    """
+    Test retrieving a single transaction by ID.
+    Ensures the correct transaction details are returned.
+    """
+    user = create_user
+    budget = create_free_budget
+    transaction = Transaction.objects.create(user=user, title='Test', amount=100, type='Income', budget=budget)
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-detail', kwargs={'pk': transaction.id})
+    response = api_client.get(url)
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    assert response.data['title'] == 'Test'
+
+
+@pytest.mark.django_db
+def test_partial_update_transaction(api_client, create_user, create_free_budget):
+    """
+    Test partially updating a transaction.
+    Ensures the transaction is updated correctly without affecting other fields.
+    """
+    user = create_user
+    budget = create_free_budget
+    transaction = Transaction.objects.create(user=user, title='Test', amount=100, type='Income', budget=budget)
+    api_client.force_authenticate(user=user)
+    update_data = {'notes': 'Updated note'}
+    url = reverse('transactions:transaction-detail', kwargs={'pk': transaction.id})
+    response = api_client.patch(url, update_data, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    transaction.refresh_from_db()
+    assert transaction.notes == 'Updated note'
+    assert transaction.title == 'Test'  # Ensure other fields are unchanged
+
+
+@pytest.mark.django_db
+def test_destroy_transaction(api_client, create_user, create_free_budget):
+    """
+    Test deleting a transaction.
+    Ensures the transaction is removed and returns 204 status.
+    """
+    user = create_user
+    budget = create_free_budget
+    transaction = Transaction.objects.create(user=user, title='Test', amount=100, type='Income', budget=budget)
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-detail', kwargs={'pk': transaction.id})
+    response = api_client.delete(url)
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_204_NO_CONTENT, f"Error: {response.data}"
+    assert Transaction.objects.count() == 0
+
+@pytest.mark.django_db
+def test_list_transactions_keyset_pagination(api_client, create_user):
+    """
+    Test paging through transactions with the keyset cursor.
+    Ensures pages do not overlap and the last page carries no next cursor.
+    """
+    user = create_user
+    for i in range(5):
+        Transaction.objects.create(user=user, title=f'T{i}', amount=10, type='Expense')
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-list')
+
+    response = api_client.get(url, {'limit': 2})
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    assert [t['title'] for t in response.data] == ['T0', 'T1']
+    cursor = response['X-Next-Cursor']
+    assert 'rel="next"' in response['Link']
+
+    titles = []
+    while cursor:
+        response = api_client.get(url, {'limit': 2, 'cursor': cursor})
+        titles += [t['title'] for t in response.data]
+        cursor = response.headers.get('X-Next-Cursor')
+    assert titles == ['T2', 'T3', 'T4']
+
+
+@pytest.mark.django_db
+def test_list_transactions_invalid_cursor(api_client, create_user):
+    """
+    Test listing with a malformed cursor.
+    Ensures the request is rejected with 400 instead of a server error.
+    """
+    api_client.force_authenticate(user=create_user)
+    url = reverse('transactions:transaction-list')
+    response = api_client.get(url, {'cursor': 'not-a-cursor'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, f"Error: {response.data}"
+    assert 'cursor' in response.data
+
+
+@pytest.mark.django_db
+def test_list_transactions_field_projection(api_client, create_user):
+    """
+    Test the ?fields= projection on the transaction list.
+    Ensures only the requested fields are returned and unknown fields are rejected.
+    """
+    user = create_user
+    Transaction.objects.create(user=user, title='Test1', amount=100, type='Income')
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-list')
+
+    response = api_client.get(url, {'fields': 'id,title'})
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    assert set(response.data[0]) == {'id', 'title'}
+
+    response = api_client.get(url, {'fields': 'title,password'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST, f"Error: {response.data}"
+
+
+@pytest.mark.django_db
+def test_export_transactions_ndjson(api_client, create_user, create_free_budget):
+    """
+    Test streaming the transaction history as NDJSON.
+    Ensures every line matches the regular serializer output.
+    """
+    import json
+    from transactions.serializers import TransactionSerializer
+    user = create_user
+    Transaction.objects.create(user=user, title='Test1', amount=100, type='Income', budget=create_free_budget)
+    Transaction.objects.create(user=user, title='Test2', amount=200, type='Expense', notes='café')
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-export')
+    response = api_client.get(url)
+    assert response.status_code == status.HTTP_200_OK
+    assert response['Content-Type'] == 'application/x-ndjson'
+    lines = b''.join(response.streaming_content).decode().splitlines()
+    expected = TransactionSerializer(Transaction.objects.order_by('date', 'id'), many=True).data
+    assert [json.loads(line) for line in lines] == json.loads(json.dumps(expected))
+
+
+@pytest.mark.django_db
+def test_export_transactions_csv(api_client, create_user):
+    """
+    Test streaming the transaction history as CSV.
+    Ensures a header row is followed by one row per transaction.
+    """
+    import csv
+    user = create_user
+    Transaction.objects.create(user=user, title='Rent, May', amount=100, type='Expense')
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-export')
+    response = api_client.get(url, {'output': 'csv'})
+    assert response.status_code == status.HTTP_200_OK
+    rows = list(csv.reader(b''.join(response.streaming_content).decode().splitlines()))
+    assert rows[0] == ['id', 'user', 'title', 'amount', 'type', 'notes', 'budget', 'date']
+    assert rows[1][2] == 'Rent, May'
+
+    response = api_client.get(url, {'output': 'xml'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db(transaction=True)
+@pytest.mark.skipif(connection.vendor == 'sqlite', reason="SQLite locks whole tables against concurrent writers")
+def test_concurrent_expenses_never_overspend_budget(create_user, create_regular_budget):
+    """
+    Stress test concurrent Expense posts against one budget.
+    Ensures exactly as many expenses succeed as the budget can cover, the budget never
+    goes negative, and contention does not collapse throughput compared to the same
+    posts made serially against a second budget with the same allocation.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    user = create_user
+    url = reverse('transactions:transaction-list')
+
+    def post(budget):
+        client = APIClient()
+        client.force_authenticate(user=user)
+        try:
+            data = {'title': 'Concurrent', 'amount': 100, 'type': 'Expense', 'budget': budget.id}
+            return client.post(url, data, format='json').status_code
+        finally:
+            connection.close()
+
+    def run(budget, workers):
+        started = time.perf_counter()
+        if workers > 1:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                codes = list(pool.map(post, [budget] * 40))
+        else:
+            codes = [post(budget) for _ in range(40)]
+        elapsed = time.perf_counter() - started
+        print(f"{workers} worker(s): {codes.count(status.HTTP_201_CREATED)} created in {elapsed:.3f}s")
+        assert codes.count(status.HTTP_201_CREATED) == 10
+        assert codes.count(status.HTTP_400_BAD_REQUEST) == 30
+        budget.refresh_from_db()
+        assert budget.total_amount == 0
+        assert Transaction.objects.filter(budget=budget).count() == 10
+        return elapsed
+
+    concurrent_elapsed = run(create_regular_budget, workers=8)  # total_amount=1000
+    serial_budget = Budget.objects.create(
+        user=user, title='serial', total_amount=1000, start_date=timezone.now().date(), end_date=timezone.now().date()
+    )
+    serial_elapsed = run(serial_budget, workers=1)
+    assert concurrent_elapsed < serial_elapsed * 3
+
+
+@pytest.mark.django_db
+def test_bulk_create_transactions(api_client, create_user, create_regular_budget, django_assert_max_num_queries):
+    """
+    Test bulk ingestion from a JSON array.
+    Ensures valid items are inserted with a constant number of queries, the budget is debited
+    once with the summed amount, and items exceeding the running balance are reported by index.
+    """
+    user = create_user
+    budget = create_regular_budget  # total_amount=1000
+    api_client.force_authenticate(user=user)
+    items = [{'title': f'E{i}', 'amount': 100, 'type': 'Expense', 'budget': budget.id} for i in range(12)]
+    items.append({'title': 'Salary', 'amount': 5000, 'type': 'Income'})
+    items.append({'title': 'Bad', 'amount': -1, 'type': 'Expense'})
+    url = reverse('transactions:transaction-bulk')
+    # Budget lock, bulk INSERT, budget UPDATE and one rollup upsert per budget/no-budget half.
+    with django_assert_max_num_queries(8):
+        response = api_client.post(url, items, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_207_MULTI_STATUS, f"Error: {response.data}"
+    assert response.data['created'] == 11
+    assert [e['index'] for e in response.data['errors']] == [10, 11, 13]
+    assert 'amount' in response.data['errors'][0]['errors']
+    budget.refresh_from_db()
+    assert budget.total_amount == 0
+    assert Transaction.objects.filter(user=user).count() == 11
+
+
+@pytest.mark.django_db
+def test_bulk_create_transactions_ndjson(api_client, create_user, create_regular_budget):
+    """
+    Test bulk ingestion from an NDJSON body.
+    Ensures each line becomes a transaction and budgets of other users are rejected.
+    """
+    user = create_user
+    other = User.objects.create_user(username='other', email='other@example.com', password='ComplexPass123!@#')
+    other_budget = Budget.objects.get(user=other, title='free')
+    api_client.force_authenticate(user=user)
+    body = (
+        '{"title": "A", "amount": 10, "type": "Expense", "budget": %d}\n'
+        '\n'
+        '{"title": "B", "amount": 20, "type": "Income", "budget": %d}\n'
+    ) % (create_regular_budget.id, other_budget.id)
+    url = reverse('transactions:transaction-bulk')
+    response = api_client.post(url, body, content_type='application/x-ndjson')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_207_MULTI_STATUS, f"Error: {response.data}"
+    assert response.data['created'] == 1
+    assert response.data['errors'][0]['index'] == 1
+    assert 'budget' in response.data['errors'][0]['errors']
+
+    response = api_client.post(url, '{"title": ', content_type='application/x-ndjson')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_monthly_summary_incremental(api_client, create_user, create_free_budget):
+    """
+    Test that the MonthlySummary rollups follow transaction create, update and delete,
+    and that the summary endpoint reports income, expense and net per month.
+    """
+    user = create_user
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-list')
+    income = api_client.post(url, {'title': 'Salary', 'amount': 500, 'type': 'Income'}, format='json').data
+    expense = api_client.post(url, {'title': 'Rent', 'amount': 200, 'type': 'Expense'}, format='json').data
+    api_client.post(url, {'title': 'Food', 'amount': 50, 'type': 'Expense'}, format='json')
+
+    detail = reverse('transactions:transaction-detail', kwargs={'pk': expense['id']})
+    api_client.patch(detail, {'amount': 300}, format='json')
+    api_client.delete(reverse('transactions:transaction-detail', kwargs={'pk': income['id']}))
+    api_client.post(url, {'title': 'Bonus', 'amount': 100, 'type': 'Income'}, format='json')
+
+    response = api_client.get(reverse('transactions:transaction-summary'))
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_200_OK
+    month = timezone.localtime().strftime('%Y-%m')
+    assert response.data == [{'month': month, 'income': 100, 'expense': 350, 'count': 3, 'net': -250}]
+
+
+@pytest.mark.django_db
+def test_rebuild_summaries(api_client, create_user, create_free_budget):
+    """
+    Test the rebuild_summaries command.
+    Ensures rollups are recomputed from transactions, including rows inserted behind the services' back.
+    """
+    from django.core.management import call_command
+    from transactions.models import MonthlySummary
+
+    user = create_user
+    budget = create_free_budget
+    last_year = timezone.now() - timezone.timedelta(days=400)
+    Transaction.objects.create(user=user, title='Old', amount=70, type='Expense', budget=budget, date=last_year)
+    Transaction.objects.create(user=user, title='New', amount=30, type='Income')
+    assert not MonthlySummary.objects.exists()
+
+    call_command('rebuild_summaries')
+    assert MonthlySummary.objects.filter(user=user).count() == 2
+
+    api_client.force_authenticate(user=user)
+    response = api_client.get(reverse('transactions:transaction-summary'), {'group_by': 'budget'})
+    assert response.status_code == status.HTTP_200_OK
+    assert [(row['budget'], row['net']) for row in response.data] == [(budget.id, -70), (None, 30)]
+
+    response = api_client.get(reverse('transactions:transaction-summary'), {'start': '2030-01', 'end': '2020-01'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_list_response_cache(api_client, create_user, create_free_budget, django_assert_num_queries):
+    """
+    Test the per-user response cache on the list endpoint.
+    Ensures repeated reads skip the database, a matching ETag yields 304,
+    and a write invalidates the cached page.
+    """
+    user = create_user
+    api_client.force_authenticate(user=user)
+    Transaction.objects.create(user=user, title='Cached', amount=10, type='Income')
+    url = reverse('transactions:transaction-list')
+
+    first = api_client.get(url)
+    assert first.status_code == status.HTTP_200_OK
+    assert 'ETag' in first and 'Last-Modified' not in first
+    with django_assert_num_queries(0):
+        second = api_client.get(url)
+    assert second.data == first.data
+
+    with django_assert_num_queries(0):
+        response = api_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == status.HTTP_304_NOT_MODIFIED
+    assert not response.content
+
+    response = api_client.get(url, HTTP_IF_MODIFIED_SINCE='Fri, 01 Jan 2100 00:00:00 GMT')
+    assert response.status_code == status.HTTP_200_OK  # only the ETag validates
+
+    api_client.post(url, {'title': 'New', 'amount': 5, 'type': 'Income'}, format='json')
+    response = api_client.get(url, HTTP_IF_NONE_MATCH=first['ETag'])
+    assert response.status_code == status.HTTP_200_OK
+    assert response['ETag'] != first['ETag']
+    assert len(response.data) == 2
+
+
+@pytest.mark.django_db
+def test_list_fast_path_matches_serializer(api_client, create_user, create_free_budget):
+    """
+    Test that the values()-based list fast path renders exactly what TransactionSerializer would.
+    Covers null notes/budget and a field projection.
+    """
+    from transactions.serializers import TransactionSerializer
+
+    user = create_user
+    Transaction.objects.create(user=user, title='A', amount=1, type='Income', notes='n', budget=create_free_budget)
+    Transaction.objects.create(user=user, title='B', amount=2, type='Expense')
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-list')
+    transactions = Transaction.objects.filter(user=user).order_by('date', 'id')
+
+    response = api_client.get(url)
+    assert response.content == api_client.get(url).content
+    assert response.json() == TransactionSerializer(transactions, many=True).data
+
+    response = api_client.get(url, {'fields': 'date,title'})
+    assert response.json() == TransactionSerializer(transactions, many=True, fields=('date', 'title')).data
+
+
+@pytest.mark.django_db
+def test_list_transactions_filters(api_client, create_user, create_free_budget):
+    """
+    Test the server-side list filters.
+    Ensures date range, type, budget, amount range and title prefix narrow the results,
+    combine with keyset pagination, and invalid ranges are rejected.
+    """
+    user = create_user
+    budget = create_free_budget
+    now = timezone.now()
+    old = now - timezone.timedelta(days=60)
+    Transaction.objects.create(user=user, title='Rent', amount=900, type='Expense', budget=budget, date=old)
+    Transaction.objects.create(user=user, title='Restaurant', amount=40, type='Expense', date=now)
+    Transaction.objects.create(user=user, title='Refund', amount=40, type='Income', budget=budget, date=now)
+    Transaction.objects.create(user=user, title='Salary', amount=3000, type='Income', date=now)
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-list')
+
+    def titles(**params):
+        response = api_client.get(url, params)
+        assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+        return [t['title'] for t in response.data]
+
+    today = timezone.localdate().isoformat()
+    assert titles(date_from=today, date_to=today) == ['Restaurant', 'Refund', 'Salary']
+    assert titles(date_to=(timezone.localdate() - timezone.timedelta(days=1)).isoformat()) == ['Rent']
+    assert titles(type='Income') == ['Refund', 'Salary']
+    assert titles(budget=budget.id) == ['Rent', 'Refund']
+    assert titles(min_amount=40, max_amount=900) == ['Rent', 'Restaurant', 'Refund']
+    assert titles(title='Re') == ['Rent', 'Restaurant', 'Refund']
+
+    response = api_client.get(url, {'title': 'Re', 'limit': 2})
+    assert [t['title'] for t in response.data] == ['Rent', 'Restaurant']
+    response = api_client.get(url, {'title': 'Re', 'limit': 2, 'cursor': response['X-Next-Cursor']})
+    assert [t['title'] for t in response.data] == ['Refund']
+
+    response = api_client.get(url, {'min_amount': 10, 'max_amount': 5})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    response = api_client.get(url, {'type': 'Gift'})
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_async_transaction_api_crud(api_client, create_user, create_regular_budget):
+    """
+    Test the async TransactionAPIView under /api/async/transactions/.
+    Ensures create debits the budget, list/retrieve read the new row, update/delete behave
+    like the sync endpoints, and a JSON body that isn't an object is rejected with 400.
+    """
+    user = create_user
+    budget = create_regular_budget  # total_amount=1000
+    api_client.force_authenticate(user=user)
+    url = reverse('async_transactions:transaction-list')
+
+    response = api_client.post(url, {'title': 'Rent', 'amount': 400, 'type': 'Expense', 'budget': budget.id}, format='json')
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+    budget.refresh_from_db()
+    assert budget.total_amount == 600
+    response = api_client.post(url, {'title': 'Big', 'amount': 700, 'type': 'Expense', 'budget': budget.id}, format='json')
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'amount' in response.data
+
+    response = api_client.get(url, {'type': 'Expense'})
+    assert response.status_code == status.HTTP_200_OK
+    assert [t['title'] for t in response.data] == ['Rent']
+    detail = reverse('async_transactions:transaction-detail', kwargs={'pk': response.data[0]['id']})
+    assert api_client.get(detail).data == response.data[0]
+
+    response = api_client.patch(detail, {'title': 'Rent (June)'}, format='json')
+    assert response.status_code == status.HTTP_200_OK
+    assert response.data['title'] == 'Rent (June)'
+    for body in ([{'budget': budget.id}], 'Rent'):
+        response = api_client.post(url, body, format='json')
+        print(f"Response data: {response.data}")
+        assert response.status_code == status.HTTP_400_BAD_REQUEST, "a non-object body is a 400, not a 500"
+        assert api_client.patch(detail, body, format='json').status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.delete(detail).status_code == status.HTTP_204_NO_CONTENT
+    assert api_client.get(detail).status_code == status.HTTP_404_NOT_FOUND
+
+
+@pytest.mark.django_db
+def test_materialize_recurring(create_user, create_regular_budget):
+    """
+    Test the materialize_recurring command.
+    Ensures missed occurrences are caught up (clipping day 31 to short months), expenses are debited
+    once per budget, a rule whose budget is short stays due, and re-running creates nothing.
+    """
+    from datetime import date
+    from django.core.management import call_command
+    from transactions.models import RecurringTransaction
+
+    user = create_user
+    budget = create_regular_budget  # total_amount=1000
+    trip = Budget.objects.create(user=user, title='trip', total_amount=50, start_date=date(2025, 1, 1))
+    rent = RecurringTransaction.objects.create(
+        user=user, title='Rent', amount=100, type='Expense', budget=budget,
+        frequency='monthly', start_date=date(2025, 1, 31),
+    )
+    RecurringTransaction.objects.create(
+        user=user, title='Gym', amount=50, type='Expense', budget=budget,
+        frequency='weekly', start_date=date(2025, 4, 1), count=2,
+    )
+    hotel = RecurringTransaction.objects.create(
+        user=user, title='Hotel', amount=80, type='Expense', budget=trip,
+        frequency='daily', start_date=date(2025, 4, 15),
+    )
+    assert rent.next_occurrence == date(2025, 1, 31)
+
+    call_command('materialize_recurring', '--date', '2025-04-15', '--batch-size', '2')
+    occurrences = Transaction.objects.filter(recurring=rent).order_by('date')
+    assert [t.occurrence_date for t in occurrences] == [date(2025, 1, 31), date(2025, 2, 28), date(2025, 3, 31)]
+    assert Transaction.objects.filter(title='Gym').count() == 2
+    assert not Transaction.objects.filter(title='Hotel').exists()
+    budget.refresh_from_db()
+    assert budget.total_amount == 1000 - 300 - 100
+    rent.refresh_from_db()
+    hotel.refresh_from_db()
+    assert (rent.materialized_count, rent.next_occurrence) == (3, date(2025, 4, 30))
+    assert hotel.next_occurrence == date(2025, 4, 15)
+
+    call_command('materialize_recurring', '--date', '2025-04-15')
+    assert Transaction.objects.filter(recurring__isnull=False).count() == 5
+    budget.refresh_from_db()
+    assert budget.total_amount == 600
+
+
+@pytest.mark.django_db
+def test_materialize_recurring_running_balance(create_user, create_regular_budget):
+    """
+    Test the budget checks of materialize_due.
+    Ensures rules debit their budget one by one in id order, only the rules the running balance
+    can't cover stay due, and a rule pointing at another user's budget is never booked against it.
+    """
+    from datetime import date
+    from transactions.models import RecurringTransaction
+    from transactions.services import materialize_due
+
+    user = create_user
+    budget = create_regular_budget  # total_amount=1000
+    rules = [
+        RecurringTransaction.objects.create(
+            user=user, title=title, amount=amount, type='Expense', budget=budget,
+            frequency='monthly', start_date=date(2025, 4, 1),
+        )
+        for title, amount in (('Rent', 700), ('Car', 400), ('Phone', 300))
+    ]
+    other = User.objects.create_user(username='other', email='other@example.com', password='ComplexPass123!@#')
+    foreign = RecurringTransaction.objects.create(
+        user=other, title='Sneaky', amount=10, type='Expense', budget=budget,
+        frequency='monthly', start_date=date(2025, 4, 1),
+    )
+
+    created, skipped = materialize_due(date(2025, 4, 15))
+    assert created == 2
+    assert skipped == [rules[1].pk, foreign.pk]
+    assert sorted(Transaction.objects.values_list('title', flat=True)) == ['Phone', 'Rent']
+    budget.refresh_from_db()
+    assert budget.total_amount == 0
+
+
+@pytest.mark.django_db
+def test_request_metrics(api_client, create_user, create_regular_budget, settings):
+    """
+    Test the metrics middleware and the /metrics endpoint.
+    Ensures responses carry X-Query-Count when enabled, and the per-action series of every
+    worker that published to the shared cache are exported, labelled by worker.
+    """
+    import copy
+    from Finance_Management.cache import get_cache
+    from Finance_Management.metrics import WORKERS_KEY, registry, worker_id
+
+    registry.clear()
+    settings.METRICS_QUERY_COUNT_HEADER = True
+    settings.METRICS_TOKEN = 'scrape'
+    user = create_user
+    budget = create_regular_budget
+    api_client.force_authenticate(user=user)
+    response = api_client.post(
+        reverse('transactions:transaction-list'),
+        {'title': 'Rent', 'amount': 100, 'type': 'Expense', 'budget': budget.id},
+        format='json'
+    )
+    assert response.status_code == status.HTTP_201_CREATED
+    assert int(response['X-Query-Count']) > 0
+
+    assert api_client.get('/metrics').status_code == status.HTTP_401_UNAUTHORIZED
+    response = api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape')
+    body = response.content.decode()
+    print(f"Response data: {body}")
+    labels = f'view="TransactionAPIView",action="create",method="POST",status="201",worker="{worker_id()}"'
+    assert f'http_request_duration_seconds_count{{{labels}}} 1' in body
+    assert f'http_request_db_queries_bucket{{{labels},le="+Inf"}} 1' in body
+    assert f'http_request_serialize_seconds_total{{{labels}}}' in body
+
+    # Another worker's published snapshot is served too, under its own label.
+    cache = get_cache()
+    cache.set('metrics:worker:other:1', copy.deepcopy(registry.snapshot()), timeout=60)
+    cache.set(WORKERS_KEY, [*cache.get(WORKERS_KEY), 'other:1'], timeout=None)
+    body = api_client.get('/metrics', HTTP_AUTHORIZATION='Bearer scrape').content.decode()
+    assert f'http_request_duration_seconds_count{{{labels}}} 1' in body
+    assert labels.replace(worker_id(), 'other:1') in body
+
+
+@pytest.mark.django_db
+def test_seed_finance():
+    """
+    Test the seed_finance command.
+    Ensures the requested volume is created, budgets stay consistent with their expenses
+    and the monthly rollups cover every seeded transaction.
+    """
+    from django.core.management import call_command
+    from django.db.models import Sum
+    from transactions.models import MonthlySummary
+
+    call_command('seed_finance', '--users', '5', '--transactions', '500', '--budgets', '2', '--seed', '7')
+    users = User.objects.filter(username__startswith='seed')
+    assert users.count() == 5
+    assert Transaction.objects.filter(user__in=users).count() == 500
+    assert MonthlySummary.objects.filter(user__in=users).aggregate(n=Sum('count'))['n'] == 500
+    for budget in Budget.objects.filter(user__in=users).exclude(title='free'):
+        spent = Transaction.objects.filter(budget=budget, type='Expense').aggregate(total=Sum('amount', default=0))['total']
+        assert budget.allocated_amount - budget.total_amount == spent
+    assert Budget.objects.filter(user__in=users, title='free').count() == 5
+
+
+@pytest.mark.django_db
+def test_search_transactions(api_client, create_user, create_free_budget):
+    """
+    Test the full-text search endpoint.
+    Ensures title and notes are matched, title hits rank first, filters apply, pages follow
+    the cursor and edits are reflected in the index.
+    """
+    user = create_user
+    budget = create_free_budget
+    now = timezone.now()
+    coffee = Transaction.objects.create(user=user, title='Coffee beans', amount=12, type='Expense', budget=budget, date=now)
+    Transaction.objects.create(user=user, title='Groceries', amount=60, type='Expense', notes='milk and coffee', date=now)
+    Transaction.objects.create(user=user, title='Coffee machine', amount=300, type='Expense', date=now)
+    Transaction.objects.create(user=user, title='Rent', amount=900, type='Expense', date=now)
+    other = User.objects.create_user(username='other', email='other@example.com', password='ComplexPass123!@#')
+    Transaction.objects.create(user=other, title='Coffee', amount=3, type='Expense', date=now)
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-search')
+
+    response = api_client.get(url, {'q': 'coffee'})
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    titles = [t['title'] for t in response.data]
+    assert sorted(titles[:2]) == ['Coffee beans', 'Coffee machine'] and titles[2] == 'Groceries'
+    assert response.data[0]['rank'] >= response.data[2]['rank']
+
+    response = api_client.get(url, {'q': 'coffee', 'limit': 2})
+    assert len(response.data) == 2
+    response = api_client.get(url, {'q': 'coffee', 'limit': 2, 'cursor': response['X-Next-Cursor']})
+    assert [t['title'] for t in response.data] == ['Groceries']
+    response = api_client.get(url, {'q': 'coffee', 'budget': budget.id})
+    assert [t['id'] for t in response.data] == [coffee.id]
+
+    coffee.title = 'Tea leaves'
+    coffee.save()
+    response = api_client.get(url, {'q': 'tea'})
+    assert [t['id'] for t in response.data] == [coffee.id]
+    assert api_client.get(url, {'q': 'x'}).status_code == status.HTTP_400_BAD_REQUEST
+
+
+@pytest.mark.django_db
+def test_search_transactions_postgres_sql():
+    """
+    Test the PostgreSQL search query.
+    Compiles it for a PostgreSQL connection (no server needed), so the tsvector and trigram
+    expressions, and the tsvector-only query used without pg_trgm, are checked whatever
+    database the suite runs on.
+    """
+    from django.db import connections
+    from django.db.backends.postgresql.base import DatabaseWrapper
+    from transactions.search import _search_postgres
+
+    postgresql = DatabaseWrapper({**connections['default'].settings_dict, 'ENGINE': 'django.db.backends.postgresql'})
+    queryset = _search_postgres(Transaction.objects.filter(user_id=1), 'coffee shop')
+    sql, params = queryset.query.get_compiler(connection=postgresql).as_sql()
+    print(f"SQL: {sql} {params}")
+    assert '("transactions_transaction"."search_vector") @@ (websearch_to_tsquery(' in sql
+    assert 'SIMILARITY("transactions_transaction"."title"' in sql
+    assert params.count('coffee shop') == 4
+
+    queryset = _search_postgres(Transaction.objects.filter(user_id=1), 'coffee shop', trigram=False)
+    sql, params = queryset.query.get_compiler(connection=postgresql).as_sql()
+    assert 'websearch_to_tsquery(' in sql and 'SIMILARITY' not in sql and '%%' not in sql
+
+
+@pytest.mark.django_db
+def test_balance_ledger(api_client, create_user, create_regular_budget):
+    """
+    Test the append-only balance ledger.
+    Ensures writes append entries, back-dated entries keep snapshots exact, balances can be
+    read at any moment, and verify_ledger agrees with the transactions and budgets.
+    """
+    from datetime import timedelta
+    from django.core.management import call_command
+    from django.core.management.base import CommandError
+    from transactions.ledger import balance, month_start
+    from transactions.models import LedgerEntry, LedgerSnapshot
+    from transactions.services import record_created
+
+    user = create_user
+    budget = create_regular_budget
+    api_client.force_authenticate(user=user)
+    now = timezone.now()
+    assert balance(user.id, budget.id) == 1000
+
+    response = api_client.post(
+        reverse('transactions:transaction-list'),
+        {'title': 'Groceries', 'amount': 200, 'type': 'Expense', 'budget': budget.id},
+        format='json',
+    )
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+    assert (balance(user.id), balance(user.id, budget.id)) == (-200, 800)
+
+    salary_date = month_start(now) - timedelta(days=70)
+    salary = Transaction.objects.create(user=user, title='Salary', amount=500, type='Income', date=salary_date)
+    record_created([salary])
+    call_command('snapshot_ledger')
+    assert LedgerSnapshot.objects.filter(user=user, budget__isnull=True, cutoff=month_start(now)).get().balance == 500
+
+    refund_date = month_start(now) - timedelta(days=10)
+    refund = Transaction.objects.create(user=user, title='Refund', amount=50, type='Income', date=refund_date)
+    record_created([refund])
+    assert LedgerSnapshot.objects.filter(user=user, budget__isnull=True, cutoff=month_start(now)).get().balance == 550
+    assert balance(user.id) == 350
+    assert balance(user.id, at=salary_date - timedelta(seconds=1)) == 0
+    assert balance(user.id, at=refund_date - timedelta(seconds=1)) == 500
+
+    url = reverse('transactions:transaction-detail', args=[response.data['id']])
+    assert api_client.patch(url, {'amount': 300}, format='json').status_code == status.HTTP_200_OK
+    assert (balance(user.id), balance(user.id, budget.id)) == (250, 700)
+    budget.refresh_from_db()
+    budget.allocated_amount += 500
+    budget.total_amount += 500
+    budget.save()
+    assert balance(user.id, budget.id) == 1200
+    assert api_client.delete(url).status_code == status.HTTP_204_NO_CONTENT
+    assert (balance(user.id), balance(user.id, budget.id)) == (550, 1500)
+
+    response = api_client.get(reverse('transactions:transaction-balance'), {'budget': budget.id})
+    print(f"Response data: {response.data}")
+    assert response.data['balance'] == 1500
+    call_command('verify_ledger', '--snapshots')
+
+    with pytest.raises(TypeError):
+        LedgerEntry.objects.filter(user=user).update(amount=0)
+    LedgerEntry.objects.create(user=user, kind='update', amount=1, date=now)
+    with pytest.raises(CommandError):
+        call_command('verify_ledger')
+
+
+@pytest.mark.django_db
+def test_update_and_delete_recredit_budget(api_client, create_user, create_regular_budget, create_free_budget):
+    """
+    Test that updates and deletes give back (or take) exactly the funds that changed.
+    Ensures amount, type and budget changes and deletes adjust total_amount, and that an
+    update the budget cannot cover is rejected without changing anything.
+    """
+    user = create_user
+    budget = create_regular_budget
+    other = Budget.objects.create(user=user, title='travel', total_amount=100, start_date=timezone.now().date())
+    api_client.force_authenticate(user=user)
+    response = api_client.post(
+        reverse('transactions:transaction-list'),
+        {'title': 'Hotel', 'amount': 400, 'type': 'Expense', 'budget': budget.id},
+        format='json',
+    )
+    transaction_id = response.data['id']
+    url = reverse('transactions:transaction-detail', kwargs={'pk': transaction_id})
+
+    def funds():
+        return list(Budget.objects.filter(pk__in=[budget.pk, other.pk]).order_by('pk').values_list('total_amount', flat=True))
+
+    assert funds() == [600, 100]
+    response = api_client.patch(url, {'amount': 1000}, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    assert funds() == [0, 100]
+    response = api_client.patch(url, {'amount': 1001}, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert funds() == [0, 100] and Transaction.objects.get(pk=transaction_id).amount == 1000
+    assert api_client.patch(url, {'budget': other.id}, format='json').status_code == status.HTTP_400_BAD_REQUEST
+    assert api_client.patch(url, {'budget': other.id, 'amount': 60}, format='json').status_code == status.HTTP_200_OK
+    assert funds() == [1000, 40]
+    response = api_client.patch(url, {'budget': create_free_budget.id, 'type': 'Income'}, format='json')
+    assert response.status_code == status.HTTP_200_OK, f"Error: {response.data}"
+    assert funds() == [1000, 100]
+    assert api_client.patch(url, {'budget': budget.id, 'type': 'Expense', 'amount': 250}, format='json').status_code == status.HTTP_200_OK
+    assert funds() == [750, 100]
+    assert api_client.delete(url).status_code == status.HTTP_204_NO_CONTENT
+    assert funds() == [1000, 100]
+
+
+@pytest.mark.django_db
+def test_partial_update_type_keeps_budget_rules(api_client, create_user, create_regular_budget):
+    """
+    Test a partial update that changes only the type.
+    Ensures an expense on a non-free budget cannot become Income when the budget is not resent.
+    """
+    user = create_user
+    budget = create_regular_budget
+    api_client.force_authenticate(user=user)
+    response = api_client.post(
+        reverse('transactions:transaction-list'),
+        {'title': 'Groceries', 'amount': 100, 'type': 'Expense', 'budget': budget.id},
+        format='json',
+    )
+    transaction_id = response.data['id']
+    url = reverse('transactions:transaction-detail', kwargs={'pk': transaction_id})
+    response = api_client.patch(url, {'type': 'Income'}, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST
+    assert 'You cannot add Income to non-free budgets' in str(response.data)
+    assert Transaction.objects.get(pk=transaction_id).type == 'Expense'
+    budget.refresh_from_db()
+    assert budget.total_amount == 900
+
+
+@pytest.mark.django_db
+def test_admin_add_transaction_debits_budget(admin_client, create_user, create_regular_budget, monkeypatch):
+    """
+    Test adding transactions through the admin.
+    Ensures an expense debits its budget, one the budget cannot cover is a form error, and a
+    debit that fails after validation is reported on the page instead of a server error.
+    """
+    from transactions.admin import TransactionAdminForm
+
+    budget = create_regular_budget
+    url = reverse('admin:transactions_transaction_add')
+
+    def add(amount):
+        data = {'user': create_user.id, 'title': 'Desk', 'amount': amount, 'type': 'Expense', 'budget': budget.id}
+        return admin_client.post(url, data)
+
+    response = add(400)
+    assert response.status_code == 302 and response.url != url
+    budget.refresh_from_db()
+    assert budget.total_amount == 600
+    response = add(601)
+    assert response.status_code == 200
+    assert response.context['adminform'].form.errors['amount'] == ["You can't expense more than this budget, available: 600"]
+    monkeypatch.setattr(TransactionAdminForm, 'clean', lambda form: form.cleaned_data)
+    response = add(601)
+    assert response.status_code == 302 and response.url == url
+    budget.refresh_from_db()
+    assert budget.total_amount == 600
+    assert Transaction.objects.filter(user=create_user).count() == 1
+
+
+@pytest.mark.django_db
+def test_import_statement(api_client, create_user, settings, tmp_path, monkeypatch):
+    """
+    Test the bank statement import.
+    Ensures CSV and OFX rows become transactions, bad rows are reported, re-importing a
+    statement creates nothing, and an interrupted import resumes after its last chunk.
+    """
+    from datetime import datetime, timezone as dt_timezone
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.core.management import call_command
+    from transactions import imports
+    from transactions.models import StatementImport
+
+    settings.MEDIA_ROOT = tmp_path
+    user = create_user
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-import')
+    statement = (
+        "Date,Description,Amount,Memo\n"
+        "2024-01-05,Coffee,-3.50,card\n"
+        "2024-01-05,Coffee,-3.50,card\n"
+        "2024-01-06,Salary,\"2,500.00\",\n"
+        "2024-01-07,Broken,abc,\n"
+        "not a date,Rent,-900,\n"
+    ).encode()
+
+    response = api_client.post(url, {'file': SimpleUploadedFile('jan.csv', statement)}, format='multipart')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+    assert (response.data['rows_read'], response.data['created_count'], response.data['error_count']) == (5, 3, 2)
+    assert [e['row'] for e in response.data['errors']] == [4, 5]
+    rows = Transaction.objects.filter(user=user).order_by('id')
+    assert [(t.title, t.amount, t.type) for t in rows] == [
+        ('Coffee', 4, 'Expense'), ('Coffee', 4, 'Expense'), ('Salary', 2500, 'Income')
+    ]
+
+    response = api_client.post(url, {'file': SimpleUploadedFile('jan.csv', statement)}, format='multipart')
+    assert (response.data['created_count'], response.data['duplicate_count']) == (0, 3)
+    response = api_client.post(
+        url, {'file': SimpleUploadedFile('x.txt', statement), 'format': 'csv', 'amount_column': 'Total'}, format='multipart'
+    )
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_400_BAD_REQUEST and response.data['message'] == "amount_column: No column named 'Total' in the header"
+
+    ofx = (
+        "OFXHEADER:100\nDATA:OFXSGML\n\n<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><BANKTRANLIST>"
+        "<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20240110120000[-5:EST]<TRNAMT>-42.10<FITID>A1<NAME>Books<MEMO>Shop"
+        "</STMTTRN><STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20240111<TRNAMT>10<FITID>A2<NAME>Refund</STMTTRN>"
+        "</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>"
+    ).encode()
+    response = api_client.post(url, {'file': SimpleUploadedFile('jan.ofx', ofx)}, format='multipart')
+    assert response.data['created_count'] == 2, f"Error: {response.data}"
+    books = Transaction.objects.get(user=user, title='Books')
+    assert (books.amount, books.type, books.notes) == (42, 'Expense', 'Shop')
+    assert books.date == datetime(2024, 1, 10, 17, tzinfo=dt_timezone.utc)
+
+    lines = ''.join(f"2024-02-{day % 28 + 1:02d},Item {day},-{day + 1}\n" for day in range(10))
+    interrupted = StatementImport.objects.create(
+        user=user, format='csv', file=SimpleUploadedFile('feb.csv', f"date,title,amount\n{lines}".encode())
+    )
+    write_chunk = imports._write_chunk
+
+    def crash_after_first_chunk(statement_import, *args):
+        if statement_import.rows_read:
+            raise KeyboardInterrupt
+        write_chunk(statement_import, *args)
+        statement_import.rows_read = 4
+
+    monkeypatch.setattr(imports, '_write_chunk', crash_after_first_chunk)
+    with pytest.raises(KeyboardInterrupt):
+        imports.run_import(interrupted, chunk_size=4)
+    monkeypatch.setattr(imports, '_write_chunk', write_chunk)
+    interrupted.refresh_from_db()
+    assert (interrupted.status, interrupted.rows_read, interrupted.created_count) == ('failed', 4, 4)
+    response = api_client.post(url, {'resume': interrupted.pk}, format='json')
+    assert (response.data['rows_read'], response.data['created_count']) == (10, 10), f"Error: {response.data}"
+    assert Transaction.objects.filter(user=user, title__startswith='Item').count() == 10
+
+    path = tmp_path / 'mar.csv'
+    path.write_text("Booked;Payee;Out;In\n03/03/2024;Gym;30;\n04/03/2024;Gift;;25\n")
+    call_command(
+        'import_statement', str(path), user=user.username, delimiter=';', date_format='%d/%m/%Y',
+        date_column='Booked', debit_column='Out', credit_column='In',
+    )
+    assert Transaction.objects.filter(user=user, title__in=['Gym', 'Gift']).count() == 2
+    call_command('verify_ledger')
+
+
+@pytest.mark.django_db
+def test_import_statement_rejects_malformed_amounts(api_client, create_user, settings, tmp_path):
+    """
+    Test amount parsing of statement imports.
+    Ensures exponents, letters and separators that don't match the import's thousands separator
+    land in the errors instead of being imported as a different number.
+    """
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from transactions.imports import parse_amount
+
+    assert parse_amount(' $1,234.56 ', 100) == 123456
+    assert parse_amount('(€12)') == -12 and parse_amount('7.50-') == -8
+    assert parse_amount('1.234,56', thousands='.') == 1235
+    assert parse_amount('1 234', thousands=' ') == 1234
+    for text in ('1e30', '1.234,56', '12abc34', '12,34', '1,2345.6', '--5', '.'):
+        with pytest.raises(ValueError):
+            parse_amount(text)
+
+    settings.MEDIA_ROOT = tmp_path
+    user = create_user
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-import')
+    statement = (
+        "date,title,amount\n"
+        "2024-04-01,Huge,1e30\n"
+        "2024-04-02,European,\"1.234,56\"\n"
+        "2024-04-03,Garbled,12abc34\n"
+        "2024-04-04,Rent,\"-1,200.00\"\n"
+    ).encode()
+    response = api_client.post(url, {'file': SimpleUploadedFile('apr.csv', statement)}, format='multipart')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+    assert [e['row'] for e in response.data['errors']] == [1, 2, 3]
+    assert "Invalid amount '1e30'" in response.data['errors'][0]['error']
+    assert list(Transaction.objects.filter(user=user).values_list('title', 'amount')) == [('Rent', 1200)]
+
+    statement = b'date,title,amount\n2024-04-05,Miete,"-1.234,56"\n'
+    response = api_client.post(
+        url, {'file': SimpleUploadedFile('apr-de.csv', statement), 'thousands_separator': '.'}, format='multipart'
+    )
+    assert response.data['created_count'] == 1, f"Error: {response.data}"
+    assert Transaction.objects.get(user=user, title='Miete').amount == 1235
+
+
+@pytest.mark.django_db
+def test_import_statement_concurrent_duplicates(create_user, settings, tmp_path, monkeypatch):
+    """
+    Test imports racing another import of the same rows.
+    Ensures rows committed by the other import after the fingerprint SELECT count as duplicates,
+    and a chunk that hits the unique index anyway is retried instead of failing the import.
+    """
+    from django.core.files.uploadedfile import SimpleUploadedFile
+    from django.db import IntegrityError
+    from transactions import imports
+    from transactions.models import StatementImport
+
+    settings.MEDIA_ROOT = tmp_path
+    user = create_user
+    statement = b"date,title,amount\n2024-03-01,Lunch,-12\n2024-03-02,Taxi,-30\n2024-03-03,Books,-8\n"
+    insert_rows = imports.insert_rows
+
+    def committed_meanwhile(model, fields, rows, **kwargs):
+        _, title, amount, type_, date, notes, key = rows[0]
+        Transaction.objects.create(user=user, title=title, amount=amount, type=type_, date=date, fingerprint=key)
+        return insert_rows(model, fields, rows, **kwargs)
+
+    monkeypatch.setattr(imports, 'insert_rows', committed_meanwhile)
+    first = StatementImport.objects.create(user=user, format='csv', file=SimpleUploadedFile('mar.csv', statement))
+    first = imports.run_import(first)
+    assert (first.status, first.created_count, first.duplicate_count) == ('done', 2, 1)
+
+    calls = []
+
+    def conflicts_once(*args, **kwargs):
+        calls.append(1)
+        if len(calls) == 1:
+            raise IntegrityError("duplicate key value violates unique constraint")
+        return insert_rows(*args, **kwargs)
+
+    monkeypatch.setattr(imports, 'insert_rows', conflicts_once)
+    statement += b"2024-03-04,Cinema,-15\n"
+    second = StatementImport.objects.create(user=user, format='csv', file=SimpleUploadedFile('mar2.csv', statement))
+    second = imports.run_import(second)
+    assert (second.status, second.created_count, second.duplicate_count) == ('done', 1, 3)
+    assert len(calls) == 2
+    assert Transaction.objects.filter(user=user).count() == 4
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason="SET CONSTRAINTS needs PostgreSQL")
+def test_partitioning_keeps_constraint_modes():
+    """
+    Test the constraint checks run before partitions are altered.
+    Ensures INITIALLY DEFERRED constraints are deferred again afterwards, while deferrable
+    INITIALLY IMMEDIATE ones are left checking every statement.
+    """
+    from django.db import IntegrityError, transaction as db_transaction
+    from transactions.partitioning import _checks_now
+
+    with connection.cursor() as cursor:
+        cursor.execute('CREATE TEMPORARY TABLE parent (id int PRIMARY KEY)')
+        cursor.execute(
+            'CREATE TEMPORARY TABLE child (later int REFERENCES parent DEFERRABLE INITIALLY DEFERRED, '
+            'now int REFERENCES parent DEFERRABLE INITIALLY IMMEDIATE)'
+        )
+        with _checks_now(cursor):
+            pass
+        with pytest.raises(IntegrityError), db_transaction.atomic():
+            cursor.execute('INSERT INTO child (now) VALUES (1)')
+        sid = connection.savepoint()
+        cursor.execute('INSERT INTO child (later) VALUES (1)')  # only checked at commit
+        connection.savepoint_rollback(sid)
+
+
+@pytest.mark.django_db
+@pytest.mark.skipif(connection.vendor != 'postgresql', reason="Table partitioning needs PostgreSQL")
+def test_partition_transactions(api_client, create_user, create_free_budget, settings):
+    """
+    Test date partitioning of the transactions table.
+    Ensures converting keeps rows and ids, date-filtered lists only scan the partitions in
+    range, the unique constraints still hold across partitions, new partitions take their
+    rows out of the default one, old partitions detach, and the table converts back.
+    """
+    import re
+    from django.core.management import call_command
+    from django.db import IntegrityError, transaction as db_transaction
+    from transactions.models import RecurringTransaction
+    from transactions.partitioning import default_partition_name, keys_table_name, layout
+
+    user = create_user
+    api_client.force_authenticate(user=user)
+    url = reverse('transactions:transaction-list')
+    settings.TRANSACTION_PARTITIONING = ''
+    call_command('partition_transactions', convert=True)  # start from one plain table
+    now = timezone.now()
+    for title, days in [('Old', -400), ('Recent', -40)]:
+        Transaction.objects.create(user=user, title=title, amount=10, type='Income', date=now + timezone.timedelta(days=days))
+    ids = set(Transaction.objects.values_list('id', flat=True))
+
+    settings.TRANSACTION_PARTITIONING = 'month'
+    call_command('partition_transactions', convert=True, ahead=1)
+    assert layout(connection, Transaction) == 'month'
+    assert set(Transaction.objects.values_list('id', flat=True)) == ids
+    response = api_client.post(url, {'title': 'Today', 'amount': 5, 'type': 'Income'}, format='json')
+    print(f"Response data: {response.data}")
+    assert response.status_code == status.HTTP_201_CREATED, f"Error: {response.data}"
+    assert response.data['id'] > max(ids)
+
+    today = timezone.localdate().isoformat()
+    response = api_client.get(url, {'date_from': today, 'date_to': today})
+    assert [t['title'] for t in response.data] == ['Today']
+    plan = Transaction.objects.filter(user=user, date__gte=now - timezone.timedelta(days=1), date__lte=now).explain()
+    assert len(set(re.findall(rf'{Transaction._meta.db_table}_(y\d+m\d+|default)\b', plan))) <= 2, plan
+
+    rule = RecurringTransaction.objects.create(
+        user=user, title='Rent', amount=10, type='Income', frequency='monthly', start_date=now.date(),
+    )
+    keyed = Transaction.objects.create(
+        user=user, title='Imported', amount=10, type='Income', date=now - timezone.timedelta(days=400),
+        fingerprint='f' * 32, recurring=rule, occurrence_date=now.date(),
+    )
+    for duplicate in [{'fingerprint': 'f' * 32}, {'recurring': rule, 'occurrence_date': now.date()}]:
+        with pytest.raises(IntegrityError), db_transaction.atomic():
+            Transaction.objects.create(user=user, title='Again', amount=10, type='Income', date=now, **duplicate)
+    Transaction.objects.filter(pk=keyed.pk).update(date=now - timezone.timedelta(days=40))  # moves partition
+    with pytest.raises(IntegrityError), db_transaction.atomic():
+        Transaction.objects.create(user=user, title='Again', amount=10, type='Income', date=now, fingerprint='f' * 32)
+    Transaction.objects.filter(pk=keyed.pk).update(fingerprint=None, recurring=None, occurrence_date=None)
+    keyed.delete()
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT count(*) FROM "{keys_table_name(Transaction._meta.db_table)}"')
+        assert cursor.fetchone() == (0,)
+
+    Transaction.objects.create(user=user, title='Planned', amount=10, type='Income', date=now + timezone.timedelta(days=800), fingerprint='p' * 32)
+    table = default_partition_name(Transaction._meta.db_table)
+    with connection.cursor() as cursor:
+        cursor.execute(f'SELECT title FROM "{table}"')
+        assert cursor.fetchall() == [('Planned',)]
+        call_command('partition_transactions', ahead=28)
+        cursor.execute(f'SELECT count(*) FROM "{table}"')
+        assert cursor.fetchone() == (0,)
+    assert Transaction.objects.filter(title='Planned').exists()
+
+    call_command('partition_transactions', detach_before=(now - timezone.timedelta(days=100)).date())
+    assert not Transaction.objects.filter(title='Old').exists()
+    response = api_client.get(url)
+    assert [t['title'] for t in response.data] == ['Recent', 'Today', 'Planned']
+
+    with pytest.raises(IntegrityError), db_transaction.atomic():
+        Transaction.objects.create(user=user, title='Again', amount=10, type='Income', date=now, fingerprint='p' * 32)
+
+    settings.TRANSACTION_PARTITIONING = ''
+    call_command('partition_transactions', convert=True)
+    assert layout(connection, Transaction) is None
+    assert Transaction.objects.count() == 3
+    with connection.cursor() as cursor:
+        cursor.execute("SELECT to_regclass(%s)", [keys_table_name(Transaction._meta.db_table)])
+        assert cursor.fetchone() == (None,)
+    with pytest.raises(IntegrityError), db_transaction.atomic():
+        Transaction.objects.create(user=user, title='Again', amount=10, type='Income', date=now, fingerprint='p' * 32)
@@ -6,12 +6,31 @@ Requires authentication for all actions, ensuring users can only access their ow
 """
 
 from rest_framework import viewsets, status
+from rest_framework.decorators import action
+from rest_framework.exceptions import ValidationError
+from rest_framework.parsers import JSONParser, MultiPartParser
 from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
-from rest_framework_simplejwt.authentication import JWTAuthentication
+from accounts.authentication import ClaimsJWTAuthentication
+from django.db.models import F, Q, Sum
+from django.http import StreamingHttpResponse
 from django.shortcuts import get_object_or_404
-from .models import Transaction
-from .serializers import TransactionSerializer
+from Finance_Management.cache import cached_response
+from Finance_Management.pagination import KeysetPagination
+from jobs.queue import enqueue
+from jobs.serializers import JobSerializer
+from .export import EXPORT_FORMATS
+from .imports import run_import
+from .ledger import balance
+from .models import MonthlySummary, StatementImport, Transaction
+from .parsers import NDJSONParser
+from .rows import compile_formatter
+from .search import search_transactions
+from .serializers import (
+    BalanceQuerySerializer, MonthFilterSerializer, StatementImportSerializer, StatementUploadSerializer,
+    TransactionFilterSerializer, TransactionSearchSerializer, TransactionSerializer,
+)
+from .services import bulk_create_transactions, delete_transaction
 
 
 class TransactionAPIView(viewsets.ViewSet):
@@ -21,30 +40,181 @@ class TransactionAPIView(viewsets.ViewSet):
     All actions require JWT authentication and are restricted to the authenticated user's data.
     """
     permission_classes = [IsAuthenticated]
-    authentication_classes = [JWTAuthentication]
+    authentication_classes = [ClaimsJWTAuthentication]
     queryset = Transaction.objects.all()
     serializer_class = TransactionSerializer
+    ordering = ('date', 'id')
+    bulk_max_items = 10000
 
+    def get_filtered_queryset(self, request):
+        """The authenticated user's transactions, narrowed by the validated query-param filters."""
+        params = TransactionFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        return self.queryset.filter(user=request.user, **params.get_filters())
+
+    @cached_response
     def list(self, request):
         """
-        List all transactions for the authenticated user.
-        Returns serialized transaction data.
+        List transactions for the authenticated user, one keyset page at a time.
+        Supports `?cursor=`, `?limit=`, `?fields=` projection and the filters of TransactionFilterSerializer.
+        Rows are read with values() and formatted by the read-only fast path in rows.py.
         """
-        transactions = self.queryset.filter(user=request.user)
-        serializer = self.serializer_class(transactions, many=True)
-        return Response(serializer.data, status=status.HTTP_200_OK)
+        fields = self.serializer_class.get_requested_fields(request)
+        columns, format_row = compile_formatter(fields)
+        transactions = self.get_filtered_queryset(request).values(*dict.fromkeys(columns + self.ordering))
+        paginator = KeysetPagination(ordering=self.ordering)
+        page = paginator.paginate_queryset(transactions, request, view=self)
+        return paginator.get_paginated_response([format_row(row) for row in page])
+
+    @action(detail=False, methods=['get'])
+    @cached_response
+    def search(self, request):
+        """
+        Full-text search over title and notes (`?q=`), best matches first, with a float `rank`.
+        Takes the list filters, `?fields=` and `?limit=`; pages follow `X-Next-Cursor` like list.
+        """
+        params = TransactionSearchSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        fields = self.serializer_class.get_requested_fields(request)
+        columns, format_row = compile_formatter(fields)
+        ordering = ('-rank', '-id')
+        transactions = search_transactions(self.get_filtered_queryset(request), params.validated_data['q'])
+        paginator = KeysetPagination(ordering=ordering)
+        page = paginator.paginate_queryset(transactions.values(*dict.fromkeys(columns + ('id', 'rank'))), request, view=self)
+        return paginator.get_paginated_response([{**format_row(row), 'rank': row['rank']} for row in page])
+
+    @action(detail=False, methods=['get'])
+    def export(self, request):
+        """
+        Stream the authenticated user's full transaction history.
+        `?output=ndjson` (default) or `?output=csv`; rows are read in chunks, never materialized.
+        Accepts the same filters as list. With `?background=1` the file is written by a job
+        instead (202 with the job; fetch it from /api/jobs/<id>/download/ once done).
+        """
+        output = request.query_params.get('output', 'ndjson')
+        if output not in EXPORT_FORMATS:
+            raise ValidationError({'output': f"Must be one of {sorted(EXPORT_FORMATS)}"})
+        if request.query_params.get('background') in ('1', 'true'):
+            filters = {key: value for key, value in request.query_params.items() if key not in ('output', 'background')}
+            TransactionFilterSerializer(data=filters).is_valid(raise_exception=True)
+            job = enqueue('transactions.export', {'output': output, 'filters': filters}, user=request.user)
+            return Response(JobSerializer(job).data, status=status.HTTP_202_ACCEPTED)
+        stream, content_type, extension = EXPORT_FORMATS[output]
+        transactions = self.get_filtered_queryset(request).order_by(*self.ordering)
+        response = StreamingHttpResponse(stream(transactions), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="transactions.{extension}"'
+        return response
+
+    @action(detail=False, methods=['get'])
+    @cached_response
+    def summary(self, request):
+        """
+        Income, expense and net totals per month, read only from the MonthlySummary rollups.
+        `?group_by=budget` splits each month per budget; `?start=`/`?end=` (YYYY-MM) bound the months.
+        """
+        params = MonthFilterSerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        summaries = MonthlySummary.objects.filter(user=request.user)
+        if params.validated_data.get('start'):
+            summaries = summaries.filter(year_month__gte=params.validated_data['start'])
+        if params.validated_data.get('end'):
+            summaries = summaries.filter(year_month__lte=params.validated_data['end'])
+
+        keys = ['year_month', 'budget'] if params.validated_data['group_by'] == 'budget' else ['year_month']
+        rows = (
+            summaries.values(*keys)
+            .annotate(
+                income=Sum('total', filter=Q(type='Income'), default=0),
+                expense=Sum('total', filter=Q(type='Expense'), default=0),
+                count=Sum('count'),
+            )
+            .annotate(net=F('income') - F('expense'))
+            .order_by(*keys)
+        )
+        data = []
+        for row in rows:
+            row['month'] = row.pop('year_month').strftime('%Y-%m')
+            data.append(row)
+        return Response(data, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['get'])
+    def balance(self, request):
+        """
+        Ledger balance of the user's account, or of one of their budgets with `?budget=`,
+        now or at `?at=` (ISO datetime). Reads one snapshot plus at most about a month of entries.
+        """
+        params = BalanceQuerySerializer(data=request.query_params)
+        params.is_valid(raise_exception=True)
+        budget_id, at = params.validated_data.get('budget'), params.validated_data.get('at')
+        amount = balance(request.user.id, budget_id, at)
+        return Response({'budget': budget_id, 'at': at, 'balance': amount}, status=status.HTTP_200_OK)
+
+    @action(detail=False, methods=['post'], parser_classes=[JSONParser, NDJSONParser])
+    def bulk(self, request):
+        """
+        Create many transactions from a JSON array or an NDJSON body.
+        Valid items are inserted and invalid ones are reported by index:
+        201 when every item was created, 207 when some failed, 400 when none were created.
+        """
+        items = request.data
+        if not isinstance(items, list):
+            raise ValidationError({"non_field_errors": ["Expected a list of transactions"]})
+        if len(items) > self.bulk_max_items:
+            raise ValidationError({"non_field_errors": [f"At most {self.bulk_max_items} transactions per request"]})
+
+        created, errors = bulk_create_transactions(request.user, items)
+        if not errors:
+            status_code = status.HTTP_201_CREATED
+        elif created:
+            status_code = status.HTTP_207_MULTI_STATUS
+        else:
+            status_code = status.HTTP_400_BAD_REQUEST
+        data = {'created': len(created), 'ids': [t.pk for t in created], 'errors': errors}
+        return Response(data, status=status_code)
+
+    @action(
+        detail=False, methods=['get', 'post'], url_path='import', url_name='import',
+        parser_classes=[MultiPartParser, JSONParser],
+    )
+    def statement_import(self, request):
+        """
+        Import a bank statement (multipart `file`, CSV or OFX; see StatementUploadSerializer for
+        the options), or resume an interrupted import with `{"resume": <id>}`.
+        Responds 201 with the import's counts when it finished, 400 when the file couldn't be read;
+        with `background` set, 202 at once with the import and the id of the job running it.
+        GET lists the user's imports, newest first.
+        """
+        imports = StatementImport.objects.filter(user=request.user)
+        if request.method == 'GET':
+            return Response(StatementImportSerializer(imports.order_by('-id')[:50], many=True).data)
+        if 'resume' in request.data:
+            if not str(request.data['resume']).isdigit():
+                raise ValidationError({"resume": ["Expected an import id"]})
+            statement_import = get_object_or_404(imports, pk=request.data['resume'])
+        else:
+            upload = StatementUploadSerializer(data=request.data)
+            upload.is_valid(raise_exception=True)
+            statement_import = upload.save(user=request.user)
+        if str(request.data.get('background')).lower() in ('1', 'true'):
+            job = enqueue('transactions.import_statement', {'import_id': statement_import.pk}, user=request.user)
+            data = {**StatementImportSerializer(statement_import).data, 'job': job.pk}
+            return Response(data, status=status.HTTP_202_ACCEPTED)
+        statement_import = run_import(statement_import)
+        status_code = status.HTTP_201_CREATED if statement_import.status == 'done' else status.HTTP_400_BAD_REQUEST
+        return Response(StatementImportSerializer(statement_import).data, status=status_code)
 
     def create(self, request):
         """
         Create a new transaction for the authenticated user.
         Sets the user field from request.user and validates data.
         """
-        serializer = self.serializer_class(data=request.data)
+        serializer = self.serializer_class(data=request.data, context={'request': request})
         if serializer.is_valid(raise_exception=True):
             serializer.save(user=request.user)
             return Response(serializer.data, status=status.HTTP_201_CREATED)
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+    @cached_response
     def retrieve(self, request, pk=None):
         """
         Retrieve a specific transaction by ID.
@@ -57,10 +227,11 @@ class TransactionAPIView(viewsets.ViewSet):
     def partial_update(self, request, pk=None):
         """
         Partially update a transaction by ID.
-        Ensures the transaction belongs to the authenticated user.
+        Ensures the transaction belongs to the authenticated user. The saved budget is loaded
+        with it, since validation falls back to it when the request leaves the budget out.
         """
-        transaction = get_object_or_404(self.queryset, pk=pk, user=request.user)
-        serializer = self.serializer_class(transaction, data=request.data, partial=True)
+        transaction = get_object_or_404(self.queryset.select_related('budget'), pk=pk, user=request.user)
+        serializer = self.serializer_class(transaction, data=request.data, partial=True, context={'request': request})
         if serializer.is_valid(raise_exception=True):
             serializer.save()
             return Response(serializer.data, status=status.HTTP_200_OK)
@@ -72,5 +243,5 @@ class TransactionAPIView(viewsets.ViewSet):
         Ensures the transaction belongs to the authenticated user.
         """
         transaction = get_object_or_404(self.queryset, pk=pk, user=request.user)
-        transaction.delete()
+        delete_transaction(transaction)
         return Response({"message": "Transaction deleted"}, status=status.HTTP_204_NO_CONTENT)
\ No newline at end of file